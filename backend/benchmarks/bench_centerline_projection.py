@@ -0,0 +1,82 @@
+"""
+Time building a track centerline and projecting its laps' GPS samples onto it.
+Run this file from the backend directory: python benchmarks/bench_centerline_projection.py [--points 2000000]
+
+The centerline is built from the cleaned laps of every race of the track. The
+laps' GPS samples are repeated up to --points and projected in bulk through the
+centerline's cKDTree. For comparison, a subset is projected by brute force onto
+every segment of the line, and the two are checked to agree.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from analytics.track_centerline import LAT_COLUMN, LONG_COLUMN, TrackCenterline
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+
+
+def brute_force_project(centerline: TrackCenterline, points: np.ndarray) -> np.ndarray:
+    """Distance along the line of each point, from its closest point over all segments."""
+    relative = points[:, None, :] - centerline.points[None, :, :]
+    segments = centerline.segments[None, :, :]
+    t = np.clip((relative * segments).sum(axis=2) / centerline.segment_lengths ** 2, 0.0, 1.0)
+    gaps = relative - t[:, :, None] * segments
+    closest = np.argmin(np.hypot(gaps[:, :, 0], gaps[:, :, 1]), axis=1)
+    rows = np.arange(len(points))
+    station = centerline.vertex_distance[closest] + t[rows, closest] * centerline.segment_lengths[closest]
+    return (station * centerline.lap_length / centerline.path_length) % centerline.lap_length
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark centerline projection")
+    parser.add_argument("--points", type=int, default=2_000_000, help="GPS samples to project")
+    parser.add_argument("--subset", type=int, default=20_000, help="Samples projected by brute force")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+
+    laps = []
+    for race_num in races[track]:
+        keys = sorted(dataset_manager.get_telemetry_keys(track, race_num))
+        slices = dataset_manager.load_telemetry_slices(track, race_num, keys)
+        laps.extend(DataCleaner.clean_telemetry_data(frame) for frame in slices.values())
+
+    started = time.perf_counter()
+    centerline = TrackCenterline.from_laps(laps)
+    build_seconds = time.perf_counter() - started
+
+    gps = np.vstack([lap[[LAT_COLUMN, LONG_COLUMN]].dropna().to_numpy(np.float64) for lap in laps])
+    points = centerline.to_local(gps)
+    points = np.tile(points, (-(-args.points // len(points)), 1))[:args.points]
+
+    started = time.perf_counter()
+    distance, _ = centerline.project(points)
+    tree_seconds = time.perf_counter() - started
+
+    subset = points[:args.subset]
+    started = time.perf_counter()
+    brute = np.concatenate([brute_force_project(centerline, chunk) for chunk in np.array_split(subset, 20)])
+    brute_seconds = time.perf_counter() - started
+
+    # Distances are on a loop, so a point at the line compares modulo the lap length
+    difference = np.abs(distance[:args.subset] - brute)
+    difference = np.minimum(difference, centerline.lap_length - difference)
+
+    print(f"{track}: {len(laps)} laps, centerline of {len(centerline)} vertices built in {build_seconds:.2f}s")
+    print(f"{'method':<12} {'points':>10} {'time':>9} {'per million':>12}")
+    print(f"{'cKDTree':<12} {len(points):>10} {tree_seconds:>8.2f}s {tree_seconds * 1e6 / len(points):>11.2f}s")
+    print(f"{'brute force':<12} {len(subset):>10} {brute_seconds:>8.2f}s {brute_seconds * 1e6 / len(subset):>11.2f}s")
+    print(f"largest difference on the subset: {difference.max():.3f} m")
+
+
+if __name__ == "__main__":
+    main()
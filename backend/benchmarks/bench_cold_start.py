@@ -0,0 +1,73 @@
+"""
+Measure cold start of the API: process spawn to first /health byte and to /ready.
+Run this file from the backend directory: python benchmarks/bench_cold_start.py [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def wait_for(url: str, timeout: float, expect_status: int = 200) -> float:
+    """Poll a URL until it answers with the expected status; return the time it did."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == expect_status:
+                    return time.time()
+        except urllib.error.HTTPError as e:
+            # /ready answers 503 while warming
+            if e.code == expect_status:
+                return time.time()
+            if e.code == 404:
+                raise LookupError(f"{url} does not exist")
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer {expect_status} within {timeout}s")
+
+
+def measure(port: int, timeout: float) -> dict:
+    """Start one server process and time its first /health and /ready responses."""
+    started = time.time()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        health = wait_for(f"http://127.0.0.1:{port}/health", timeout)
+        try:
+            ready = wait_for(f"http://127.0.0.1:{port}/ready", timeout)
+        except LookupError:
+            # Servers without a readiness probe are ready once they serve traffic
+            ready = health
+        return {"health": health - started, "ready": ready - started}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=3, help="Server starts to time")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the server under test")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for each probe")
+    args = parser.parse_args()
+
+    results = [measure(args.port, args.timeout) for _ in range(args.runs)]
+    for name in ("health", "ready"):
+        times = [result[name] for result in results]
+        print(f"spawn -> first /{name} 200: median {statistics.median(times):.2f}s "
+              f"(min {min(times):.2f}s, max {max(times):.2f}s, {args.runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Time the delta-to-reference trace for a whole field on one lap.
+Run this file from the backend directory: python benchmarks/bench_delta_trace.py [--drivers 30]
+
+The race's cars on one lap are repeated until the field has --drivers cars, as
+the /delta/{lap} endpoint would see on a full grid. Each car's lap is resampled
+onto the distance grid and every car's delta to the session-best lap is
+computed in one array operation; the per-car loop subtracts the reference one
+car at a time for comparison. The laps are already cleaned, as they are when
+served from the channel store.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from analytics.lap_analyzer import LapAnalyzer
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+from data_processing.distance_resampler import resample_laps, time_deltas
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the field-wide delta trace")
+    parser.add_argument("--drivers", type=int, default=30, help="Cars in the simulated field")
+    parser.add_argument("--lap", type=int, default=3, help="Lap to compare")
+    parser.add_argument("--step", type=float, default=1.0, help="Grid spacing in metres")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per stage")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+
+    laps = DataCleaner.clean_lap_data(dataset_manager.load_lap_data(track, race_num))
+    reference = LapAnalyzer.find_reference_lap(laps)
+    reference_key = (int(reference['driver']), reference['lap_number'])
+    numbers = laps.loc[laps['LAP_NUMBER'] == args.lap, 'NUMBER'].astype(str).unique()
+    keys = [(int(number), args.lap) for number in numbers if number.isdigit()]
+
+    slices = dataset_manager.load_telemetry_slices(track, race_num, [reference_key, *keys])
+    cleaned = {key: DataCleaner.clean_telemetry_data(frame) for key, frame in slices.items()}
+    reference_frame = cleaned.pop(reference_key)
+    cars = list(cleaned.values())
+    field = {car: cars[car % len(cars)] for car in range(args.drivers)}
+
+    resample_time, resampled = timed(lambda: resample_laps(field, args.step), args.repeats)
+    reference_lap = resample_laps({"reference": reference_frame}, args.step)["reference"]
+    resampled_laps = list(resampled.values())
+
+    def per_car():
+        reference_elapsed = reference_lap["elapsed"].to_numpy()
+        traces = []
+        for lap in resampled_laps:
+            elapsed = np.full(len(reference_elapsed), np.nan)
+            length = min(len(lap), len(reference_elapsed))
+            elapsed[:length] = lap["elapsed"].to_numpy()[:length]
+            delta = elapsed - reference_elapsed
+            valid = np.flatnonzero(~np.isnan(delta))
+            traces.append(delta - delta[valid[0]] if len(valid) else delta)
+        return np.vstack(traces)
+
+    loop_time, looped = timed(per_car, args.repeats)
+    batch_time, batched = timed(lambda: time_deltas(resampled_laps, reference_lap), args.repeats)
+    assert np.allclose(looped, batched, equal_nan=True)
+
+    print(f"{track} Race {race_num} lap {args.lap}: {args.drivers} cars from {len(cars)} laps, "
+          f"reference car {reference['driver']} lap {reference['lap_number']}, "
+          f"{len(reference_lap)} grid points of {args.step:g} m")
+    print(f"{'stage':<22} {'time':>9}")
+    print(f"{'resample field':<22} {resample_time * 1000:>7.1f}ms")
+    print(f"{'deltas, per-car loop':<22} {loop_time * 1000:>7.2f}ms")
+    print(f"{'deltas, batched':<22} {batch_time * 1000:>7.2f}ms")
+    print(f"{'field total':<22} {(resample_time + batch_time) * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare per-channel np.interp with the 2-D distance resampler over every lap of a race.
+Run this file from the backend directory: python benchmarks/bench_distance_resample.py [--step 1]
+
+Both put each cleaned lap onto the same lap-distance grid as a DataFrame with an
+elapsed-time column. The baseline parses timestamps with pandas and interpolates
+one channel at a time; the resampler parses them with Arrow, computes the
+interpolation weights once per lap and applies them to all channels together.
+The largest difference between the two is printed to confirm they agree.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+from data_processing.distance_resampler import DISTANCE_CHANNEL, STEP_CHANNELS, distance_rows, resample_laps
+
+
+def interp_channels(frame: pd.DataFrame, step: float) -> pd.DataFrame:
+    """Interpolate every channel of a lap onto the distance grid separately, parsing time with pandas."""
+    distance = frame[DISTANCE_CHANNEL].to_numpy(np.float64)
+    rows = distance_rows(distance)
+    distance = distance[rows]
+    grid = np.arange(int(distance[-1] // step) + 1) * step
+    times = pd.to_datetime(frame["timestamp"], format="ISO8601", utc=True)
+    elapsed = ((times - times.min()).dt.total_seconds()).to_numpy(np.float64)[rows]
+    result = pd.DataFrame({"distance": grid})
+    result["elapsed"] = np.interp(grid, distance, elapsed, left=np.nan, right=np.nan)
+    for col in frame.columns:
+        if frame[col].dtype.kind != "f" or col == DISTANCE_CHANNEL or col in STEP_CHANNELS:
+            continue
+        values = frame[col].to_numpy(np.float64)[rows]
+        valid = ~np.isnan(values)
+        if valid.sum() >= 2:
+            result[col] = np.interp(grid, distance[valid], values[valid], left=np.nan, right=np.nan)
+    return result
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark distance-aligned lap resampling")
+    parser.add_argument("--step", type=float, default=1.0, help="Grid spacing in metres")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per method")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+    raw = dataset_manager.load_telemetry_data(track, race_num)
+    keys = raw.groupby(['vehicle_number', 'lap'], observed=True).size().index
+    del raw
+    laps = dataset_manager.load_telemetry_slices(track, race_num, [(int(v), int(l)) for v, l in keys])
+    cleaned = {key: DataCleaner.clean_telemetry_data(frame) for key, frame in laps.items()}
+    cleaned = {key: frame for key, frame in cleaned.items() if DISTANCE_CHANNEL in frame.columns}
+
+    baseline_time, baseline = timed(
+        lambda: {key: interp_channels(frame, args.step) for key, frame in cleaned.items()}, args.repeats
+    )
+    resampled_time, resampled = timed(lambda: resample_laps(cleaned, args.step), args.repeats)
+
+    drift = 0.0
+    for key, frame in baseline.items():
+        for col in frame.columns[1:]:
+            values = frame[col].to_numpy(np.float64)
+            ours = resampled[key][col].to_numpy(np.float64)
+            scale = max(np.nanmax(np.abs(values)), 1.0)
+            drift = max(drift, float(np.nanmax(np.abs(ours - values)) / scale))
+
+    print(f"{track} Race {race_num}: {len(cleaned)} laps, {args.step:g} m grid")
+    print(f"{'method':<12} {'total':>9} {'per lap':>9}")
+    for name, seconds in (("per-channel", baseline_time), ("2-D", resampled_time)):
+        print(f"{name:<12} {seconds * 1000:>7.1f}ms {seconds * 1000 / len(cleaned):>7.2f}ms")
+    print(f"largest relative difference: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare stride sampling with LTTB and min/max downsampling: rows kept, peaks lost and time.
+Run this file from the backend directory: python benchmarks/bench_downsampling.py [--points 150]
+
+One cleaned lap is reduced to --points rows by each method. The table shows how
+far each channel's min and max drift from the full-resolution lap, averaged
+over channels as a share of the channel's range, and the mean drift when every
+lap of the race is reduced the same way. Each method is first checked to return
+no more rows than its budget, down to budgets smaller than one row per channel.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+from data_processing.downsampling import DOWNSAMPLING_METHODS, downsample
+
+
+def extreme_error(full: pd.DataFrame, sampled: pd.DataFrame) -> float:
+    """Mean drift of each channel's min and max, as a share of the channel's range."""
+    errors = []
+    for col in [col for col in full.columns if full[col].dtype.kind == "f"]:
+        spread = full[col].max() - full[col].min()
+        if spread > 0:
+            errors.append((abs(full[col].max() - sampled[col].max()) + abs(full[col].min() - sampled[col].min())) / spread)
+    return float(np.mean(errors))
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark telemetry downsampling")
+    parser.add_argument("--points", type=int, default=150, help="Row budget per lap")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per method")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+    raw = dataset_manager.load_telemetry_data(track, race_num)
+    keys = raw.groupby(['vehicle_number', 'lap'], observed=True).size().index
+    del raw
+    laps = dataset_manager.load_telemetry_slices(track, race_num, [(int(v), int(l)) for v, l in keys])
+    cleaned = {key: DataCleaner.clean_telemetry_data(frame) for key, frame in laps.items()}
+    (vehicle, lap), full = next(iter(cleaned.items()))
+
+    def reducers(frame):
+        """Each method reducing a frame to the row budget; striding keeps every Nth row."""
+        stride = max(1, -(-len(frame) // args.points))
+        variants = {"stride": lambda: frame.iloc[::stride]}
+        for method in DOWNSAMPLING_METHODS:
+            variants[method] = lambda method=method: downsample(frame, args.points, method)
+        return variants
+
+    # The budget is a hard cap, down to budgets smaller than one row per channel
+    for budget in [3, 4, 5, 10, 25, args.points]:
+        for method in DOWNSAMPLING_METHODS:
+            rows = len(downsample(full, budget, method))
+            assert rows <= budget, f"{method}: {rows} rows for a budget of {budget}"
+
+    print(f"{track} Race {race_num} car {vehicle} lap {lap}: {len(full)} rows, budget {args.points}; "
+          f"race drift over {len(cleaned)} laps")
+    print(f"{'method':<8} {'rows':>6} {'time':>9} {'lap drift':>10} {'race drift':>11}")
+    for name, fn in reducers(full).items():
+        seconds, sampled = timed(fn, args.repeats)
+        race_drift = np.mean([extreme_error(frame, reducers(frame)[name]()) for frame in cleaned.values()])
+        print(f"{name:<8} {len(sampled):>6} {seconds * 1000:>7.1f}ms {extreme_error(full, sampled):>10.2%} "
+              f"{race_drift:>11.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare per-driver lap analytics with the field-wide batch analyzer: time and output parity.
+Run this file from the backend directory: python benchmarks/bench_field_analytics.py [--drivers 40]
+
+The per-driver path is what the analytics endpoint used to do for each driver a
+client opened: clean the race, filter one driver, run analyze_lap_times. The
+batch path cleans once and runs LapAnalyzer.analyze_field for the whole field.
+A race's drivers are repeated under new car numbers up to --drivers.
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from analytics.lap_analyzer import LapAnalyzer
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+
+
+def scaled_field(raw: pd.DataFrame, drivers: int) -> pd.DataFrame:
+    """Repeat a race's raw lap rows under new car numbers until it has at least `drivers` drivers."""
+    numbers = raw['NUMBER'].dropna().unique()
+    copies = max(1, math.ceil(drivers / len(numbers)))
+    frames = []
+    for copy in range(copies):
+        frame = raw.copy()
+        frame['NUMBER'] = frame['NUMBER'].astype(str) + ("" if copy == 0 else f"_{copy}")
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def normalize(value):
+    """Replace NaN with None at every level, as analyze_field returns it."""
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def assert_close(expected, actual, path="") -> None:
+    """Fail unless two analyses are equal, with floats compared to a relative 1e-9."""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and list(expected) == list(actual), f"{path}: keys differ"
+        for key in expected:
+            assert_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, float) and isinstance(actual, float):
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-12), f"{path}: {expected} != {actual}"
+    else:
+        assert expected == actual, f"{path}: {expected!r} != {actual!r}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark field-wide lap analytics")
+    parser.add_argument("--drivers", type=int, default=40, help="Drivers the field is scaled up to")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+    raw = scaled_field(dataset_manager.load_lap_data(track, race_num), args.drivers)
+
+    def per_driver():
+        results = {}
+        for driver in raw['NUMBER'].dropna().unique():
+            cleaned = DataCleaner.clean_lap_data(raw.copy())
+            results[str(driver)] = LapAnalyzer.analyze_lap_times(cleaned[cleaned['NUMBER'] == str(driver)])
+        return results
+
+    def per_driver_cleaned_once():
+        cleaned = DataCleaner.clean_lap_data(raw.copy())
+        return {
+            str(driver): LapAnalyzer.analyze_lap_times(cleaned[cleaned['NUMBER'] == driver])
+            for driver in cleaned['NUMBER'].dropna().unique()
+        }
+
+    def batch():
+        return LapAnalyzer.analyze_field(DataCleaner.clean_lap_data(raw.copy()))
+
+    per_driver_time, expected = timed(per_driver, args.repeats)
+    cleaned_once_time, _ = timed(per_driver_cleaned_once, args.repeats)
+    batch_time, actual = timed(batch, args.repeats)
+
+    assert set(expected) == set(actual), "drivers differ"
+    for driver, analysis in actual.items():
+        assert_close(normalize(expected[driver]), analysis, driver)
+
+    print(f"{track} Race {race_num}: {len(actual)} drivers, {len(raw)} laps; outputs match")
+    print(f"clean + analyze per driver:        {per_driver_time * 1000:8.1f}ms")
+    print(f"clean once, analyze per driver:    {cleaned_once_time * 1000:8.1f}ms")
+    print(f"clean once, analyze_field:         {batch_time * 1000:8.1f}ms "
+          f"({per_driver_time / batch_time:.0f}x / {cleaned_once_time / batch_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Check the group-wise lap renumbering against the per-driver loop and time both.
+Run this file from the backend directory: python benchmarks/bench_lap_renumbering.py [--cars 40 --laps 60]
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from constants import INVALID_LAP_NUMBER
+from data_processing.data_cleaner import DataCleaner
+
+logging.disable(logging.WARNING)
+
+
+def format_elapsed(seconds: float) -> str:
+    """Format seconds the way the timing exports do (H:MM:SS.mmm past the hour)."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{int(hours)}:{int(minutes):02d}:{secs:06.3f}"
+    return f"{int(minutes)}:{secs:06.3f}"
+
+
+def make_race(cars: int, laps: int, missing_rate: float = 0.0, seed: int = 0, invalid_rate: float = 1.0,
+              red_flag_lap: int = 0) -> pd.DataFrame:
+    """Synthetic lap timing export with lap counters stuck at 32768 (all of them by default)."""
+    rng = np.random.default_rng(seed)
+    lap_times = rng.normal(100, 2, (cars, laps))
+    # Occasional slow laps (pit stops, yellows) must not be read as missing laps
+    slow = rng.random((cars, laps)) < 0.03
+    lap_times[slow] *= rng.uniform(1.2, 1.7, slow.sum())
+    if red_flag_lap:
+        # A stoppage makes one lap several typical laps long for every car
+        lap_times[:, red_flag_lap - 1] += 300
+    elapsed = lap_times.cumsum(axis=1).round(3)
+
+    true_lap = np.tile(np.arange(1, laps + 1), cars)
+    race = pd.DataFrame({
+        "NUMBER": np.repeat(np.arange(2, cars + 2), laps),
+        "TRUE_LAP": true_lap,
+        "LAP_NUMBER": np.where(rng.random(len(true_lap)) < invalid_rate, INVALID_LAP_NUMBER, true_lap),
+        "ELAPSED_SECONDS": elapsed.ravel(),
+        "ELAPSED": [format_elapsed(s) for s in elapsed.ravel()]
+    })
+    if missing_rate:
+        race = race[rng.random(len(race)) >= missing_rate]
+    return race.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def loop_renumber(df: pd.DataFrame) -> pd.DataFrame:
+    """The previous per-driver mask loop, sorted on parsed ELAPSED seconds."""
+    df = df.sort_values(["ELAPSED_SECONDS"], kind="stable")
+    for driver in df["NUMBER"].unique():
+        driver_mask = df["NUMBER"] == driver
+        df.loc[driver_mask, "LAP_NUMBER"] = range(1, driver_mask.sum() + 1)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lap renumbering")
+    parser.add_argument("--cars", type=int, default=40, help="Cars in the synthetic race")
+    parser.add_argument("--laps", type=int, default=60, help="Laps per car")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per implementation")
+    args = parser.parse_args()
+
+    race = make_race(args.cars, args.laps)
+    expected = loop_renumber(race.copy())
+    actual = DataCleaner.fix_invalid_lap_numbers(race.copy())
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert (actual["LAP_NUMBER"] == actual["TRUE_LAP"]).all()
+    print("Parity: group-wise renumbering matches the per-driver loop")
+
+    red_flag = make_race(args.cars, args.laps, seed=2, red_flag_lap=args.laps // 2)
+    assert (DataCleaner.fix_invalid_lap_numbers(red_flag).eval("LAP_NUMBER == TRUE_LAP")).all()
+    print("Red flag: a long lap without a lap counter jump is not read as missing laps")
+
+    gappy = make_race(args.cars, args.laps, missing_rate=0.05, seed=1, invalid_rate=0.2)
+    loop_correct = (loop_renumber(gappy.copy()).eval("LAP_NUMBER == TRUE_LAP")).mean()
+    fixed_correct = (DataCleaner.fix_invalid_lap_numbers(gappy.copy()).eval("LAP_NUMBER == TRUE_LAP")).mean()
+    print(f"With 5% of laps unrecorded and 20% of counters invalid: loop numbers {loop_correct:.1%} "
+          f"of laps correctly, ELAPSED gaps checked against the counter {fixed_correct:.1%}")
+
+    for name, renumber in (("loop", loop_renumber), ("groupby", DataCleaner.fix_invalid_lap_numbers)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            renumber(race.copy())
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{args.cars} cars x {args.laps} laps, {name}: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
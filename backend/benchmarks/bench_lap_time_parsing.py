@@ -0,0 +1,81 @@
+"""
+Check the vectorized lap-time parser against the scalar one and time both.
+Run this file from the backend directory: python benchmarks/bench_lap_time_parsing.py [--rows 100000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+
+TIME_COLUMNS = ["LAP_TIME", "S1_SECONDS", "S2_SECONDS", "S3_SECONDS"]
+
+# Well-formed and malformed values seen in, or plausible for, the timing exports
+CORPUS = [
+    "1:39.725", "2:01.5", "0:59.999", "10:00.000", " 1:40.100 ", "1 : 40.1", "-1:30.0",
+    "39.725", "40", " 41.2 ", "+3", ".5", "5.", "1e2", "inf", "-inf", "nan", "NaN",
+    "", " ", "abc", "1:", ":5", "1:2:3", "1::2", "a:30", "1:b", "1_000", "1,5", "0x10",
+    "\t7", "5\n", 39.725, 40, 0, -1.5, np.float32(1.1), np.int64(4), True, None, np.nan
+]
+
+
+def assert_parity(values: pd.Series) -> None:
+    """Fail if the vectorized and scalar parsers disagree on any value."""
+    expected = values.apply(DataCleaner.convert_lap_time_to_seconds).astype(float)
+    actual = DataCleaner.convert_lap_times_to_seconds(values)
+    pd.testing.assert_series_equal(actual, expected, check_names=False)
+
+
+def load_real_columns() -> list:
+    """Lap and sector time columns from every race in the local dataset."""
+    dataset_manager = DatasetManager()
+    columns = []
+    for track, races in dataset_manager.get_available_races().items():
+        for race_num in races:
+            lap_data = dataset_manager.load_lap_data(track, race_num)
+            if lap_data is None:
+                continue
+            lap_data.columns = lap_data.columns.str.strip()
+            columns.extend(lap_data[col] for col in TIME_COLUMNS if col in lap_data.columns)
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lap-time parsing")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic timing column")
+    args = parser.parse_args()
+
+    corpus = pd.Series(CORPUS, dtype=object)
+    assert_parity(corpus)
+    assert_parity(corpus.astype(str))
+    for column in load_real_columns():
+        assert_parity(column)
+    print("Parity: vectorized parser matches convert_lap_time_to_seconds")
+
+    rng = np.random.default_rng(0)
+    lap_seconds = rng.normal(100, 2, args.rows)
+    column = pd.Series([f"{int(s // 60)}:{s % 60:06.3f}" for s in lap_seconds], dtype=object)
+    column[rng.random(args.rows) < 0.01] = np.nan
+
+    start = time.perf_counter()
+    column.apply(DataCleaner.convert_lap_time_to_seconds)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    DataCleaner.convert_lap_times_to_seconds(column)
+    vector_seconds = time.perf_counter() - start
+
+    print(f"{args.rows:,} values: apply {scalar_seconds:.3f}s, vectorized {vector_seconds:.3f}s "
+          f"({scalar_seconds / vector_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare inferred and schema-typed CSV reads per file kind: parse time, memory and output parity.
+Run this file from the backend directory: python benchmarks/bench_schema_reads.py [--min-rows 200000]
+
+Small files are repeated row-wise into a temporary file until they reach --min-rows,
+so per-kind timings are not dominated by fixed per-call overhead.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api.encoded_response import encode_records
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+from data_processing.schema_registry import SCHEMAS, read_source_csv
+
+KINDS = ["analysis", "telemetry", "weather", "results"]
+
+
+def scaled_copy(path: Path, min_rows: int, directory: Path) -> Path:
+    """Write a copy of a CSV whose data rows are repeated until it has at least min_rows."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if body and not body.endswith(b"\n"):
+        body += b"\n"
+    rows = max(1, body.count(b"\n"))
+    repeats = max(1, -(-min_rows // rows))
+
+    scaled = directory / path.name
+    with open(scaled, "wb") as f:
+        f.write(header)
+        for _ in range(repeats):
+            f.write(body)
+    return scaled
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def assert_parity(kind: str, inferred: pd.DataFrame, typed: pd.DataFrame) -> None:
+    """Fail if the typed read changes what clients receive after cleaning."""
+    inferred = inferred.rename(columns=str.strip)[[col.strip() for col in typed.columns]]
+    typed = typed.rename(columns=str.strip)
+
+    if kind == "analysis":
+        inferred, typed = DataCleaner.clean_lap_data(inferred), DataCleaner.clean_lap_data(typed)
+    elif kind == "telemetry":
+        inferred, typed = DataCleaner.clean_telemetry_data(inferred), DataCleaner.clean_telemetry_data(typed)
+        pd.testing.assert_frame_equal(inferred, typed, check_dtype=False, check_categorical=False)
+        return
+
+    assert encode_records(inferred) == encode_records(typed), f"{kind}: typed read changes the response"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema-typed CSV reads")
+    parser.add_argument("--min-rows", type=int, default=200000, help="Rows each benchmarked file is scaled up to")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed reads per variant")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+
+    print(f"{track} Race {race_num}, files scaled to >= {args.min_rows} rows")
+    print(f"{'kind':<10} {'rows':>9} {'inferred':>10} {'typed':>10} {'speedup':>8} "
+          f"{'mem inferred':>13} {'mem typed':>10} {'saved':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in KINDS:
+            source = dataset_manager.manifest.get_file(track, race_num, kind)
+            if source is None:
+                continue
+            delimiter = dataset_manager.manifest.get_delimiter(track, race_num, kind)
+
+            # Parity on the real file, timings on the scaled copy
+            assert_parity(kind, pd.read_csv(source, sep=delimiter), read_source_csv(kind, source, delimiter))
+
+            path = scaled_copy(source, args.min_rows, Path(tmp))
+            inferred_time, inferred = timed(lambda: pd.read_csv(path, sep=delimiter), args.repeats)
+            typed_time, typed = timed(lambda: SCHEMAS[kind].read_csv(path, delimiter), args.repeats)
+
+            inferred_mb = inferred.memory_usage(deep=True).sum() / 1024 / 1024
+            typed_mb = typed.memory_usage(deep=True).sum() / 1024 / 1024
+            print(f"{kind:<10} {len(typed):>9} {inferred_time * 1000:>8.1f}ms {typed_time * 1000:>8.1f}ms "
+                  f"{inferred_time / typed_time:>7.1f}x {inferred_mb:>11.1f}MB {typed_mb:>8.1f}MB "
+                  f"{1 - typed_mb / inferred_mb:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare per-lap telemetry loads with one batched load: time and output parity.
+Run this file from the backend directory: python benchmarks/bench_telemetry_batch.py [--drivers 2] [--laps 3] [--csv]
+
+The per-lap path is what a client comparing drivers used to trigger: one
+telemetry request, and one pass over the store or CSV, per (driver, lap) pair.
+The batch path loads every pair with DatasetManager.load_telemetry_slices.
+Both use whichever source the race has, telemetry store or index; --csv
+disables the index to measure races whose CSV has to be scanned.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_processing.dataset_manager import DatasetManager
+
+
+def timed(fn, repeats: int):
+    """Median wall time of fn over repeats, and its last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched telemetry loads")
+    parser.add_argument("--drivers", type=int, default=2, help="Drivers in the batch")
+    parser.add_argument("--laps", type=int, default=3, help="Laps per driver in the batch")
+    parser.add_argument("--csv", action="store_true", help="Scan the raw CSV instead of using the index")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    if args.csv:
+        dataset_manager.get_telemetry_index = lambda telemetry_file: None
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+
+    telemetry = dataset_manager.load_telemetry_data(track, race_num)
+    counts = telemetry.groupby(['vehicle_number', 'lap'], observed=True).size()
+    vehicles = sorted(counts.index.get_level_values(0).unique())[:args.drivers]
+    keys = [key for key in counts.index if key[0] in vehicles]
+    keys = [(int(vehicle), int(lap)) for vehicle in vehicles
+            for _, lap in [key for key in keys if key[0] == vehicle][:args.laps]]
+    del telemetry
+
+    def per_lap():
+        return {
+            (vehicle, lap): dataset_manager.load_telemetry_data(track, race_num, lap, vehicle)
+            for vehicle, lap in keys
+        }
+
+    def batch():
+        return dataset_manager.load_telemetry_slices(track, race_num, keys)
+
+    per_lap_time, expected = timed(per_lap, args.repeats)
+    batch_time, actual = timed(batch, args.repeats)
+
+    assert set(expected) == set(actual), "pairs differ"
+    for key, frame in actual.items():
+        pd.testing.assert_frame_equal(
+            expected[key].reset_index(drop=True), frame.reset_index(drop=True),
+            check_dtype=False, check_categorical=False
+        )
+
+    print(f"{track} Race {race_num}: {len(keys)} slices, {sum(len(f) for f in actual.values())} rows; outputs match")
+    print(f"one load per slice: {per_lap_time * 1000:8.1f}ms")
+    print(f"one batched load:   {batch_time * 1000:8.1f}ms ({per_lap_time / batch_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
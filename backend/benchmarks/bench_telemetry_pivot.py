@@ -0,0 +1,119 @@
+"""
+Benchmark the vectorized telemetry pivot against pandas pivot_table.
+Run this file from the backend directory: python benchmarks/bench_telemetry_pivot.py [--sizes 1e6,1e7,5e7]
+
+Before timing, a small input with empty timestamps is checked to pivot like
+pivot_table, which drops rows with a null key.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from constants import TELEMETRY_COLUMNS
+from data_processing.data_cleaner import DataCleaner
+
+SAMPLES_PER_LAP = 1200
+DROPPED_SAMPLE_FRACTION = 0.02
+DUPLICATED_SAMPLE_FRACTION = 0.001
+
+
+def make_long_telemetry(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic long-format lap series with realistic key cardinality."""
+    rng = np.random.default_rng(seed)
+    n_channels = len(TELEMETRY_COLUMNS)
+    n_samples = -(-n_rows // n_channels)
+
+    sample = np.repeat(np.arange(n_samples), n_channels)[:n_rows]
+    channel = np.tile(np.arange(n_channels), n_samples)[:n_rows]
+
+    start = pd.Timestamp("2025-03-01T14:00:00")
+    stamps = (start + pd.to_timedelta(np.arange(n_samples) * 100, unit="ms")).strftime("%Y-%m-%dT%H:%M:%S.%f")
+    stamps = np.asarray(stamps, dtype=object)
+
+    df = pd.DataFrame({
+        "timestamp": stamps[sample],
+        "lap": (sample // SAMPLES_PER_LAP + 1).astype(np.int64),
+        "telemetry_name": np.asarray(TELEMETRY_COLUMNS, dtype=object)[channel],
+        "telemetry_value": rng.normal(100, 20, n_rows)
+    })
+
+    # Drop a few samples so cells are missing, and re-log a few with new values
+    # right after the original so first-wins deduplication is exercised
+    keep = rng.random(n_rows) > DROPPED_SAMPLE_FRACTION
+    repeat = rng.random(n_rows) < DUPLICATED_SAMPLE_FRACTION
+    duplicates = df[repeat].assign(telemetry_value=rng.normal(100, 20, int(repeat.sum())))
+    order = np.concatenate([np.flatnonzero(keep), np.flatnonzero(repeat) + 0.5])
+    combined = pd.concat([df[keep], duplicates], ignore_index=True)
+    return combined.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+
+def pivot_table_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """The groupby-based pivot previously used by clean_telemetry_data."""
+    wide = df.pivot_table(
+        index=["timestamp", "lap"],
+        columns="telemetry_name",
+        values="telemetry_value",
+        aggfunc="first"
+    ).reset_index()
+    wide.columns.name = None
+    return wide
+
+
+def check_null_keys() -> None:
+    """Fail unless rows with an empty timestamp are dropped as pivot_table drops them."""
+    df = make_long_telemetry(20000, seed=1)
+    # Arrow-backed strings with pd.NA, as the schema-typed CSV reader returns them
+    timestamps = df["timestamp"].astype(pd.StringDtype("pyarrow"))
+    timestamps[df.index % 97 == 0] = pd.NA
+    df = df.assign(timestamp=timestamps)
+    pd.testing.assert_frame_equal(DataCleaner.pivot_telemetry(df), pivot_table_reference(df), check_dtype=False)
+
+
+def time_call(fn, *args):
+    """Run fn once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the telemetry pivot")
+    parser.add_argument("--sizes", default="1e6,1e7,5e7", help="Comma-separated long-format row counts")
+    args = parser.parse_args()
+
+    check_null_keys()
+    print(f"{'rows':>12} {'channel names':>14} {'pivot_table s':>14} {'vectorized s':>13} {'speedup':>8}")
+    for size in args.sizes.split(","):
+        n_rows = int(float(size))
+        df = make_long_telemetry(n_rows)
+
+        # Object names as parsed from the CSV, categorical as read from the telemetry store
+        variants = {
+            "object": df,
+            "categorical": df.assign(telemetry_name=df["telemetry_name"].astype("category"))
+        }
+        for label, variant in variants.items():
+            fast, fast_seconds = time_call(DataCleaner.pivot_telemetry, variant)
+
+            # pivot_table expands categorical keys to the full cartesian product
+            # and can run out of memory on large inputs
+            try:
+                reference, reference_seconds = time_call(pivot_table_reference, variant)
+            except MemoryError:
+                print(f"{n_rows:>12,} {label:>14} {'out of memory':>14} {fast_seconds:>13.2f} {'-':>8}")
+                continue
+
+            pd.testing.assert_frame_equal(fast, reference)
+            print(f"{n_rows:>12,} {label:>14} {reference_seconds:>14.2f} {fast_seconds:>13.2f} "
+                  f"{reference_seconds / fast_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
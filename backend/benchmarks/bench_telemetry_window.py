@@ -0,0 +1,75 @@
+"""
+Compare zooming by refetching a lap at a new sample rate with windows from its pyramid.
+Run this file from the backend directory: python benchmarks/bench_telemetry_window.py [--width 1000]
+
+A zoom sequence halves the visible time window step by step. The refetch path
+is what a chart did before: load and clean the lap, then stride-sample it, for
+every step. The pyramid path cuts each window from the lap's precomputed levels
+and encodes it, as the /telemetry/{lap}/window endpoint does.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api.encoded_response import EncodedResponse
+from data_processing.artifact_cache import ArtifactCache
+from data_processing.channel_store import ChannelStore
+from data_processing.data_cleaner import DataCleaner
+from data_processing.dataset_manager import DatasetManager
+from data_processing.telemetry_pyramid import LapPyramid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark telemetry windows from the pyramid")
+    parser.add_argument("--width", type=int, default=1000, help="Chart width in pixels")
+    parser.add_argument("--steps", type=int, default=6, help="Zoom steps, each halving the window")
+    args = parser.parse_args()
+
+    dataset_manager = DatasetManager()
+    data_cleaner = DataCleaner()
+    races = dataset_manager.get_available_races()
+    track = next(iter(races))
+    race_num = races[track][0]
+    vehicle, lap = sorted(dataset_manager.get_telemetry_keys(track, race_num))[0]
+    telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+
+    pyramid = ChannelStore().load_lap_pyramid(track, race_num, lap, vehicle, telemetry_file)
+    source = "prebuilt channel arrays"
+    if pyramid is None:
+        source = "built on demand"
+        cleaned = ArtifactCache().load_telemetry_data(track, race_num, lap, vehicle, dataset_manager, data_cleaner)
+        pyramid = LapPyramid.from_frame(cleaned, lap)
+    duration = float(np.nanmax(pyramid.elapsed))
+
+    print(f"{track} Race {race_num} car {vehicle} lap {lap}: {len(pyramid.elapsed)} rows, "
+          f"{len(pyramid.levels) + 1} levels ({source}), width {args.width}px")
+    print(f"{'window':>9} {'refetch':>10} {'pyramid':>9} {'level':>6} {'rows':>6}")
+    window_times = []
+    for step in range(args.steps):
+        span = duration / 2 ** step
+        start = (duration - span) / 2
+
+        began = time.perf_counter()
+        raw = dataset_manager.load_telemetry_data(track, race_num, lap, vehicle)
+        frame = data_cleaner.clean_telemetry_data(raw)
+        frame.iloc[::max(1, int(len(frame) / 2 ** step / args.width))]
+        refetch = time.perf_counter() - began
+
+        began = time.perf_counter()
+        rows, level = pyramid.window("time", start, start + span, args.width)
+        EncodedResponse.from_frame(rows, "columnar", float32=True, meta={"level": level})
+        window_times.append(time.perf_counter() - began)
+
+        print(f"{span:>8.1f}s {refetch * 1000:>8.1f}ms {window_times[-1] * 1000:>7.2f}ms {level:>6} {len(rows):>6}")
+    print(f"median window {statistics.median(window_times) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Build every derived artifact the API serves, so the server starts from prebuilt
+artifacts instead of raw CSVs: telemetry store and index, cleaned channel arrays,
+cleaned laps, per-driver lap analytics, racing lines and rendered track maps.
+
+The build is incremental: steps are keyed on the content hashes of their source
+files, so a rerun after adding one race builds only that race. Independent steps
+run in parallel in a process pool.
+Run this from the backend directory: python -m preprocess [--jobs N] [--force] [--track NAME] [--dry-run]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from data_processing.build_graph import BuildGraph, get_context
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def run_build(jobs: int = os.cpu_count() or 1, force: bool = False, tracks=None, dry_run: bool = False) -> bool:
+    """
+    Build all out-of-date artifacts.
+
+    Args:
+        jobs: Worker processes
+        force: Rebuild every artifact
+        tracks: Only build these tracks, all available ones if None
+        dry_run: Only list what would be built
+
+    Returns:
+        True if no step failed
+    """
+    started = time.perf_counter()
+    graph = BuildGraph()
+    nodes = graph.plan(get_context(), tracks)
+    counts = graph.run(jobs, force=force, dry_run=dry_run)
+
+    for node in nodes:
+        seconds = f"{node.seconds:8.2f}s" if node.status == "built" else " " * 9
+        print(f"{node.status:<12} {seconds}  {node.node_id}")
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"{len(nodes)} steps in {time.perf_counter() - started:.2f}s: {summary}")
+
+    return not counts.get("failed") and not counts.get("blocked")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the derived artifacts served by the API")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Rebuild artifacts that are up to date")
+    parser.add_argument("--track", action="append", help="Only build this track (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be built without building")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_build(args.jobs, force=args.force, tracks=args.track, dry_run=args.dry_run) else 1)
@@ -17,6 +17,11 @@ if __name__ == "__main__":
         from download_dataset import download_dataset_from_s3
         download_dataset_from_s3()
     
+    # Build derived artifacts before serving, so requests never parse raw CSVs
+    if os.getenv('PREPROCESS_ON_STARTUP') == '1':
+        from preprocess import run_build
+        run_build()
+    
     # Use PORT from environment (Railway) or default to 8000
     port = int(os.getenv('PORT', 8000))
     
@@ -86,6 +86,41 @@ class LapAnalyzer:
             'sector_3': float(best_lap.get('S3_SECONDS', 0))
         }
     
+    @staticmethod
+    def find_reference_lap(laps: pd.DataFrame, driver: Optional[str] = None,
+                           lap_number: Optional[int] = None) -> Optional[Dict]:
+        """
+        Find the fastest clean lap of a race, e.g. the session best.
+        
+        Args:
+            laps: Cleaned lap data of a race
+            driver: Only consider this driver's laps (optional)
+            lap_number: Only consider laps with this number (optional)
+            
+        Returns:
+            Dictionary with the driver, lap number and lap time, or None if no
+            timed non-pit lap matches
+        """
+        if laps is None or not {'NUMBER', 'LAP_NUMBER', 'LAP_TIME'}.issubset(laps.columns):
+            return None
+        
+        candidates = laps[laps['LAP_TIME'].notna()]
+        if 'is_pit_lap' in candidates.columns:
+            candidates = candidates[~candidates['is_pit_lap'].fillna(False).astype(bool)]
+        if driver is not None:
+            candidates = candidates[candidates['NUMBER'].astype(str) == str(driver)]
+        if lap_number is not None:
+            candidates = candidates[candidates['LAP_NUMBER'] == lap_number]
+        if candidates.empty:
+            return None
+        
+        best = candidates.loc[candidates['LAP_TIME'].idxmin()]
+        return {
+            'driver': str(best['NUMBER']),
+            'lap_number': int(best['LAP_NUMBER']),
+            'lap_time': float(best['LAP_TIME'])
+        }
+    
     @staticmethod
     def calculate_lap_delta(current_lap: pd.Series, reference_lap: pd.Series) -> Dict:
         """
@@ -292,3 +327,148 @@ class LapAnalyzer:
                     analysis[f'{sector_key}_{stat_key}'] = stat_value
         
         return analysis
+
+    @staticmethod
+    def _json_float(value) -> Optional[float]:
+        """Float for JSON, with NaN as None."""
+        return None if value is None or pd.isna(value) else float(value)
+
+    @staticmethod
+    def analyze_field(laps: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Run analyze_lap_times for every driver of a race in one grouped pass.
+        
+        Rows are grouped by NUMBER once and every statistic is a grouped
+        aggregation over the whole field, instead of filtering the race and
+        analyzing it once per driver. Results match analyze_lap_times, except
+        that NaN is returned as None at every level and laps without a lap time
+        are left out of the trend and consistency calculations.
+        
+        Args:
+            laps: Cleaned lap data of a race
+            
+        Returns:
+            Dictionary mapping driver number (string) to its analysis, in order of first appearance
+        """
+        if laps.empty or 'NUMBER' not in laps.columns:
+            return {}
+        
+        lap_time_col = 'LAP_TIME'
+        lap_num_col = 'LAP_NUMBER'
+        json_float = LapAnalyzer._json_float
+        
+        # Positional index, so grouped idxmin results address rows directly
+        laps = laps[laps['NUMBER'].notna()].reset_index(drop=True)
+        drivers = laps['NUMBER'].astype(str)
+        order = drivers.unique()
+        total_laps = drivers.value_counts()
+        
+        # Sector stats over every lap with a sector time
+        sector_stats = {}
+        for i in range(1, 4):
+            s_col = f'S{i}_SECONDS'
+            if s_col in laps.columns:
+                stats = laps[s_col].groupby(drivers).agg(['min', 'mean', 'max', 'std', 'count'])
+                sector_stats[f'sector_{i}'] = stats[stats['count'] > 0]
+        
+        has_lap_time = lap_time_col in laps.columns
+        if has_lap_time:
+            lap_times = laps[lap_time_col]
+            pit = pd.Series(False, index=laps.index)
+            if 'is_pit_lap' in laps.columns:
+                pit = laps['is_pit_lap'].fillna(False).astype(bool)
+            average_lap_time = lap_times.groupby(drivers).mean()
+            timed_laps = lap_times.notna().groupby(drivers).sum()
+            
+            # Non-pit laps with a time drive the best lap, trend and consistency
+            valid = lap_times[~pit & lap_times.notna()]
+            valid_drivers = drivers[valid.index]
+            valid_grouped = valid.groupby(valid_drivers)
+            valid_count = valid_grouped.size()
+            best_lap_rows = valid_grouped.idxmin()
+            
+            # Least-squares slope of lap time against lap index, in closed form per driver
+            x = valid_drivers.groupby(valid_drivers).cumcount().astype(float)
+            x_centered = x - x.groupby(valid_drivers).transform('mean')
+            y_mean = valid_grouped.transform('mean')
+            slope = (
+                (x_centered * (valid - y_mean)).groupby(valid_drivers).sum()
+                / (x_centered ** 2).groupby(valid_drivers).sum()
+            )
+            valid_mean = valid_grouped.mean()
+            
+            # Consistency: coefficient of variation after IQR outlier removal
+            q1 = valid_grouped.quantile(0.25)
+            q3 = valid_grouped.quantile(0.75)
+            iqr = q3 - q1
+            lower = (q1 - 1.5 * iqr)[valid_drivers].to_numpy()
+            upper = (q3 + 1.5 * iqr)[valid_drivers].to_numpy()
+            inlier = (valid.to_numpy() >= lower) & (valid.to_numpy() <= upper)
+            # Fall back to all clean laps when fewer than 3 survive the filter
+            inlier_count = pd.Series(inlier, index=valid.index).groupby(valid_drivers).sum()
+            keep = inlier | (inlier_count[valid_drivers].to_numpy() < 3)
+            kept = valid[keep].groupby(valid_drivers[keep])
+            kept_mean = kept.mean()
+            coefficient_of_variation = kept.std(ddof=0) / kept_mean.where(kept_mean != 0)
+            # Map to 0-100 scale (0.01 CV = 90 score, 0.05 CV = 50 score)
+            consistency = (100 - coefficient_of_variation * 1000).clip(0, 100).fillna(0.0)
+        
+        field = {}
+        for driver in order:
+            best_lap = None
+            trend = {'trend': 'insufficient_data', 'rate': 0.0}
+            consistency_score = 0.0
+            
+            if has_lap_time and driver in valid_count.index:
+                row = laps.loc[best_lap_rows[driver]]
+                best_lap = {
+                    'lap_number': int(row[lap_num_col]) if lap_num_col in row else None,
+                    'lap_time': float(row[lap_time_col]),
+                    'sector_1': json_float(row.get('S1_SECONDS', 0)),
+                    'sector_2': json_float(row.get('S2_SECONDS', 0)),
+                    'sector_3': json_float(row.get('S3_SECONDS', 0))
+                }
+                
+                if total_laps[driver] >= 3 and valid_count[driver] >= 3:
+                    rate = float(slope[driver])
+                    if abs(rate) < 0.01:
+                        direction = 'stable'
+                    elif rate < 0:
+                        direction = 'improving'
+                    else:
+                        direction = 'degrading'
+                    trend = {'trend': direction, 'rate': rate, 'average_lap_time': float(valid_mean[driver])}
+                
+                if timed_laps[driver] >= 3 and valid_count[driver] >= 3:
+                    consistency_score = float(consistency[driver])
+            
+            sector_analysis = {}
+            for i in range(1, 4):
+                stats = sector_stats.get(f'sector_{i}')
+                if stats is not None and driver in stats.index:
+                    sector_analysis[f'sector_{i}'] = {
+                        'best': json_float(stats.at[driver, 'min']),
+                        'average': json_float(stats.at[driver, 'mean']),
+                        'worst': json_float(stats.at[driver, 'max']),
+                        'std_dev': json_float(stats.at[driver, 'std'])
+                    }
+                else:
+                    sector_analysis[f'sector_{i}'] = {}
+            
+            analysis = {
+                'best_lap': best_lap,
+                'sector_analysis': sector_analysis,
+                'trend': trend,
+                'consistency_score': consistency_score,
+                'total_laps': int(total_laps[driver]),
+                'average_lap_time': json_float(average_lap_time[driver]) if has_lap_time else None
+            }
+            
+            # Flatten sector analysis for easier access
+            for sector_key, sector_data in sector_analysis.items():
+                for stat_key, stat_value in sector_data.items():
+                    analysis[f'{sector_key}_{stat_key}'] = stat_value
+            
+            field[driver] = analysis
+        
+        return field
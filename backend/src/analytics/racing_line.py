@@ -1,7 +1,6 @@
 import pandas as pd
 import numpy as np
-from scipy.signal import savgol_filter
-from typing import Dict, Tuple
+from typing import Dict, Hashable, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,12 +35,15 @@ class RacingLineGenerator:
         return np.column_stack([long_offset, lat_offset])
     
     @staticmethod
-    def generate_racing_line(telemetry: pd.DataFrame) -> Dict:
+    def generate_racing_line(telemetry: pd.DataFrame, centerline=None) -> Dict:
         """
         Generate racing line from GPS telemetry data.
         
         Args:
             telemetry: DataFrame with GPS and speed data
+            centerline: TrackCenterline of the track (optional); when given, lap
+                distance is projected from GPS instead of read from the lap
+                trigger, and each point's lateral offset is added
             
         Returns:
             Dictionary with racing line coordinates and speed data
@@ -91,6 +93,9 @@ class RacingLineGenerator:
         origin = gps_points[0]
         local_coords = RacingLineGenerator.gps_to_local(gps_points, origin)
         
+        # scipy.signal takes ~0.3s to import, so it is loaded on first use rather than at startup
+        from scipy.signal import savgol_filter
+        
         # Apply smoothing filter
         try:
             window = min(51, len(local_coords) // 2 * 2 + 1)  # Must be odd and <= data length
@@ -108,15 +113,25 @@ class RacingLineGenerator:
         
         # Extract speed data (aligned with GPS points)
         speed_data = telemetry.loc[gps_data.index, speed_col].values if speed_col in telemetry.columns else np.zeros(len(gps_data))
-        distance_data = telemetry.loc[gps_data.index, distance_col].values if distance_col in telemetry.columns else np.arange(len(gps_data))
-        
-        return {
+        offset_data = None
+        if centerline is not None:
+            # The lap trigger is often missing or noisy; projection onto the centerline is not
+            distance_data, offset_data = centerline.lap_distance(gps_points)
+        elif distance_col in telemetry.columns:
+            distance_data = telemetry.loc[gps_data.index, distance_col].values
+        else:
+            distance_data = np.arange(len(gps_data))
+        
+        line = {
             'x': x_smooth.tolist(),
             'y': y_smooth.tolist(),
             'speed': speed_data.tolist(),
             'distance': distance_data.tolist(),
             'origin': origin.tolist()
         }
+        if offset_data is not None:
+            line['offset'] = offset_data.tolist()
+        return line
     
     @staticmethod
     def calculate_speed_percentiles(speeds: list) -> Dict:
@@ -161,3 +176,51 @@ class RacingLineGenerator:
             'driver1': line1,
             'driver2': line2
         }
+
+
+class RacingLineSet:
+    """
+    Racing lines of several (vehicle, lap) keys, held as numpy arrays.
+    
+    generate_racing_line returns JSON-ready lists, which DataCache cannot size
+    (sys.getsizeof of a dict ignores its contents). A set keeps every line's
+    points as float64 arrays and reports their nbytes, so a race's lines count
+    against the cache budget; lines are converted back to lists per request.
+    """
+    
+    def __init__(self, lines: Dict[Hashable, Dict]):
+        """
+        Args:
+            lines: Racing line dictionary per key, as returned by generate_racing_line
+        """
+        # None (missing speed, distance or offset) becomes NaN
+        self.lines = {
+            key: {field: np.asarray(values, dtype=np.float64) for field, values in line.items()}
+            for key, line in lines.items()
+        }
+    
+    def __len__(self) -> int:
+        return len(self.lines)
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the lines' arrays, used by DataCache to size the set."""
+        return int(sum(values.nbytes for line in self.lines.values() for values in line.values()))
+    
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """
+        Racing line of a key, ready for JSON.
+        
+        Args:
+            key: (vehicle, lap)
+            
+        Returns:
+            Racing line dictionary with NaN as None, or None if the set has no line for the key
+        """
+        line = self.lines.get(key)
+        if line is None:
+            return None
+        return {
+            field: [None if np.isnan(value) else value for value in values.tolist()]
+            for field, values in line.items()
+        }
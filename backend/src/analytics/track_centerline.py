@@ -0,0 +1,248 @@
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.racing_line import RacingLineGenerator
+
+logger = logging.getLogger(__name__)
+
+LAT_COLUMN = 'VBOX_Lat_Min'
+LONG_COLUMN = 'VBOX_Long_Minutes'
+DISTANCE_COLUMN = 'Laptrigger_lapdist_dls'
+
+# Columns a centerline is built from
+CENTERLINE_COLUMNS = (LAT_COLUMN, LONG_COLUMN, DISTANCE_COLUMN)
+
+# Spacing of the centerline's vertices in metres
+VERTEX_SPACING = 2.0
+
+# Cleanest laps averaged into the centerline
+CENTERLINE_LAPS = 5
+
+# A clean lap has GPS on this share of its samples...
+MIN_GPS_COVERAGE = 0.98
+# ...ends within this many metres of where it started...
+MAX_CLOSING_GAP = 50.0
+# ...and never jumps further between samples than this multiple of its median step
+MAX_STEP_RATIO = 5.0
+
+# Vertices averaged either side of each vertex when smoothing the averaged loop
+SMOOTHING_RADIUS = 2
+
+
+class TrackCenterline:
+    """
+    Reference line of a track, for projecting GPS samples to lap distance.
+
+    The line is a closed loop of vertices in local x/y metres around a fixed GPS
+    origin, starting at the start/finish line. Its vertices are held in a
+    cKDTree, so any number of samples are projected in bulk: each sample's
+    nearest vertex is looked up, then the sample is dropped onto the segments
+    either side of it. Projection gives a lap distance that does not depend on
+    the lap trigger channel, plus the sample's lateral offset from the line.
+    """
+
+    def __init__(self, origin: np.ndarray, points: np.ndarray, lap_length: Optional[float] = None):
+        """
+        Args:
+            origin: [lat, long] the local coordinates are relative to
+            points: (vertices, 2) local x/y of the loop, first vertex at the start/finish line
+            lap_length: Lap length the distance along the loop is scaled to, e.g. as
+                measured by the lap trigger; the loop's own length if None
+        """
+        # scipy.spatial takes ~0.1s to import, so it is loaded when a centerline is built rather than at startup
+        from scipy.spatial import cKDTree
+
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.points = np.asarray(points, dtype=np.float64)
+        self.segments = np.roll(self.points, -1, axis=0) - self.points
+        self.segment_lengths = np.hypot(self.segments[:, 0], self.segments[:, 1])
+        self.vertex_distance = np.concatenate([[0.0], np.cumsum(self.segment_lengths)[:-1]])
+        self.path_length = float(self.segment_lengths.sum())
+        self.lap_length = float(lap_length) if lap_length else self.path_length
+        self.tree = cKDTree(self.points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the centerline's arrays, used by DataCache to size it."""
+        arrays = [self.points, self.segments, self.segment_lengths, self.vertex_distance]
+        # The tree holds a copy of the points and an index of about the same size
+        return int(sum(array.nbytes for array in arrays) + 2 * self.points.nbytes)
+
+    def to_local(self, gps_points: np.ndarray) -> np.ndarray:
+        """Local x/y metres of [lat, long] points around the centerline's origin."""
+        return RacingLineGenerator.gps_to_local(np.asarray(gps_points, dtype=np.float64), self.origin)
+
+    def project(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Project local x/y points onto the centerline.
+
+        Args:
+            points: (n, 2) local x/y metres
+
+        Returns:
+            (distance along the line in [0, lap_length), lateral offset in metres,
+            positive to the left of the direction of travel)
+        """
+        points = np.asarray(points, dtype=np.float64)
+        _, nearest = self.tree.query(points, workers=-1)
+
+        best_distance = np.full(len(points), np.inf)
+        station = np.zeros(len(points))
+        offset = np.zeros(len(points))
+        # The closest point of the line lies on a segment ending or starting at the nearest vertex
+        for start in ((nearest - 1) % len(self.points), nearest):
+            a = self.points[start]
+            segment = self.segments[start]
+            length = self.segment_lengths[start]
+            relative = points - a
+            t = np.clip(np.einsum('ij,ij->i', relative, segment) / np.maximum(length ** 2, 1e-12), 0.0, 1.0)
+            gap = relative - t[:, None] * segment
+            distance = np.hypot(gap[:, 0], gap[:, 1])
+
+            closer = distance < best_distance
+            best_distance[closer] = distance[closer]
+            station[closer] = (self.vertex_distance[start] + t * length)[closer]
+            cross = segment[:, 0] * relative[:, 1] - segment[:, 1] * relative[:, 0]
+            offset[closer] = (np.sign(cross) * distance)[closer]
+
+        scale = self.lap_length / self.path_length
+        return (station * scale) % self.lap_length, offset
+
+    def lap_distance(self, gps_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lap distance and lateral offset of one lap's GPS samples, in sample order.
+
+        Samples logged just before the line at the start of the lap project to the
+        end of the loop, and samples just after it at the end of the lap to its
+        start; these are unwrapped to slightly negative distances and to distances
+        past the lap length, so the result follows the lap's progress.
+
+        Args:
+            gps_points: (n, 2) [lat, long] of the lap's samples
+
+        Returns:
+            (lap distance in metres, lateral offset in metres)
+        """
+        distance, offset = self.project(self.to_local(gps_points))
+        half = self.lap_length / 2
+        first_half = np.arange(len(distance)) < len(distance) / 2
+        distance = np.where(first_half & (distance > half), distance - self.lap_length, distance)
+        distance = np.where(~first_half & (distance < half), distance + self.lap_length, distance)
+        return distance, offset
+
+    def to_dict(self) -> dict:
+        """The centerline ready for JSON."""
+        scale = self.lap_length / self.path_length
+        return {
+            'x': self.points[:, 0].tolist(),
+            'y': self.points[:, 1].tolist(),
+            'distance': (self.vertex_distance * scale).tolist(),
+            'origin': self.origin.tolist(),
+            'length': self.lap_length
+        }
+
+    @staticmethod
+    def lap_path(frame: pd.DataFrame, origin: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Local x/y path of a lap if it is clean enough to build a centerline from.
+
+        Args:
+            frame: Wide-format telemetry of one lap
+            origin: [lat, long] origin, the lap's first GPS sample if None
+
+        Returns:
+            (samples, 2) local x/y metres, or None if the lap is missing GPS, does not
+            close on itself or jumps between samples
+        """
+        if LAT_COLUMN not in frame.columns or LONG_COLUMN not in frame.columns or len(frame) < 10:
+            return None
+
+        gps = frame[[LAT_COLUMN, LONG_COLUMN]].to_numpy(np.float64)
+        valid = ~np.isnan(gps).any(axis=1)
+        if valid.mean() < MIN_GPS_COVERAGE:
+            return None
+
+        gps = gps[valid]
+        path = RacingLineGenerator.gps_to_local(gps, gps[0] if origin is None else origin)
+        steps = np.hypot(*np.diff(path, axis=0).T)
+        if np.hypot(*(path[-1] - path[0])) > MAX_CLOSING_GAP:
+            return None
+        if steps.max() > MAX_STEP_RATIO * max(np.median(steps), 1e-6):
+            return None
+        return path
+
+    @classmethod
+    def from_laps(cls, laps: Sequence[pd.DataFrame]) -> Optional["TrackCenterline"]:
+        """
+        Build a track's centerline from the cleanest of its laps.
+
+        Laps with full GPS that close on themselves without jumps are ranked by how
+        close their path length is to the median, which drops pit laps and
+        excursions. The median lap is resampled to evenly spaced vertices and every
+        chosen lap is projected onto it; averaging the samples that land on each
+        vertex, then smoothing, gives the centerline. When the laps logged the lap
+        trigger, distance along the line is scaled to its median lap length.
+
+        Args:
+            laps: Wide-format telemetry of a track's laps, each starting at the start/finish line
+
+        Returns:
+            TrackCenterline, or None if no lap is clean enough
+        """
+        paths: List[np.ndarray] = []
+        lap_lengths = []
+        origin = None
+        for frame in laps:
+            path = cls.lap_path(frame, origin)
+            if path is None:
+                continue
+            if origin is None:
+                gps = frame[[LAT_COLUMN, LONG_COLUMN]].dropna().to_numpy(np.float64)
+                origin = gps[0]
+            paths.append(path)
+            if DISTANCE_COLUMN in frame.columns and frame[DISTANCE_COLUMN].notna().any():
+                lap_lengths.append(float(frame[DISTANCE_COLUMN].max()))
+
+        if not paths:
+            logger.warning("No clean laps to build a centerline from")
+            return None
+
+        path_lengths = np.array([np.hypot(*np.diff(path, axis=0).T).sum() for path in paths])
+        ranked = np.argsort(np.abs(path_lengths - np.median(path_lengths)))[:CENTERLINE_LAPS]
+        chosen = [paths[i] for i in ranked]
+
+        # Seed: the lap closest to the median length, at evenly spaced vertices
+        seed = chosen[0]
+        seed_distance = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(seed, axis=0).T))])
+        stations = np.arange(0.0, seed_distance[-1], VERTEX_SPACING)
+        seed_line = cls(origin, np.column_stack([
+            np.interp(stations, seed_distance, seed[:, 0]),
+            np.interp(stations, seed_distance, seed[:, 1])
+        ]))
+
+        # Average every chosen lap's samples per vertex; the seed's own vertices keep every bin filled
+        samples = np.vstack(chosen)
+        station, _ = seed_line.project(samples)
+        vertex = np.rint(station / VERTEX_SPACING).astype(np.int64) % len(seed_line)
+        counts = np.bincount(vertex, minlength=len(seed_line)) + 1.0
+        averaged = np.column_stack([
+            (np.bincount(vertex, samples[:, axis], minlength=len(seed_line)) + seed_line.points[:, axis]) / counts
+            for axis in range(2)
+        ])
+
+        # Circular moving average, so the loop stays closed
+        window = 2 * SMOOTHING_RADIUS + 1
+        padded = np.vstack([averaged[-SMOOTHING_RADIUS:], averaged, averaged[:SMOOTHING_RADIUS]])
+        kernel = np.ones(window) / window
+        smoothed = np.column_stack([np.convolve(padded[:, axis], kernel, mode='valid') for axis in range(2)])
+
+        lap_length = float(np.median(lap_lengths)) if lap_lengths else None
+        logger.info(f"Built centerline from {len(chosen)} of {len(paths)} clean laps: "
+                    f"{len(smoothed)} vertices, {seed_distance[-1]:.0f} m path")
+        return cls(origin, smoothed, lap_length)
@@ -0,0 +1,249 @@
+from fastapi import Request, Response
+import gzip
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.http_cache import gzip_etag
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is listed in requirements.txt
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Same threshold as the GZipMiddleware in main.py
+GZIP_MIN_SIZE = 1000
+GZIP_LEVEL = 6
+
+# Values of the format query parameter accepted by frame endpoints
+RESPONSE_FORMATS = ("records", "columnar", "arrow", "msgpack")
+
+MEDIA_TYPES = {
+    "records": "application/json",
+    "columnar": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack"
+}
+
+
+def _default(obj: Any) -> Any:
+    """Encode values orjson has no native support for (pandas NA, timestamps)."""
+    if obj is None or (np.ndim(obj) == 0 and pd.isna(obj)):
+        return None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode_records(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as a JSON list of records, with NaN written as null.
+
+    Produces the same JSON as df.replace({nan: None}).to_dict('records') does
+    through FastAPI's encoder, without building an intermediate copy of the frame.
+
+    Args:
+        df: DataFrame to encode
+
+    Returns:
+        UTF-8 JSON bytes
+    """
+    if orjson is None:
+        return json.dumps(
+            df.replace({float('nan'): None}).to_dict('records'), default=_default
+        ).encode()
+
+    columns = [str(col) for col in df.columns]
+    values = [df[col].tolist() for col in df.columns]
+    records = [dict(zip(columns, row)) for row in zip(*values)]
+    return orjson.dumps(records, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _column_values(column: pd.Series) -> Any:
+    """Numeric columns as arrays, everything else as lists with NaN as None."""
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column.to_numpy()
+    return [None if value is None or (np.ndim(value) == 0 and pd.isna(value)) else value
+            for value in column.tolist()]
+
+
+def encode_columnar(df: pd.DataFrame, meta: Optional[Dict] = None) -> bytes:
+    """
+    Encode a DataFrame as one JSON array per column.
+
+    Column names appear once instead of once per row, and numeric arrays are
+    written straight from numpy. NaN is written as null.
+
+    Args:
+        df: DataFrame to encode
+        meta: Extra top-level fields, e.g. the row ranges of a batch's slices
+
+    Returns:
+        UTF-8 JSON bytes of {"columns": [...], "length": n, "data": {column: [...]}}
+    """
+    columns = [str(col) for col in df.columns]
+    data = {name: _column_values(df[col]) for name, col in zip(columns, df.columns)}
+    payload = {**(meta or {}), "columns": columns, "length": len(df), "data": data}
+
+    if orjson is None:
+        payload["data"] = {
+            name: [None if pd.isna(value) else value for value in values.tolist()]
+            if isinstance(values, np.ndarray) else values
+            for name, values in data.items()
+        }
+        return json.dumps(payload, default=_default).encode()
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as an Arrow IPC stream.
+
+    Args:
+        df: DataFrame to encode
+
+    Returns:
+        Arrow IPC stream bytes
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(df: pd.DataFrame, meta: Optional[Dict] = None) -> bytes:
+    """
+    Encode a DataFrame as msgpack with numeric columns as packed arrays.
+
+    Numeric columns are sent as raw little-endian bytes with their numpy dtype
+    string (e.g. '<f4'), so clients can wrap them in a typed array without
+    parsing. Other columns are sent as lists.
+
+    Args:
+        df: DataFrame to encode
+        meta: Extra top-level fields, e.g. the row ranges of a batch's slices
+
+    Returns:
+        msgpack bytes of {"columns": [...], "length": n, "data": {column: ...}}
+    """
+    data = {}
+    for col in df.columns:
+        values = _column_values(df[col])
+        if isinstance(values, np.ndarray):
+            values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+            data[str(col)] = {"dtype": values.dtype.str, "data": values.tobytes()}
+        else:
+            data[str(col)] = values
+    payload = {**(meta or {}), "columns": [str(col) for col in df.columns], "length": len(df), "data": data}
+    return msgpack.packb(payload, default=_default)
+
+
+# Formats whose payload can carry extra top-level fields
+META_FORMATS = ("columnar", "msgpack")
+
+ENCODERS = {
+    "records": encode_records,
+    "columnar": encode_columnar,
+    "arrow": encode_arrow,
+    "msgpack": encode_msgpack
+}
+
+
+class EncodedResponse:
+    """
+    A response body encoded once, plus its gzip-compressed variant.
+
+    Cached in DataCache in place of the DataFrame it was built from, so a cache hit
+    skips both JSON encoding and per-request compression.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self.gzip_body: Optional[bytes] = None
+        if len(body) >= GZIP_MIN_SIZE:
+            self.gzip_body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+    @classmethod
+    def from_records(cls, df: Optional[pd.DataFrame]) -> Optional["EncodedResponse"]:
+        """Encode a DataFrame as JSON records, or return None when there is no frame."""
+        return cls.from_frame(df, "records")
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame], response_format: str,
+                   float32: bool = False, meta: Optional[Dict] = None) -> Optional["EncodedResponse"]:
+        """
+        Encode a DataFrame in one of RESPONSE_FORMATS.
+
+        Args:
+            df: DataFrame to encode, or None
+            response_format: 'records', 'columnar', 'arrow' or 'msgpack'
+            float32: Send float columns as float32 in the array formats, for data
+                such as telemetry that is only float32-precise at the source
+            meta: Extra top-level fields, for one of META_FORMATS
+
+        Returns:
+            EncodedResponse or None when there is no frame
+        """
+        if df is None:
+            return None
+        if float32 and response_format != "records":
+            float64_columns = [col for col, dtype in df.dtypes.items() if dtype == np.float64]
+            if float64_columns:
+                df = df.astype({col: np.float32 for col in float64_columns})
+        if meta is not None:
+            return cls(ENCODERS[response_format](df, meta), MEDIA_TYPES[response_format])
+        return cls(ENCODERS[response_format](df), MEDIA_TYPES[response_format])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the encoded variants, used for cache size accounting."""
+        return len(self.body) + len(self.gzip_body or b"")
+
+    def to_response(self, request: Request, etag: Optional[str] = None,
+                    cache_control: Optional[str] = None) -> Response:
+        """
+        Build the response for a request, choosing gzip when the client accepts it.
+
+        The compressed body is sent with Content-Encoding set, which the GZip
+        middleware passes through untouched.
+
+        Args:
+            request: Incoming request
+            etag: ETag of the identity body; the gzip variant gets a suffixed ETag
+            cache_control: Cache-Control header value
+
+        Returns:
+            Response with the encoded body
+        """
+        headers = {"Vary": "Accept-Encoding"}
+        if cache_control is not None:
+            headers["Cache-Control"] = cache_control
+
+        if self.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            if etag is not None:
+                headers["ETag"] = gzip_etag(etag)
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+
+        if etag is not None:
+            headers["ETag"] = etag
+        return Response(self.body, media_type=self.media_type, headers=headers)
@@ -0,0 +1,110 @@
+from fastapi import Request, Response
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.fingerprint import file_signature
+
+# Rendered maps change only when their PDF does, and then get a new ETag
+MAP_CACHE_CONTROL = "public, max-age=86400"
+
+# Race data is immutable once its CSVs are on disk; a replaced file changes the ETag
+DATA_CACHE_CONTROL = "public, max-age=86400"
+
+# Suffix marking the ETag of a gzip-encoded variant, which differs byte-wise from the identity body
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def source_etag(sources: List[Path], *parts: Any) -> str:
+    """
+    Strong ETag for a response derived from source files, computed without reading them.
+
+    Args:
+        sources: Files the response body is built from
+        *parts: Everything else the body depends on, e.g. query parameters and
+            DataCleaner.decision_hash()
+
+    Returns:
+        Quoted ETag that changes whenever a source file or a part changes
+    """
+    stored = {
+        "sources": [file_signature(source) for source in sources],
+        "parts": [str(part) for part in parts]
+    }
+    return '"' + hashlib.sha1(json.dumps(stored, sort_keys=True).encode()).hexdigest() + '"'
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip-encoded variant of a body."""
+    return etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the client's If-None-Match header already covers an ETag.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match; a cached gzip
+    # variant is as current as the identity body it was compressed from
+    candidates = {
+        tag.strip().removeprefix("W/").replace(GZIP_ETAG_SUFFIX + '"', '"')
+        for tag in if_none_match.split(",")
+    }
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(request: Request, etag: Optional[str], cache_control: str) -> Optional[Response]:
+    """
+    Answer a revalidation request before any data is loaded.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource, or None if it cannot be computed
+        cache_control: Cache-Control header value
+
+    Returns:
+        304 response if the client's copy is current, else None
+    """
+    if etag is None or not etag_matches(request, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def conditional_response(request: Request, body: bytes, media_type: str, etag: str,
+                         cache_control: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Build a response that answers revalidation requests with 304 Not Modified.
+
+    Args:
+        request: Incoming request
+        body: Full response body
+        media_type: Content type of the body
+        etag: ETag of the body
+        cache_control: Cache-Control header value
+        headers: Extra headers for the full response
+
+    Returns:
+        304 response without a body if the client copy is current, else the full response
+    """
+    response = not_modified(request, etag, cache_control)
+    if response is not None:
+        return response
+    cache_headers = {"ETag": etag, "Cache-Control": cache_control}
+    return Response(body, media_type=media_type, headers={**(headers or {}), **cache_headers})
@@ -1,9 +1,17 @@
+import asyncio
+import time
+
+# Start of the cold-start clock reported by /ready
+IMPORT_STARTED_AT = time.time()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 import logging
 import pandas as pd
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
 
 logging.basicConfig(
     level=logging.INFO,
@@ -54,72 +62,178 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
-from fastapi import HTTPException, WebSocket
+from fastapi import HTTPException, Query, Request, WebSocket
+from fastapi.responses import JSONResponse
+from config import CACHE_ENCODED_RESPONSES, WARM_UP_ON_STARTUP
+from constants import DISTANCE_GRID_MIN_STEP, TELEMETRY_BATCH_MAX_SLICES, TELEMETRY_WINDOW_MAX_WIDTH
 from data_processing.dataset_manager import DatasetManager
 from data_processing.data_cleaner import DataCleaner
 from data_processing.data_cache import DataCache
+from data_processing.channel_store import ChannelStore
+from data_processing.artifact_cache import ArtifactCache
+from data_processing.distance_resampler import DEFAULT_GRID_STEP, resample_lap, time_deltas
+from data_processing.downsampling import DOWNSAMPLING_METHODS, downsample
+from data_processing.telemetry_pyramid import LapPyramid, WINDOW_AXES
+from utils.worker_pool import WorkerPool
+from utils.track_map import TrackMapCache
 from analytics.lap_analyzer import LapAnalyzer
 from analytics.performance_metrics import PerformanceMetrics
-from analytics.racing_line import RacingLineGenerator
+from analytics.racing_line import RacingLineGenerator, RacingLineSet
 from strategy.strategy_engine import StrategyEngine
 from api.websocket_handler import RaceSimulator
+from api.encoded_response import EncodedResponse, META_FORMATS, RESPONSE_FORMATS
+from api.http_cache import conditional_response, not_modified, source_etag, DATA_CACHE_CONTROL, MAP_CACHE_CONTROL
+from api.startup import FirstResponseMiddleware, StartupMetrics, WarmUp
+
+startup_metrics = StartupMetrics(IMPORT_STARTED_AT)
+app.add_middleware(FirstResponseMiddleware, metrics=startup_metrics)
 
+worker_pool = WorkerPool()
 dataset_manager = DatasetManager()
 data_cleaner = DataCleaner()
-data_cache = DataCache()
+data_cache = DataCache(executor=worker_pool.threads)
+channel_store = ChannelStore()
+artifact_cache = ArtifactCache()
+# Renders go to the process pool when enabled; thread mode renders inline in the request's worker
+track_map_cache = TrackMapCache(render_executor=worker_pool.processes)
 lap_analyzer = LapAnalyzer()
 performance_metrics = PerformanceMetrics()
 racing_line_generator = RacingLineGenerator()
 strategy_engine = StrategyEngine()
-race_simulator = RaceSimulator(dataset_manager, data_cleaner)
+race_simulator = RaceSimulator(dataset_manager, data_cleaner, artifact_cache, executor=worker_pool.threads)
+warm_up = WarmUp()
 
-data_cache.warm_cache(dataset_manager)
+def cleaned_lap_data(track: str, race_num: int):
+    """Blocking variant of load_cleaned_lap_data for use inside cache computations."""
+    return data_cache.get_or_compute(
+        f"{track}_{race_num}_laps",
+        lambda: artifact_cache.load_lap_data(track, race_num, dataset_manager, data_cleaner)
+    )
+
+async def load_cleaned_lap_data(track: str, race_num: int):
+    """
+    Get cleaned lap data for a race through the shared laps cache entry.
+    
+    /laps, /drivers, /analytics and /strategy all read this key, so when a race is
+    first opened their concurrent requests share a single load and clean.
+    """
+    return await data_cache.aget_or_compute(
+        f"{track}_{race_num}_laps",
+        lambda: artifact_cache.load_lap_data(track, race_num, dataset_manager, data_cleaner)
+    )
+
+def check_response_format(response_format: str) -> None:
+    """Reject unknown values of the format query parameter."""
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{response_format}'. Use one of: {', '.join(RESPONSE_FORMATS)}"
+        )
+
+def check_downsampling_method(method: str) -> None:
+    """Reject unknown values of the method query parameter."""
+    if method not in DOWNSAMPLING_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown method '{method}'. Use one of: {', '.join(DOWNSAMPLING_METHODS)}"
+        )
+
+def race_etag(sources, *parts):
+    """
+    ETag of a race data response, from its source files and request parameters.
+    
+    Computed from file sizes and mtimes only, so a revalidation is answered
+    without loading or serializing any data. The ETag does not record whether
+    the source CSV, the Parquet store or the channel arrays served the body, so
+    every read path must return the same values (telemetry is float32 in all).
+    
+    Args:
+        sources: Source files of the response, None or empty if the race has none
+        *parts: Request parameters and cleaning decisions the body depends on
+        
+    Returns:
+        Quoted ETag, or None if there are no source files
+    """
+    sources = [source for source in (sources or []) if source is not None]
+    if not sources:
+        return None
+    return source_etag(sources, app.version, *parts)
+
+async def load_encoded_frame(body_key: str, load_frame, response_format: str = "records", float32: bool = False):
+    """
+    Get a DataFrame encoded in a response format, reusing cached bytes when enabled.
+    
+    Args:
+        body_key: Cache key for the encoded body, without the format
+        load_frame: Blocking function returning the DataFrame or None
+        response_format: One of RESPONSE_FORMATS
+        float32: Send float columns as float32 in the array formats
+        
+    Returns:
+        EncodedResponse or None if load_frame returned None
+    """
+    def encode():
+        return EncodedResponse.from_frame(load_frame(), response_format, float32=float32)
+    
+    if CACHE_ENCODED_RESPONSES:
+        return await data_cache.aget_or_compute(f"{body_key}_{response_format}", encode)
+    return await worker_pool.run(encode)
 
 @app.get("/api/races")
 async def get_available_races():
     """Get list of all available races."""
-    races = dataset_manager.get_available_races()
+    races = await worker_pool.run(dataset_manager.get_available_races)
     return {
         "tracks": races,
         "total_races": sum(len(r) for r in races.values())
     }
 
 @app.get("/api/races/{track}/{race_num}")
-async def get_race_metadata(track: str, race_num: int):
+async def get_race_metadata(track: str, race_num: int, request: Request):
     """Get metadata for specific race."""
-    cache_key = f"{track}_{race_num}_metadata"
-    cached = data_cache.get(cache_key)
-    
-    if cached is not None:
-        return cached.to_dict('records')
+    etag = race_etag([dataset_manager.get_results_file(track, race_num)], "metadata")
+    cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+    if cached_copy is not None:
+        return cached_copy
     
-    results = dataset_manager.load_race_results(track, race_num)
-    if results is None:
+    cache_key = f"{track}_{race_num}_metadata"
+    encoded = await load_encoded_frame(
+        f"{cache_key}_body",
+        lambda: data_cache.get_or_compute(cache_key, lambda: dataset_manager.load_race_results(track, race_num))
+    )
+    if encoded is None:
         raise HTTPException(status_code=404, detail=f"Race data not found for {track} Race {race_num}")
     
-    data_cache.put(cache_key, results)
-    return results.to_dict('records')
+    return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
 
 @app.get("/api/races/{track}/{race_num}/laps")
-async def get_lap_data(track: str, race_num: int):
-    """Get all lap data for specific race."""
+async def get_lap_data(track: str, race_num: int, request: Request,
+                       response_format: str = Query("records", alias="format")):
+    """
+    Get all lap data for specific race.
+    
+    Args:
+        response_format: 'records' (default), 'columnar', 'arrow' or 'msgpack'
+    """
+    check_response_format(response_format)
     try:
-        cache_key = f"{track}_{race_num}_laps"
-        cached = data_cache.get(cache_key)
-        
-        if cached is not None:
-            # Replace NaN with None for JSON serialization
-            return cached.replace({float('nan'): None}).to_dict('records')
+        etag = race_etag(
+            dataset_manager.get_lap_data_files(track, race_num),
+            "laps", response_format, DataCleaner.decision_hash("laps")
+        )
+        cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+        if cached_copy is not None:
+            return cached_copy
         
-        lap_data = dataset_manager.load_lap_data(track, race_num)
-        if lap_data is None:
+        encoded = await load_encoded_frame(
+            f"{track}_{race_num}_laps_body", lambda: cleaned_lap_data(track, race_num), response_format
+        )
+        if encoded is None:
             raise HTTPException(status_code=404, detail=f"Lap data not found for {track} Race {race_num}")
         
-        cleaned_data = data_cleaner.clean_lap_data(lap_data)
-        data_cache.put(cache_key, cleaned_data)
-        
-        # Replace NaN with None for JSON serialization
-        return cleaned_data.replace({float('nan'): None}).to_dict('records')
+        return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error loading lap data for {track} Race {race_num}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -134,12 +248,10 @@ async def get_drivers(track: str, race_num: int):
         if cached is not None:
             return {"drivers": cached}
         
-        lap_data = dataset_manager.load_lap_data(track, race_num)
-        if lap_data is None:
+        cleaned_data = await load_cleaned_lap_data(track, race_num)
+        if cleaned_data is None:
             raise HTTPException(status_code=404, detail=f"Lap data not found for {track} Race {race_num}")
         
-        cleaned_data = data_cleaner.clean_lap_data(lap_data)
-        
         # Get unique drivers and sort them
         unique_drivers = sorted(cleaned_data['NUMBER'].unique().tolist(), key=lambda x: int(x) if x.isdigit() else 999)
         
@@ -147,185 +259,661 @@ async def get_drivers(track: str, race_num: int):
         data_cache.put(cache_key, unique_drivers)
         
         return {"drivers": unique_drivers}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error loading drivers for {track} Race {race_num}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/maps/{track}")
-async def get_track_map(track: str):
-    """Get track map as image for specific track."""
+async def get_track_map(track: str, request: Request, zoom: float = Query(2.0, gt=0, le=8)):
+    """
+    Get track map as image for specific track.
+    
+    Args:
+        zoom: Render scale, snapped to the closest of 0.5, 1, 2, 4 and 8
+    """
     try:
-        from config import DATASET_DIR
-        import fitz
-        from io import BytesIO
-        from fastapi.responses import StreamingResponse
-        
-        # Map track names to PDF filenames
-        track_map_files = {
-            "barber": "Barber_Circuit_Map.pdf",
-            "COTA": "COTA_Circuit_Map.pdf",
-            "Road America": "Road_America_Map.pdf",
-            "Sebring": "Sebring_Track_Sector_Map.pdf",
-            "Sonoma": "Sonoma_Map.pdf",
-            "VIR": "VIR_map.pdf"
-        }
-        
-        if track not in track_map_files:
+        # Rendered once per track, zoom level and PDF version, then served from memory or disk
+        image = await worker_pool.run(track_map_cache.get_map, track, zoom)
+        if image is None:
             raise HTTPException(status_code=404, detail=f"Track map not found for {track}")
         
-        map_path = DATASET_DIR / "Maps" / track_map_files[track]
-        
-        if not map_path.exists():
-            logger.error(f"Track map file not found: {map_path}")
-            raise HTTPException(status_code=404, detail=f"Track map file not found")
-        
-        # Open PDF and convert first page to image
-        pdf_document = fitz.open(str(map_path))
-        page = pdf_document[0]
-        
-        # Render page to image at high resolution
-        mat = fitz.Matrix(2.0, 2.0)
-        pix = page.get_pixmap(matrix=mat)
-        
-        # Convert to PNG bytes
-        img_byte_arr = BytesIO(pix.tobytes("png"))
-        img_byte_arr.seek(0)
+        return conditional_response(request, image.body, image.media_type, image.etag, MAP_CACHE_CONTROL)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving track map for {track}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def load_track_centerline(track: str, build_missing: bool = False):
+    """
+    Get a track's centerline, cached after first use.
+    
+    Building one reads every lap of every race at the track, so request handlers
+    only load the one built by preprocess.py or warm-up and get None until it exists.
+    
+    Args:
+        track: Track name
+        build_missing: Build the centerline if no prebuilt one exists (warm-up only)
+    """
+    key = f"{track}_centerline"
+    centerline = data_cache.get_or_compute(
+        key,
+        lambda: artifact_cache.load_centerline(track, dataset_manager, data_cleaner, channel_store,
+                                               build_missing=False)
+    )
+    if centerline is None and build_missing:
+        centerline = artifact_cache.load_centerline(track, dataset_manager, data_cleaner, channel_store)
+        if centerline is not None:
+            data_cache.put(key, centerline)
+    return centerline
+
+@app.get("/api/maps/{track}/centerline")
+async def get_track_centerline(track: str):
+    """
+    Get a track's reference centerline in local x/y meters.
+    
+    Built from the cleanest laps of all the track's races by preprocess.py or warm-up,
+    and used to project GPS samples to lap distance. `distance` is each vertex's lap
+    distance and `origin` the [lat, long] the coordinates are relative to.
+    """
+    try:
+        centerline = await worker_pool.run(load_track_centerline, track)
+        if centerline is None:
+            raise HTTPException(status_code=404, detail=f"No centerline has been built for {track}")
         
-        pdf_document.close()
+        return centerline.to_dict()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building centerline for {track}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/maps/{track}/tiles")
+async def get_track_map_tiles(track: str):
+    """Get the tile pyramid layout of a track map."""
+    try:
+        info = await worker_pool.run(track_map_cache.tile_info, track)
+        if info is None:
+            raise HTTPException(status_code=404, detail=f"Track map not found for {track}")
         
-        return StreamingResponse(
-            img_byte_arr,
-            media_type="image/png",
-            headers={
-                "Cache-Control": "public, max-age=86400"
-            }
+        info["url"] = f"/api/maps/{track}/tiles/{{z}}/{{x}}/{{y}}.{{format}}"
+        return info
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error describing track map tiles for {track}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/maps/{track}/tiles/{z}/{x}/{tile}")
+async def get_track_map_tile(track: str, z: int, x: int, tile: str, request: Request):
+    """Get one tile of a track map, addressed as z/x/y.png or z/x/y.webp."""
+    y, _, image_format = tile.partition(".")
+    if not y.isdigit() or image_format not in track_map_cache.image_formats():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown tile '{tile}'. Use <y>.{' or <y>.'.join(track_map_cache.image_formats())}"
         )
+    
+    try:
+        image = await worker_pool.run(track_map_cache.get_tile, track, z, x, int(y), image_format)
+        if image is None:
+            raise HTTPException(status_code=404, detail=f"Tile {z}/{x}/{tile} not found for {track}")
+        
+        return conditional_response(request, image.body, image.media_type, image.etag, MAP_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error serving track map for {track}: {e}", exc_info=True)
+        logger.error(f"Error serving track map tile {z}/{x}/{tile} for {track}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def load_sampled_telemetry(track: str, race_num: int, lap: int, driver: str, sample_rate: int,
+                           points: Optional[int] = None, method: str = "lttb"):
+    """Load, clean, filter and sample telemetry for one telemetry request."""
+    # Push the driver filter down into the loader when it is a car number
+    vehicle = int(driver) if driver is not None and str(driver).isdigit() else None
+    if driver is not None and vehicle is None:
+        # Telemetry is keyed by car number, so no car matches any other driver string
+        raise HTTPException(status_code=404, detail=f"No telemetry data found for driver {driver} on lap {lap}")
+    
+    # Serve prebuilt channel arrays when available, skipping parse and clean
+    cleaned_telemetry = None
+    telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+    if vehicle is not None and telemetry_file is not None:
+        cleaned_telemetry = channel_store.load_lap(track, race_num, lap, vehicle, telemetry_file)
+    
+    if cleaned_telemetry is None:
+        cleaned_telemetry = artifact_cache.load_telemetry_data(
+            track, race_num, lap, vehicle, dataset_manager, data_cleaner
+        )
+        if cleaned_telemetry is None or cleaned_telemetry.empty:
+            raise HTTPException(status_code=404, detail=f"Telemetry data not found for lap {lap}")
+    
+    return sample_telemetry(cleaned_telemetry, sample_rate, points, method)
+
+def sample_telemetry(telemetry: pd.DataFrame, sample_rate: int, points: Optional[int] = None,
+                     method: str = "lttb") -> pd.DataFrame:
+    """
+    Reduce a lap's telemetry for transfer.
+    
+    With a point budget, the lap is downsampled to at most that many rows keeping
+    each channel's peaks. Otherwise every Nth point is kept when the lap has more
+    than 10000 points.
+    """
+    if points is not None:
+        return downsample(telemetry, points, method)
+    if len(telemetry) > 10000:
+        sampled_telemetry = telemetry.iloc[::sample_rate].copy()
+        logger.info(f"Sampled telemetry from {len(telemetry)} to {len(sampled_telemetry)} points")
+        return sampled_telemetry
+    return telemetry
+
+def telemetry_cache_key(track: str, race_num: int, lap: int, driver, sample_rate: int,
+                        points: Optional[int] = None, method: str = "lttb") -> str:
+    """Cache key of one lap's sampled telemetry, shared by the single and batch endpoints."""
+    sampling = f"sample_{sample_rate}" if points is None else f"points_{points}_{method}"
+    return f"{track}_{race_num}_telemetry_lap_{lap}_driver_{driver}_{sampling}"
+
 @app.get("/api/races/{track}/{race_num}/telemetry/{lap}")
-async def get_telemetry_data(track: str, race_num: int, lap: int, driver: str = None, sample_rate: int = 20):
+async def get_telemetry_data(track: str, race_num: int, lap: int, request: Request, driver: str = None,
+                             sample_rate: int = 20, points: Optional[int] = Query(None, ge=3),
+                             method: str = "lttb", response_format: str = Query("records", alias="format")):
     """
     Get telemetry data for specific lap and driver.
     
     Args:
         driver: Driver number to filter telemetry (optional)
         sample_rate: Return every Nth point (default 20 for 20x reduction)
+        points: Return at most this many points, chosen to keep each channel's
+            shape and peaks; replaces sample_rate when given
+        method: Downsampling used with points, 'lttb' (default) or 'minmax'
+        response_format: 'records' (default), 'columnar' (one JSON array per channel),
+            'arrow' (Arrow IPC stream) or 'msgpack' (packed numeric arrays)
     """
+    check_response_format(response_format)
+    check_downsampling_method(method)
     try:
-        cache_key = f"{track}_{race_num}_telemetry_lap_{lap}_driver_{driver}_sample_{sample_rate}"
-        cached = data_cache.get(cache_key)
+        etag = race_etag(
+            [dataset_manager.get_telemetry_file(track, race_num)],
+            "telemetry", lap, driver, sample_rate, points, method, response_format,
+            DataCleaner.decision_hash("telemetry")
+        )
+        cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+        if cached_copy is not None:
+            return cached_copy
         
-        if cached is not None:
-            # Replace NaN with None for JSON serialization
-            return cached.replace({float('nan'): None}).to_dict('records')
+        cache_key = telemetry_cache_key(track, race_num, lap, driver, sample_rate, points, method)
         
-        telemetry = dataset_manager.load_telemetry_data(track, race_num, lap)
-        if telemetry is None or telemetry.empty:
-            raise HTTPException(status_code=404, detail=f"Telemetry data not found for lap {lap}")
+        # The frame is cached once and shared by every format's encoded body
+        def load_frame():
+            return data_cache.get_or_compute(
+                cache_key, lambda: load_sampled_telemetry(track, race_num, lap, driver, sample_rate, points, method)
+            )
         
-        cleaned_telemetry = data_cleaner.clean_telemetry_data(telemetry)
+        # Telemetry channels are float32 at the source, so array formats send float32
+        encoded = await load_encoded_frame(f"{cache_key}_body", load_frame, response_format, float32=True)
         
-        # Filter by driver if specified
-        if driver is not None:
-            # Try both string and int comparison for driver number
-            driver_str = str(driver)
-            try:
-                driver_int = int(driver)
-            except:
-                driver_int = None
-            
-            logger.info(f"Filtering telemetry for driver {driver_str}, lap {lap}")
-            logger.info(f"Available columns: {cleaned_telemetry.columns.tolist()}")
-            logger.info(f"Rows before filter: {len(cleaned_telemetry)}")
-            
-            if 'vehicle_number' in cleaned_telemetry.columns:
-                # Try int comparison first, then string
-                if driver_int is not None:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['vehicle_number'] == driver_int]
-                if cleaned_telemetry.empty and driver_str:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['vehicle_number'] == driver_str]
-                logger.info(f"Filtered by vehicle_number, rows after: {len(cleaned_telemetry)}")
-            elif 'NUMBER' in cleaned_telemetry.columns:
-                if driver_int is not None:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['NUMBER'] == driver_int]
-                if cleaned_telemetry.empty and driver_str:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['NUMBER'] == driver_str]
-                logger.info(f"Filtered by NUMBER, rows after: {len(cleaned_telemetry)}")
-            elif 'number' in cleaned_telemetry.columns:
-                if driver_int is not None:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['number'] == driver_int]
-                if cleaned_telemetry.empty and driver_str:
-                    cleaned_telemetry = cleaned_telemetry[cleaned_telemetry['number'] == driver_str]
-                logger.info(f"Filtered by number, rows after: {len(cleaned_telemetry)}")
-            else:
-                logger.warning(f"No driver column found in telemetry data!")
-            
-            if cleaned_telemetry.empty:
-                raise HTTPException(status_code=404, detail=f"No telemetry data found for driver {driver} on lap {lap}")
+        # NaN is encoded as null
+        return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading telemetry for {track} Race {race_num} Lap {lap}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def load_lap_pyramid(track: str, race_num: int, lap: int, vehicle: int) -> Optional[LapPyramid]:
+    """
+    Get a lap's telemetry pyramid.
+    
+    Served from the prebuilt channel arrays when they exist; otherwise the pyramid
+    is built once from the cleaned lap and cached.
+    """
+    telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+    if telemetry_file is None:
+        return None
+    
+    pyramid = channel_store.load_lap_pyramid(track, race_num, lap, vehicle, telemetry_file)
+    if pyramid is not None:
+        return pyramid
+    
+    def build():
+        cleaned = artifact_cache.load_telemetry_data(track, race_num, lap, vehicle, dataset_manager, data_cleaner)
+        if cleaned is None or cleaned.empty:
+            return None
+        return LapPyramid.from_frame(cleaned, lap)
+    
+    return data_cache.get_or_compute(f"{track}_{race_num}_telemetry_pyramid_lap_{lap}_driver_{vehicle}", build)
+
+def encode_telemetry_window(track: str, race_num: int, lap: int, driver: int, axis: str, start: Optional[float],
+                            end: Optional[float], width: int, response_format: str) -> Optional[EncodedResponse]:
+    """Select and encode a telemetry window, or None if the lap has no telemetry."""
+    pyramid = load_lap_pyramid(track, race_num, lap, driver)
+    if pyramid is None:
+        return None
+    
+    frame, level = pyramid.window(axis, start, end, width)
+    return EncodedResponse.from_frame(frame, response_format, float32=True, meta={
+        "lap": lap, "driver": driver, "axis": axis, "level": level, "levels": len(pyramid.levels) + 1
+    })
+
+@app.get("/api/races/{track}/{race_num}/telemetry/{lap}/window")
+async def get_telemetry_window(track: str, race_num: int, lap: int, driver: int, request: Request,
+                               axis: str = "time", start: Optional[float] = None, end: Optional[float] = None,
+                               width: int = Query(1000, ge=1, le=TELEMETRY_WINDOW_MAX_WIDTH),
+                               response_format: str = Query("columnar", alias="format")):
+    """
+    Get a window of a lap's telemetry at the resolution a chart needs.
+    
+    Each lap has a precomputed pyramid of min/max downsampled levels (full, 1/4,
+    1/16, ... of its points). The window is cut from the finest level that gives
+    at most two points per pixel of chart width, so pan and zoom are served
+    without reloading or resampling the lap. Rows carry an `elapsed` column
+    (seconds into the lap); `level` is the level used, 0 being full resolution.
+    
+    Args:
+        driver: Driver number
+        axis: 'time' (default, seconds into the lap) or 'distance' (metres into the lap)
+        start: Window start on the axis (optional, lap start if omitted)
+        end: Window end on the axis (optional, lap end if omitted)
+        width: Chart width in pixels (default 1000)
+        response_format: 'columnar' (default) or 'msgpack'
+    """
+    if response_format not in META_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{response_format}'. Use one of: {', '.join(META_FORMATS)}"
+        )
+    if axis not in WINDOW_AXES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown axis '{axis}'. Use one of: {', '.join(WINDOW_AXES)}"
+        )
+    
+    try:
+        etag = race_etag(
+            [dataset_manager.get_telemetry_file(track, race_num)],
+            "telemetry_window", lap, driver, axis, start, end, width, response_format,
+            DataCleaner.decision_hash("telemetry")
+        )
+        cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+        if cached_copy is not None:
+            return cached_copy
         
-        # Sample data to reduce size (every Nth point)
+        encoded = await worker_pool.run(
+            encode_telemetry_window, track, race_num, lap, driver, axis, start, end, width, response_format
+        )
+        if encoded is None:
+            raise HTTPException(status_code=404, detail=f"No telemetry data found for driver {driver} on lap {lap}")
+        return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error loading telemetry window for {track} Race {race_num} Lap {lap}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+class TelemetrySlice(BaseModel):
+    """One (driver, lap) pair of a batch telemetry request."""
+    driver: int
+    lap: int
+
+class TelemetryBatchRequest(BaseModel):
+    """Body of a batch telemetry request."""
+    slices: List[TelemetrySlice] = Field(..., min_length=1, max_length=TELEMETRY_BATCH_MAX_SLICES)
+    sample_rate: int = Field(20, ge=1)
+    points: Optional[int] = Field(None, ge=3)
+    method: str = "lttb"
+    format: str = "columnar"
+
+def load_lap_batch(track: str, race_num: int, keys: List[Tuple[int, int]], cache_key: Callable[[int, int], str],
+                   transform: Callable[[pd.DataFrame], Any]) -> Dict[Tuple[int, int], Any]:
+    """
+    Compute a per-lap result for several (vehicle, lap) pairs with one pass over the data.
+    
+    Each pair is served from its cache entry, then from prebuilt channel arrays;
+    the rest are loaded and cleaned together by ArtifactCache.load_telemetry_slices.
+    Each cleaned lap goes through transform and the result is cached per pair.
+    
+    Args:
+        track: Track name
+        race_num: Race number
+        keys: (vehicle_number, lap) pairs
+        cache_key: Function of (vehicle, lap) giving the pair's cache key
+        transform: Function of a cleaned lap giving the result, or None to drop the pair
         
-        if len(cleaned_telemetry) > 10000:
-            sampled_telemetry = cleaned_telemetry.iloc[::sample_rate].copy()
-            logger.info(f"Sampled telemetry from {len(cleaned_telemetry)} to {len(sampled_telemetry)} points")
+    Returns:
+        Dictionary mapping each pair with a result to it
+    """
+    results = {}
+    pending = []
+    for vehicle, lap in keys:
+        cached = data_cache.get(cache_key(vehicle, lap))
+        if cached is not None:
+            results[(vehicle, lap)] = cached
+        else:
+            pending.append((vehicle, lap))
+    
+    telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+    if not pending or telemetry_file is None:
+        return results
+    
+    cleaned = {}
+    remaining = []
+    for vehicle, lap in pending:
+        frame = channel_store.load_lap(track, race_num, lap, vehicle, telemetry_file)
+        if frame is not None:
+            cleaned[(vehicle, lap)] = frame
         else:
-            sampled_telemetry = cleaned_telemetry
+            remaining.append((vehicle, lap))
+    cleaned.update(artifact_cache.load_telemetry_slices(track, race_num, remaining, dataset_manager, data_cleaner))
+    
+    for (vehicle, lap), frame in cleaned.items():
+        result = transform(frame)
+        if result is None:
+            continue
+        data_cache.put(cache_key(vehicle, lap), result)
+        results[(vehicle, lap)] = result
+    return results
+
+def load_telemetry_batch(track: str, race_num: int, keys: List[Tuple[int, int]], sample_rate: int,
+                         points: Optional[int] = None, method: str = "lttb") -> Dict[Tuple[int, int], pd.DataFrame]:
+    """Load sampled telemetry for several (vehicle, lap) pairs, sharing the single-lap endpoint's cache entries."""
+    return load_lap_batch(
+        track, race_num, keys,
+        lambda vehicle, lap: telemetry_cache_key(track, race_num, lap, vehicle, sample_rate, points, method),
+        lambda frame: sample_telemetry(frame, sample_rate, points, method)
+    )
+
+def load_distance_laps(track: str, race_num: int, keys: List[Tuple[int, int]],
+                       step: float) -> Dict[Tuple[int, int], pd.DataFrame]:
+    """Load several (vehicle, lap) pairs resampled onto a lap-distance grid, cached per lap and step."""
+    return load_lap_batch(
+        track, race_num, keys,
+        lambda vehicle, lap: f"{track}_{race_num}_distance_lap_{lap}_driver_{vehicle}_step_{step:g}",
+        lambda frame: resample_lap(frame, step)
+    )
+
+def encode_telemetry_batch(frames: Dict[Tuple[int, int], pd.DataFrame], keys: List[Tuple[int, int]],
+                           response_format: str, meta: Optional[Dict] = None) -> EncodedResponse:
+    """Concatenate the slices of a batch in request order and encode them with their row ranges."""
+    slices = []
+    missing = []
+    parts = []
+    offset = 0
+    for vehicle, lap in keys:
+        frame = frames.get((vehicle, lap))
+        if frame is None:
+            missing.append({"driver": vehicle, "lap": lap})
+            continue
+        slices.append({"driver": vehicle, "lap": lap, "offset": offset, "length": len(frame)})
+        parts.append(frame)
+        offset += len(frame)
+    
+    # Channels a slice did not log are null in its rows
+    combined = pd.concat(parts, ignore_index=True, sort=False)
+    return EncodedResponse.from_frame(
+        combined, response_format, float32=True, meta={**(meta or {}), "slices": slices, "missing": missing}
+    )
+
+@app.post("/api/races/{track}/{race_num}/telemetry/batch")
+async def get_telemetry_batch(track: str, race_num: int, batch: TelemetryBatchRequest, request: Request):
+    """
+    Get telemetry for several (driver, lap) pairs in one request.
+    
+    Every lap needed is read once, in one pass over the store or CSV. The slices
+    are returned in one columnar body: their rows are concatenated in request
+    order and `slices` gives each pair's `offset` and `length` into the columns.
+    Pairs without telemetry are listed in `missing`.
+    
+    Args:
+        batch: slices (list of {driver, lap}), sample_rate (default 20), points
+            and method as for single-lap telemetry, and format, 'columnar'
+            (default) or 'msgpack'
+    """
+    if batch.format not in META_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{batch.format}'. Use one of: {', '.join(META_FORMATS)}"
+        )
+    check_downsampling_method(batch.method)
+    
+    keys = list(dict.fromkeys((item.driver, item.lap) for item in batch.slices))
+    try:
+        frames = await worker_pool.run(
+            load_telemetry_batch, track, race_num, keys, batch.sample_rate, batch.points, batch.method
+        )
+        if not frames:
+            raise HTTPException(status_code=404, detail=f"Telemetry data not found for {track} Race {race_num}")
         
-        data_cache.put(cache_key, sampled_telemetry)
+        encoded = await worker_pool.run(encode_telemetry_batch, frames, keys, batch.format)
+        return encoded.to_response(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading telemetry batch for {track} Race {race_num}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+class DistanceBatchRequest(BaseModel):
+    """Body of a distance-aligned telemetry request."""
+    slices: List[TelemetrySlice] = Field(..., min_length=1, max_length=TELEMETRY_BATCH_MAX_SLICES)
+    step: float = Field(DEFAULT_GRID_STEP, ge=DISTANCE_GRID_MIN_STEP)
+    channels: Optional[List[str]] = None
+    format: str = "columnar"
+
+def encode_distance_batch(frames: Dict[Tuple[int, int], pd.DataFrame], keys: List[Tuple[int, int]],
+                          channels: Optional[List[str]], step: float, response_format: str) -> EncodedResponse:
+    """Encode resampled laps like a telemetry batch, keeping only the requested channels."""
+    if channels is not None:
+        wanted = ["distance", "elapsed", *channels]
+        frames = {key: frame[[col for col in wanted if col in frame.columns]] for key, frame in frames.items()}
+    return encode_telemetry_batch(frames, keys, response_format, meta={"step": step})
+
+@app.post("/api/races/{track}/{race_num}/telemetry/distance")
+async def get_distance_telemetry(track: str, race_num: int, batch: DistanceBatchRequest, request: Request):
+    """
+    Get several (driver, lap) pairs' telemetry resampled onto a shared lap-distance grid.
+    
+    Row i of every slice is at i * step metres, so slices overlay row for row
+    whatever their sample rates. Rows carry `distance` and `elapsed` (seconds
+    since the lap's first sample); grid points a lap did not cover are null. The
+    body is laid out as for the batch endpoint, plus `step`. Resampled laps are
+    cached per lap and step.
+    
+    Args:
+        batch: slices (list of {driver, lap}), step in metres (default 1),
+            channels to return (all if omitted) and format, 'columnar'
+            (default) or 'msgpack'
+    """
+    if batch.format not in META_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{batch.format}'. Use one of: {', '.join(META_FORMATS)}"
+        )
+    
+    keys = list(dict.fromkeys((item.driver, item.lap) for item in batch.slices))
+    try:
+        frames = await worker_pool.run(load_distance_laps, track, race_num, keys, batch.step)
+        if not frames:
+            raise HTTPException(
+                status_code=404, detail=f"No distance-aligned telemetry found for {track} Race {race_num}"
+            )
         
-        # Replace NaN with None for JSON serialization
-        return sampled_telemetry.replace({float('nan'): None}).to_dict('records')
+        encoded = await worker_pool.run(
+            encode_distance_batch, frames, keys, batch.channels, batch.step, batch.format
+        )
+        return encoded.to_response(request)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error loading telemetry for {track} Race {race_num} Lap {lap}: {e}", exc_info=True)
+        logger.error(f"Error resampling telemetry for {track} Race {race_num}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def encode_delta_trace(track: str, race_num: int, lap: int, ref_driver: Optional[str], ref_lap: Optional[int],
+                       step: float, response_format: str) -> EncodedResponse:
+    """
+    Compute and encode the delta trace of every car on a lap against a reference lap.
+    
+    Raises:
+        HTTPException: 404 if there is no reference lap or no car on the lap has telemetry
+    """
+    laps = cleaned_lap_data(track, race_num)
+    reference = LapAnalyzer.find_reference_lap(laps, ref_driver, ref_lap)
+    if reference is None:
+        raise HTTPException(status_code=404, detail=f"No timed reference lap found for {track} Race {race_num}")
+    
+    # Cars are numbered alike in lap data and telemetry
+    reference_key = (int(reference['driver']), reference['lap_number'])
+    on_lap = laps.loc[laps['LAP_NUMBER'] == lap, 'NUMBER'].astype(str)
+    keys = [(int(number), lap) for number in dict.fromkeys(on_lap) if number.isdigit()]
+    frames = load_distance_laps(track, race_num, list(dict.fromkeys([reference_key, *keys])), step)
+    if reference_key not in frames:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No distance-aligned telemetry for reference car {reference['driver']} "
+                   f"lap {reference['lap_number']}"
+        )
+    cars = [key for key in keys if key in frames]
+    if not cars:
+        raise HTTPException(status_code=404, detail=f"No distance-aligned telemetry found for lap {lap}")
+    
+    deltas = time_deltas([frames[key] for key in cars], frames[reference_key])
+    reference_frame = frames[reference_key]
+    columns = {
+        "distance": reference_frame["distance"].to_numpy(),
+        "reference": reference_frame["elapsed"].to_numpy()
+    }
+    columns.update((str(vehicle), deltas[row]) for row, (vehicle, _) in enumerate(cars))
+    return EncodedResponse.from_frame(pd.DataFrame(columns), response_format, float32=True, meta={
+        "lap": lap,
+        "step": step,
+        "reference": reference,
+        "drivers": [str(vehicle) for vehicle, _ in cars],
+        "missing": [str(vehicle) for vehicle, _ in keys if (vehicle, lap) not in frames]
+    })
+
+@app.get("/api/races/{track}/{race_num}/delta/{lap}")
+async def get_delta_trace(track: str, race_num: int, lap: int, request: Request,
+                          ref_driver: Optional[str] = None, ref_lap: Optional[int] = None,
+                          step: float = Query(DEFAULT_GRID_STEP, ge=DISTANCE_GRID_MIN_STEP),
+                          response_format: str = Query("columnar", alias="format")):
+    """
+    Get every car's time delta to a reference lap along lap distance, for one lap.
+    
+    The reference is the session's fastest clean lap unless narrowed down with
+    ref_driver and ref_lap. All laps are resampled onto the same distance grid
+    and the deltas are computed for the whole field in one array operation.
+    Rows carry `distance`, the reference's `reference` elapsed time and one
+    column per car (named by car number) with the seconds it has lost (positive)
+    or gained (negative) on the reference so far. Cars on the lap without
+    telemetry are listed in `missing`.
+    
+    Args:
+        ref_driver: Reference car number (optional, fastest car if omitted)
+        ref_lap: Reference lap number (optional, that car's fastest lap if omitted)
+        step: Grid spacing in metres (default 1)
+        response_format: 'columnar' (default) or 'msgpack'
+    """
+    if response_format not in META_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{response_format}'. Use one of: {', '.join(META_FORMATS)}"
+        )
+    
+    try:
+        etag = race_etag(
+            [dataset_manager.get_telemetry_file(track, race_num), *dataset_manager.get_lap_data_files(track, race_num)],
+            "delta", lap, ref_driver, ref_lap, step, response_format,
+            DataCleaner.decision_hash("telemetry"), DataCleaner.decision_hash("laps")
+        )
+        cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+        if cached_copy is not None:
+            return cached_copy
+        
+        def encode():
+            return encode_delta_trace(track, race_num, lap, ref_driver, ref_lap, step, response_format)
+        
+        if CACHE_ENCODED_RESPONSES:
+            cache_key = f"{track}_{race_num}_delta_lap_{lap}_ref_{ref_driver}_{ref_lap}_step_{step:g}_{response_format}"
+            encoded = await data_cache.aget_or_compute(cache_key, encode)
+        else:
+            encoded = await worker_pool.run(encode)
+        return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing delta trace for {track} Race {race_num} Lap {lap}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/races/{track}/{race_num}/drivers")
 async def get_drivers(track: str, race_num: int):
     """Get list of drivers for specific race."""
-    drivers = dataset_manager.get_driver_list(track, race_num)
+    drivers = await worker_pool.run(dataset_manager.get_driver_list, track, race_num)
     return {"drivers": drivers}
 
 @app.get("/api/races/{track}/{race_num}/weather")
-async def get_weather_data(track: str, race_num: int):
+async def get_weather_data(track: str, race_num: int, request: Request):
     """Get weather data for specific race."""
-    weather = dataset_manager.load_weather_data(track, race_num)
-    if weather is None:
+    etag = race_etag([dataset_manager.get_weather_file(track, race_num)], "weather")
+    cached_copy = not_modified(request, etag, DATA_CACHE_CONTROL)
+    if cached_copy is not None:
+        return cached_copy
+    
+    encoded = await load_encoded_frame(
+        f"{track}_{race_num}_weather_body", lambda: dataset_manager.load_weather_data(track, race_num)
+    )
+    if encoded is None:
         raise HTTPException(status_code=404, detail=f"Weather data not found for {track} Race {race_num}")
     
-    return weather.to_dict('records')
+    return encoded.to_response(request, etag, DATA_CACHE_CONTROL)
+
+async def load_lap_analytics(track: str, race_num: int):
+    """
+    Get every driver's lap analysis for a race.
+    
+    Served from the artifact built by preprocess.py when it is current, and
+    computed for the whole field in one pass (then stored) otherwise, so
+    opening any number of drivers costs one load and one analysis.
+    """
+    return await data_cache.aget_or_compute(
+        f"{track}_{race_num}_lap_analytics",
+        lambda: artifact_cache.load_lap_analytics(track, race_num, dataset_manager, data_cleaner, lap_analyzer)
+    )
+
+@app.get("/api/races/{track}/{race_num}/analytics")
+async def get_field_analytics(track: str, race_num: int):
+    """Get analytics data for every driver of a race, keyed by driver number."""
+    try:
+        analytics = await load_lap_analytics(track, race_num)
+        if analytics is None:
+            raise HTTPException(status_code=404, detail=f"Lap data not found for {track} Race {race_num}")
+        
+        return {"drivers": analytics}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating field analytics for {track} Race {race_num}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/races/{track}/{race_num}/analytics/{driver}")
 async def get_driver_analytics(track: str, race_num: int, driver: str):
     """Get analytics data for specific driver."""
     try:
-        lap_data = dataset_manager.load_lap_data(track, race_num)
-        if lap_data is None:
+        analytics = await load_lap_analytics(track, race_num)
+        if analytics is None:
             raise HTTPException(status_code=404, detail="Lap data not found")
         
-        cleaned_data = data_cleaner.clean_lap_data(lap_data)
-        
         # Driver numbers are now standardized as strings in DataCleaner
-        driver_laps = cleaned_data[cleaned_data['NUMBER'] == str(driver)]
+        analysis = analytics.get(str(driver))
         
-        if driver_laps.empty:
-            available_drivers = cleaned_data['NUMBER'].unique().tolist()
+        if analysis is None:
+            available_drivers = list(analytics)
             raise HTTPException(
                 status_code=404, 
                 detail=f"No data found for driver {driver}. Available drivers: {available_drivers}"
             )
         
-        # Analyze lap times
-        analysis = lap_analyzer.analyze_lap_times(driver_laps)
-        
-        # Replace NaN with None for JSON serialization
-        for key, value in analysis.items():
-            if isinstance(value, float) and pd.isna(value):
-                analysis[key] = None
-        
         return analysis
     except HTTPException:
         raise
@@ -333,16 +921,63 @@ async def get_driver_analytics(track: str, race_num: int, driver: str):
         logger.error(f"Error generating analytics for {track} Race {race_num} Driver {driver}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/races/{track}/{race_num}/racing-line/{lap}")
+async def get_racing_line(track: str, race_num: int, lap: int, driver: int):
+    """
+    Get a driver's smoothed racing line for a lap in local x/y meters, with speed and lap distance.
+    
+    Lap distance is projected onto the track's centerline, which also gives each
+    point's lateral `offset` from it in meters (positive to the left). Until the
+    centerline has been built, lines computed on demand keep the lap's own
+    distance and have no offset.
+    
+    Args:
+        driver: Vehicle number
+    """
+    try:
+        # Lines prebuilt by preprocess.py for the whole race; None until they are built
+        racing_lines = await data_cache.aget_or_compute(
+            f"{track}_{race_num}_racing_lines",
+            lambda: artifact_cache.load_racing_lines(
+                track, race_num, dataset_manager, data_cleaner, channel_store, racing_line_generator,
+                build_missing=False
+            )
+        )
+        if racing_lines is None or racing_lines.get((driver, lap)) is None:
+            centerline = await worker_pool.run(load_track_centerline, track)
+            
+            def build_line():
+                line = artifact_cache.build_racing_line(
+                    track, race_num, lap, driver, dataset_manager, data_cleaner, channel_store, racing_line_generator,
+                    centerline
+                )
+                # A one-line set, so the cache sizes it like the prebuilt lines
+                return RacingLineSet({(driver, lap): line}) if line is not None else None
+            
+            # Lines without the centerline are cached apart, so they are replaced once it is built
+            projection = "projected" if centerline is not None else "lap_distance"
+            racing_lines = await data_cache.aget_or_compute(
+                f"{track}_{race_num}_racing_line_{lap}_{driver}_{projection}", build_line
+            )
+        line = racing_lines.get((driver, lap)) if racing_lines is not None else None
+        if line is None:
+            raise HTTPException(status_code=404, detail=f"No GPS data found for driver {driver} on lap {lap}")
+        
+        return line
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating racing line for {track} Race {race_num} Lap {lap}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/races/{track}/{race_num}/strategy")
 async def get_strategy_recommendation(track: str, race_num: int, driver: str, current_lap: int = 1):
     """Get strategy recommendation for driver."""
     try:
-        lap_data = dataset_manager.load_lap_data(track, race_num)
-        if lap_data is None:
+        cleaned_data = await load_cleaned_lap_data(track, race_num)
+        if cleaned_data is None:
             raise HTTPException(status_code=404, detail="Lap data not found")
         
-        cleaned_data = data_cleaner.clean_lap_data(lap_data)
-        
         # Driver numbers are now standardized as strings in DataCleaner
         driver_laps = cleaned_data[cleaned_data['NUMBER'] == str(driver)]
         
@@ -357,7 +992,8 @@ async def get_strategy_recommendation(track: str, race_num: int, driver: str, cu
         
         position = 1
         
-        strategy = strategy_engine.generate_strategy_recommendation(
+        strategy = await worker_pool.run_cpu(
+            strategy_engine.generate_strategy_recommendation,
             driver, current_lap, int(total_laps), driver_laps, position
         )
         
@@ -376,13 +1012,72 @@ async def get_strategy_recommendation(track: str, race_num: int, driver: str, cu
 @app.get("/api/cache/stats")
 async def get_cache_stats():
     """Get cache statistics."""
-    return data_cache.get_stats()
+    stats = data_cache.get_stats()
+    stats["artifacts"] = artifact_cache.get_stats()
+    stats["track_maps"] = track_map_cache.get_stats()
+    return stats
+
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    """Get worker pool size, queue depth and wait-time metrics."""
+    return worker_pool.get_stats()
+
+async def warm_up_race(track: str, race_num: int):
+    """Load a race's metadata, cleaned lap data and lap analytics into the cache."""
+    await data_cache.aget_or_compute(
+        f"{track}_{race_num}_metadata", lambda: dataset_manager.load_race_results(track, race_num)
+    )
+    await load_cleaned_lap_data(track, race_num)
+    await load_lap_analytics(track, race_num)
+
+async def warm_up_track(track: str):
+    """Load a track's centerline into the cache, building it if preprocess.py has not."""
+    await worker_pool.run(load_track_centerline, track, True)
+
+async def list_warm_up_jobs():
+    """One warm-up job per available race, then one per track for its centerline."""
+    races = await worker_pool.run(dataset_manager.get_available_races)
+    race_jobs = [
+        (f"{track} Race {race_num}", lambda track=track, race_num=race_num: warm_up_race(track, race_num))
+        for track, race_nums in races.items()
+        for race_num in race_nums
+    ]
+    track_jobs = [
+        (f"{track} centerline", lambda track=track: warm_up_track(track))
+        for track in races
+    ]
+    return race_jobs + track_jobs
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Start warming the cache in the background, so traffic is accepted immediately."""
+    if WARM_UP_ON_STARTUP:
+        app.state.warm_up_task = asyncio.create_task(warm_up.run(list_warm_up_jobs))
+    else:
+        warm_up.skip()
+    startup_metrics.mark_startup_complete()
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once cache warm-up has finished, 503 with progress until then."""
+    body = {
+        "status": "ready" if warm_up.is_ready else "warming",
+        "warm_up": warm_up.get_stats(),
+        "startup": startup_metrics.get_stats()
+    }
+    return JSONResponse(body, status_code=200 if warm_up.is_ready else 503)
+
+@app.on_event("shutdown")
+async def shutdown_worker_pool():
+    worker_pool.shutdown()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time race simulation."""
     await race_simulator.handle_websocket(websocket)
 
+startup_metrics.mark_imported()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import WARM_UP_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    """
+    Background cache warm-up with progress reporting.
+
+    Runs after the server starts accepting traffic, so /health answers at once
+    while races are loaded a few at a time. /ready reports ready once every job
+    has finished, whether it succeeded or not.
+    """
+
+    def __init__(self, concurrency: int = WARM_UP_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self.total = 0
+        self.completed = 0
+        self.failed: List[str] = []
+        self.in_progress: List[str] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once warm-up has run to completion."""
+        return self.finished_at is not None
+
+    def skip(self) -> None:
+        """Mark warm-up as done without running any jobs."""
+        self.started_at = self.finished_at = time.time()
+
+    async def run(self, list_jobs: Callable[[], Awaitable[List[Tuple[str, Callable[[], Awaitable]]]]]) -> None:
+        """
+        Run warm-up jobs, at most `concurrency` at a time.
+
+        Args:
+            list_jobs: Coroutine function returning (name, coroutine function) pairs;
+                listing is itself deferred so a slow dataset scan does not block startup
+        """
+        self.started_at = time.time()
+        try:
+            jobs = await list_jobs()
+        except Exception as e:
+            logger.error(f"Could not list warm-up jobs: {e}", exc_info=True)
+            jobs = []
+
+        self.total = len(jobs)
+        logger.info(f"Warming cache: {self.total} jobs, {self.concurrency} at a time")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_job(name: str, job: Callable[[], Awaitable]) -> None:
+            async with semaphore:
+                self.in_progress.append(name)
+                try:
+                    await job()
+                except Exception as e:
+                    logger.warning(f"Warm-up job {name} failed: {e}")
+                    self.failed.append(name)
+                finally:
+                    self.in_progress.remove(name)
+                    self.completed += 1
+
+        await asyncio.gather(*(run_job(name, job) for name, job in jobs))
+        self.finished_at = time.time()
+        logger.info(f"Cache warmed in {self.finished_at - self.started_at:.2f}s "
+                    f"({self.completed - len(self.failed)}/{self.total} jobs succeeded)")
+
+    def get_stats(self) -> Dict:
+        """
+        Get warm-up progress.
+
+        Returns:
+            Dictionary with job counts, running and failed jobs and elapsed time
+        """
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "ready": self.is_ready,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": list(self.failed),
+            "in_progress": list(self.in_progress),
+            "elapsed_seconds": elapsed
+        }
+
+
+class StartupMetrics:
+    """
+    Cold-start timings of the API process.
+
+    All times are measured from when api.main started importing, which on a
+    fresh container is within milliseconds of process start.
+    """
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.imported_at: Optional[float] = None
+        self.startup_complete_at: Optional[float] = None
+        self.first_response_at: Optional[float] = None
+        self.first_response_path: Optional[str] = None
+
+    def mark_imported(self) -> None:
+        self.imported_at = time.time()
+
+    def mark_startup_complete(self) -> None:
+        self.startup_complete_at = time.time()
+
+    def mark_first_response(self, path: str) -> None:
+        if self.first_response_at is None:
+            self.first_response_at = time.time()
+            self.first_response_path = path
+            logger.info(f"First response after {self.first_response_at - self.started_at:.2f}s ({path})")
+
+    def _since_start(self, at: Optional[float]) -> Optional[float]:
+        return at - self.started_at if at is not None else None
+
+    def get_stats(self) -> Dict:
+        """
+        Get cold-start timings.
+
+        Returns:
+            Dictionary with seconds from import start to app import, startup
+            complete and first response, plus the first response's path
+        """
+        return {
+            "import_seconds": self._since_start(self.imported_at),
+            "startup_seconds": self._since_start(self.startup_complete_at),
+            "first_response_seconds": self._since_start(self.first_response_at),
+            "first_response_path": self.first_response_path
+        }
+
+
+class FirstResponseMiddleware:
+    """ASGI middleware recording when the first HTTP response starts, then stepping aside."""
+
+    def __init__(self, app, metrics: StartupMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.metrics.first_response_at is not None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                self.metrics.mark_first_response(scope["path"])
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
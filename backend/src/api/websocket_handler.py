@@ -13,9 +13,11 @@ class RaceSimulator:
     Streams lap updates to connected clients.
     """
     
-    def __init__(self, dataset_manager, data_cleaner):
+    def __init__(self, dataset_manager, data_cleaner, artifact_cache=None, executor=None):
         self.dataset_manager = dataset_manager
         self.data_cleaner = data_cleaner
+        self.artifact_cache = artifact_cache
+        self.executor = executor
         self.active_simulations: Dict[str, Dict] = {}
     
     async def handle_websocket(self, websocket: WebSocket):
@@ -82,6 +84,16 @@ class RaceSimulator:
                 'message': str(e)
             })
     
+    def _load_cleaned_lap_data(self, track: str, race_num: int):
+        """Load cleaned lap data, reusing the on-disk artifact when available."""
+        if self.artifact_cache is not None:
+            return self.artifact_cache.load_lap_data(
+                track, race_num, self.dataset_manager, self.data_cleaner
+            )
+        return self.data_cleaner.clean_lap_data(
+            self.dataset_manager.load_lap_data(track, race_num)
+        )
+    
     async def _start_simulation(self, websocket: WebSocket, message: Dict, state: Dict):
         """Start race simulation."""
         track = message.get('track')
@@ -95,17 +107,17 @@ class RaceSimulator:
             })
             return
         
-        # Load lap data
-        lap_data = self.dataset_manager.load_lap_data(track, race_num)
-        if lap_data is None:
+        # Load off the event loop so other simulation streams keep running
+        loop = asyncio.get_running_loop()
+        cleaned_data = await loop.run_in_executor(self.executor, self._load_cleaned_lap_data, track, race_num)
+        
+        if cleaned_data is None:
             await websocket.send_json({
                 'type': 'error',
                 'message': f'Race data not found for {track} Race {race_num}'
             })
             return
         
-        cleaned_data = self.data_cleaner.clean_lap_data(lap_data)
-        
         # Update state
         state['track'] = track
         state['race_num'] = race_num
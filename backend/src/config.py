@@ -1,6 +1,9 @@
+import logging
 import os
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # Detect deployment environment
 IS_DEPLOYED = os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('RENDER') or os.getenv('FLY_APP_NAME') or os.getenv('AWS_EXECUTION_ENV') or os.getenv('EC2_INSTANCE')
 
@@ -9,8 +12,7 @@ if IS_DEPLOYED:
     BASE_DIR = Path(__file__).resolve().parent.parent
     DATASET_DIR = BASE_DIR / "dataset"
     TRACKS = ["Sebring"]  # Only Sebring uploaded to S3
-    print(f"Running in DEPLOYMENT mode")
-    print(f"BASE_DIR: {BASE_DIR}")
+    logger.info(f"Running in DEPLOYMENT mode, BASE_DIR: {BASE_DIR}")
 else:
     # Local development - full dataset
     BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent.parent
@@ -23,19 +25,37 @@ else:
         "Sonoma",
         "VIR"
     ]
-    print(f"Running in LOCAL mode")
-    print(f"BASE_DIR: {BASE_DIR}")
+    logger.info(f"Running in LOCAL mode, BASE_DIR: {BASE_DIR}")
 
-# Verify dataset directory exists
-if DATASET_DIR.exists():
-    print(f"Dataset directory found: {DATASET_DIR}")
-    print(f"Available tracks: {os.listdir(DATASET_DIR)}")
-else:
-    print(f"WARNING: Dataset directory not found at {DATASET_DIR}")
+# Tracks are listed lazily by DatasetManager; only check the directory here
+if not DATASET_DIR.exists():
+    logger.warning(f"Dataset directory not found at {DATASET_DIR}")
 
 API_HOST = "0.0.0.0"
 API_PORT = int(os.getenv('PORT', 8000))  # Use PORT env var for deployment
 CACHE_MAX_SIZE_MB = 500  # Optimized for 8GB RAM systems
+CACHE_SPILL_MAX_SIZE_MB = int(os.getenv('CACHE_SPILL_MAX_SIZE_MB', 2000))  # Disk tier for evicted entries, 0 disables
+CACHE_ENCODED_RESPONSES = os.getenv('CACHE_ENCODED_RESPONSES', '1') == '1'  # Cache encoded JSON bodies instead of DataFrames
+
+# Derived artifacts (columnar stores, indexes) built from the raw dataset
+ARTIFACTS_DIR = Path(os.getenv('ARTIFACTS_DIR', Path(__file__).resolve().parent.parent / "artifacts"))
+TELEMETRY_STORE_DIR = ARTIFACTS_DIR / "telemetry_store"
+CHANNEL_STORE_DIR = ARTIFACTS_DIR / "channels"
+CLEANED_CACHE_DIR = ARTIFACTS_DIR / "cleaned"
+CLEANED_TELEMETRY_MAX_SIZE_MB = int(os.getenv('CLEANED_TELEMETRY_MAX_SIZE_MB', 1000))  # On-demand cleaned laps, 0 disables
+CACHE_SPILL_DIR = ARTIFACTS_DIR / "cache_spill"
+TRACK_MAP_CACHE_DIR = ARTIFACTS_DIR / "track_maps"
+DATASET_MANIFEST_DIR = ARTIFACTS_DIR / "manifests"
+# Content hashes and build keys of every step run by preprocess.py
+PREPROCESS_STATE_FILE = ARTIFACTS_DIR / "preprocess_state.json"
+
+# Executor for blocking work in request handlers: 'thread' or 'process'
+WORKER_POOL_KIND = os.getenv('WORKER_POOL_KIND', 'thread')
+WORKER_POOL_SIZE = int(os.getenv('WORKER_POOL_SIZE', min(32, (os.cpu_count() or 1) + 4)))
+
+# Background cache warm-up after startup; races are warmed this many at a time
+WARM_UP_ON_STARTUP = os.getenv('WARM_UP_ON_STARTUP', '1') == '1'
+WARM_UP_CONCURRENCY = int(os.getenv('WARM_UP_CONCURRENCY', 4))
 
 SIMULATION_INTERVAL_SECONDS = 2.0
 
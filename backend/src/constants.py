@@ -9,6 +9,16 @@ TRACK_NAMES = {
 
 RACE_NUMBERS = [1, 2]
 
+# Track map PDFs in the dataset's Maps directory
+TRACK_MAP_FILES = {
+    "barber": "Barber_Circuit_Map.pdf",
+    "COTA": "COTA_Circuit_Map.pdf",
+    "Road America": "Road_America_Map.pdf",
+    "Sebring": "Sebring_Track_Sector_Map.pdf",
+    "Sonoma": "Sonoma_Map.pdf",
+    "VIR": "VIR_map.pdf"
+}
+
 TELEMETRY_COLUMNS = [
     "Speed",
     "Gear",
@@ -35,3 +45,16 @@ LAP_DATA_COLUMNS = [
 ]
 
 INVALID_LAP_NUMBER = 32768
+
+# An ELAPSED gap at least this many typical lap times long may hide missing laps;
+# laps are only skipped when the recorded lap counter jumps across it too
+MISSING_LAP_GAP_RATIO = 1.9
+
+# Most (driver, lap) slices one batch telemetry request may ask for
+TELEMETRY_BATCH_MAX_SLICES = 50
+
+# Widest chart, in pixels, a telemetry window request may ask rows for
+TELEMETRY_WINDOW_MAX_WIDTH = 8192
+
+# Finest lap-distance grid, in metres, telemetry may be resampled onto
+DISTANCE_GRID_MIN_STEP = 0.1
@@ -0,0 +1,525 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.racing_line import RacingLineSet
+from analytics.track_centerline import CENTERLINE_COLUMNS, TrackCenterline
+from config import CLEANED_CACHE_DIR, CLEANED_TELEMETRY_MAX_SIZE_MB
+from utils.fingerprint import code_fingerprint, file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCache:
+    """
+    Persistent on-disk cache of cleaned DataFrames and results derived from them.
+
+    Each artifact is keyed by the signatures of the raw files it was built from
+    plus DataCleaner.decision_hash() for its kind, so any process can reuse a
+    cleaned frame until either the source data or the cleaning decisions behind
+    it change. Files are replaced atomically, so concurrent workers never read a
+    partial artifact. The key is pickled ahead of the value, so staleness is
+    checked without unpickling the value.
+
+    Cleaned laps are written on demand, one file per requested lap, so that kind
+    has a byte budget: reads refresh a file's mtime and writes delete the least
+    recently used files until the kind fits. The files themselves are the LRU
+    index, so every process sharing the directory prunes the same entries.
+    Artifacts built by preprocess.py are not bounded.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, cache_dir: Path = CLEANED_CACHE_DIR,
+                 telemetry_max_size_mb: int = CLEANED_TELEMETRY_MAX_SIZE_MB):
+        self.cache_dir = Path(cache_dir)
+        # Byte budget per kind written on demand
+        self.max_size_bytes = {"telemetry": telemetry_max_size_mb * 1024 * 1024}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def artifact_key(kind: str, sources: List[Path], decision_hash: str) -> str:
+        """
+        Build the key identifying one version of an artifact.
+
+        Args:
+            kind: Artifact kind, e.g. 'laps' or 'telemetry'
+            sources: Raw files the artifact is built from
+            decision_hash: DataCleaner.decision_hash(kind)
+
+        Returns:
+            Hex digest of the sources and cleaning decisions
+        """
+        stored = {
+            "kind": kind,
+            "sources": [file_signature(source) for source in sources],
+            "decisions": decision_hash
+        }
+        return hashlib.sha256(json.dumps(stored, sort_keys=True).encode()).hexdigest()
+
+    def artifact_path(self, kind: str, name: str) -> Path:
+        """File holding the cached artifact for a kind and name."""
+        return self.cache_dir / kind / f"{name}{self.SUFFIX}"
+
+    def _read(self, kind: str, name: str, key: str, load_value: bool) -> Tuple[bool, Any]:
+        """Check an artifact's key and optionally load its value; returns (current, value)."""
+        path = self.artifact_path(kind, name)
+        if not path.exists():
+            return False, None
+
+        try:
+            with open(path, "rb") as f:
+                header = pickle.load(f)
+                if header.get("key") != key:
+                    return False, None
+                return True, pickle.load(f) if load_value else None
+        except Exception as e:
+            logger.warning(f"Unreadable cleaned artifact {path}: {e}")
+            return False, None
+
+    def is_current(self, kind: str, name: str, key: str) -> bool:
+        """
+        Check whether an artifact built with the given key exists, without loading it.
+
+        Args:
+            kind: Artifact kind
+            name: Artifact name within the kind
+            key: Expected artifact key
+
+        Returns:
+            True if the stored artifact matches the key
+        """
+        return self._read(kind, name, key, load_value=False)[0]
+
+    def get(self, kind: str, name: str, key: str) -> Optional[Any]:
+        """
+        Load a cached artifact if it was built with the given key.
+
+        Args:
+            kind: Artifact kind
+            name: Artifact name within the kind
+            key: Expected artifact key
+
+        Returns:
+            Cached DataFrame (or dictionary, for derived results) or None if missing or stale
+        """
+        current, value = self._read(kind, name, key, load_value=True)
+        if not current:
+            self.misses += 1
+            return None
+
+        if kind in self.max_size_bytes:
+            self._touch(self.artifact_path(kind, name))
+        self.hits += 1
+        return value
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark a bounded artifact as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            # Pruned by another process since it was read
+            pass
+
+    def _prune(self, kind: str) -> None:
+        """Delete the least recently used artifacts of a bounded kind until it fits its budget."""
+        files = []
+        for path in (self.cache_dir / kind).glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda entry: entry[0]):
+            if total <= self.max_size_bytes[kind]:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+            logger.info(f"Evicted cleaned artifact: {kind}/{path.name} ({size / 1024 / 1024:.2f}MB)")
+
+    def put(self, kind: str, name: str, key: str, frame: Any) -> bool:
+        """
+        Write an artifact, replacing any older version.
+
+        Args:
+            kind: Artifact kind
+            name: Artifact name within the kind
+            key: Artifact key the frame was built for
+            frame: Cleaned DataFrame, or dictionary of derived results
+
+        Returns:
+            True if the artifact was written
+        """
+        path = self.artifact_path(kind, name)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        max_size = self.max_size_bytes.get(kind)
+        if max_size == 0:
+            return False
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"key": key}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if max_size is not None and tmp_path.stat().st_size > max_size:
+                tmp_path.unlink(missing_ok=True)
+                return False
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cleaned artifact {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+        if max_size is not None:
+            self._prune(kind)
+        return True
+
+    def get_or_build(self, kind: str, name: str, sources: List[Path], decision_hash: str,
+                     build: Callable[[], Optional[Any]], rebuild: bool = False) -> Optional[Any]:
+        """
+        Load an artifact, or build and store it when missing or stale.
+
+        Args:
+            kind: Artifact kind
+            name: Artifact name within the kind
+            sources: Raw files the artifact is built from
+            decision_hash: DataCleaner.decision_hash(kind)
+            build: Function that loads and cleans the frame
+            rebuild: Build and store even if a current artifact exists
+
+        Returns:
+            Cleaned DataFrame, or None if build returned nothing
+        """
+        key = self.artifact_key(kind, sources, decision_hash)
+        frame = None if rebuild else self.get(kind, name, key)
+        if frame is not None:
+            return frame
+
+        frame = build()
+        # len() covers both frames and dictionaries of derived results
+        if frame is not None and len(frame) > 0:
+            self.put(kind, name, key, frame)
+        return frame
+
+    def load_lap_data(self, track: str, race_num: int, dataset_manager, data_cleaner,
+                      rebuild: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Get cleaned lap timing data for a race.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            dataset_manager: DatasetManager to load raw lap data from
+            data_cleaner: DataCleaner used to clean it
+            rebuild: Clean again even if a current artifact exists
+
+        Returns:
+            Cleaned lap data DataFrame or None if the race has no lap data
+        """
+        sources = dataset_manager.get_lap_data_files(track, race_num)
+        if not sources:
+            return None
+
+        def build():
+            return data_cleaner.clean_lap_data(dataset_manager.load_lap_data(track, race_num))
+
+        return self.get_or_build(
+            "laps", f"{track}_race{race_num}", sources, data_cleaner.decision_hash("laps"), build, rebuild
+        )
+
+    def load_telemetry_data(self, track: str, race_num: int, lap: int, vehicle: Optional[int],
+                            dataset_manager, data_cleaner) -> Optional[pd.DataFrame]:
+        """
+        Get cleaned wide-format telemetry for a lap, optionally for one vehicle.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Lap number
+            vehicle: Optional vehicle number
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to clean it
+
+        Returns:
+            Cleaned telemetry DataFrame or None if there is no matching telemetry
+        """
+        telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+        if telemetry_file is None:
+            return None
+
+        def build():
+            telemetry = dataset_manager.load_telemetry_data(track, race_num, lap, vehicle=vehicle)
+            if telemetry is None or telemetry.empty:
+                return None
+            return data_cleaner.clean_telemetry_data(telemetry)
+
+        return self.get_or_build(
+            "telemetry", self.telemetry_name(track, race_num, lap, vehicle), [telemetry_file],
+            data_cleaner.decision_hash("telemetry"), build
+        )
+
+    @staticmethod
+    def telemetry_name(track: str, race_num: int, lap: int, vehicle: Optional[int]) -> str:
+        """Artifact name of a lap's cleaned telemetry."""
+        return f"{track}_race{race_num}_lap{lap}_vehicle{'all' if vehicle is None else vehicle}"
+
+    def load_telemetry_slices(self, track: str, race_num: int, keys: List[Tuple[int, int]],
+                              dataset_manager, data_cleaner) -> Dict[Tuple[int, int], pd.DataFrame]:
+        """
+        Get cleaned wide-format telemetry for several (vehicle, lap) pairs.
+
+        Pairs with a current artifact are read from it; the raw rows of all other
+        pairs are loaded together with DatasetManager.load_telemetry_slices, then
+        cleaned one pair at a time exactly as load_telemetry_data cleans them.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            keys: (vehicle_number, lap) pairs
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to clean it
+
+        Returns:
+            Dictionary mapping each pair with telemetry to its cleaned DataFrame
+        """
+        telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+        if telemetry_file is None:
+            return {}
+
+        artifact_key = self.artifact_key("telemetry", [telemetry_file], data_cleaner.decision_hash("telemetry"))
+        cleaned = {}
+        missing = []
+        for vehicle, lap in keys:
+            frame = self.get("telemetry", self.telemetry_name(track, race_num, lap, vehicle), artifact_key)
+            if frame is not None:
+                cleaned[(vehicle, lap)] = frame
+            else:
+                missing.append((vehicle, lap))
+
+        for (vehicle, lap), raw in dataset_manager.load_telemetry_slices(track, race_num, missing).items():
+            frame = data_cleaner.clean_telemetry_data(raw)
+            if frame is None or frame.empty:
+                continue
+            self.put("telemetry", self.telemetry_name(track, race_num, lap, vehicle), artifact_key, frame)
+            cleaned[(vehicle, lap)] = frame
+        return cleaned
+
+    @staticmethod
+    def lap_analytics_decisions(data_cleaner, lap_analyzer) -> str:
+        """Decision hash of per-driver lap analytics: lap cleaning plus the analyzer's code."""
+        return f"{data_cleaner.decision_hash('laps')}_{code_fingerprint(type(lap_analyzer))}"
+
+    def load_lap_analytics(self, track: str, race_num: int, dataset_manager, data_cleaner, lap_analyzer,
+                           rebuild: bool = False) -> Optional[Dict[str, Dict]]:
+        """
+        Get the lap analysis of every driver of a race, from LapAnalyzer.analyze_field.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            dataset_manager: DatasetManager to load raw lap data from
+            data_cleaner: DataCleaner used to clean it
+            lap_analyzer: LapAnalyzer computing the field's analysis
+            rebuild: Recompute even if a current artifact exists
+
+        Returns:
+            Dictionary mapping driver number (string) to its analysis, or None if
+            the race has no lap data
+        """
+        sources = dataset_manager.get_lap_data_files(track, race_num)
+        if not sources:
+            return None
+
+        def build():
+            cleaned = self.load_lap_data(track, race_num, dataset_manager, data_cleaner)
+            if cleaned is None or cleaned.empty:
+                return None
+            return lap_analyzer.analyze_field(cleaned)
+
+        return self.get_or_build(
+            "lap_analytics", f"{track}_race{race_num}", sources,
+            self.lap_analytics_decisions(data_cleaner, lap_analyzer), build, rebuild
+        )
+
+    @staticmethod
+    def track_telemetry_files(track: str, dataset_manager) -> List[Path]:
+        """Raw telemetry files of every race of a track."""
+        files = [dataset_manager.get_telemetry_file(track, race_num)
+                 for race_num in dataset_manager.get_available_races().get(track, [])]
+        return [path for path in files if path is not None]
+
+    @staticmethod
+    def centerline_decisions(data_cleaner) -> str:
+        """Decision hash of track centerlines: telemetry cleaning plus the centerline code."""
+        return f"{data_cleaner.decision_hash('telemetry')}_{code_fingerprint(TrackCenterline)}"
+
+    def load_centerline(self, track: str, dataset_manager, data_cleaner, channel_store,
+                        rebuild: bool = False, build_missing: bool = True) -> Optional[TrackCenterline]:
+        """
+        Get a track's reference centerline, built from the cleanest laps of all its races.
+
+        Args:
+            track: Track name
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to clean it
+            channel_store: ChannelStore serving prebuilt cleaned laps
+            rebuild: Recompute even if a current artifact exists
+            build_missing: Compute the centerline when no current artifact exists; when
+                False, only a prebuilt artifact is returned
+
+        Returns:
+            TrackCenterline, or None if the track has no lap clean enough to build one
+            (or no prebuilt centerline and build_missing is False)
+        """
+        sources = self.track_telemetry_files(track, dataset_manager)
+        if not sources:
+            return None
+        if not build_missing:
+            return self.get("centerlines", track, self.artifact_key("centerlines", sources,
+                                                                    self.centerline_decisions(data_cleaner)))
+
+        def build():
+            laps = []
+            for race_num in dataset_manager.get_available_races().get(track, []):
+                telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+                if telemetry_file is None:
+                    continue
+                frames = []
+                remaining = []
+                for vehicle, lap in sorted(dataset_manager.get_telemetry_keys(track, race_num)):
+                    frame = channel_store.load_lap(track, race_num, lap, vehicle, telemetry_file)
+                    if frame is not None:
+                        frames.append(frame)
+                    else:
+                        remaining.append((vehicle, lap))
+                frames.extend(
+                    self.load_telemetry_slices(track, race_num, remaining, dataset_manager, data_cleaner).values()
+                )
+                # Only the GPS and lap distance columns are kept across races
+                laps.extend(frame[[col for col in CENTERLINE_COLUMNS if col in frame.columns]] for frame in frames)
+            return TrackCenterline.from_laps(laps)
+
+        return self.get_or_build("centerlines", track, sources, self.centerline_decisions(data_cleaner), build, rebuild)
+
+    @staticmethod
+    def racing_line_decisions(data_cleaner, racing_line_generator) -> str:
+        """Decision hash of racing lines: the track centerline's decisions plus the generator's and set's code."""
+        fingerprint = code_fingerprint(type(racing_line_generator), RacingLineSet)
+        return f"{ArtifactCache.centerline_decisions(data_cleaner)}_{fingerprint}"
+
+    def racing_line_sources(self, track: str, race_num: int, dataset_manager) -> List[Path]:
+        """
+        Raw files a race's racing lines are built from: its telemetry, plus the rest
+        of the track's, which the centerline projecting their lap distance is built from.
+        """
+        if dataset_manager.get_telemetry_file(track, race_num) is None:
+            return []
+        return self.track_telemetry_files(track, dataset_manager)
+
+    def load_racing_lines(self, track: str, race_num: int, dataset_manager, data_cleaner, channel_store,
+                          racing_line_generator, rebuild: bool = False,
+                          build_missing: bool = True) -> Optional[RacingLineSet]:
+        """
+        Get the racing line of every (vehicle, lap) of a race.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to clean it
+            channel_store: ChannelStore serving prebuilt cleaned laps
+            racing_line_generator: RacingLineGenerator computing each line
+            rebuild: Recompute even if a current artifact exists
+            build_missing: Compute the lines when no current artifact exists; when
+                False, only a prebuilt artifact is returned
+
+        Returns:
+            RacingLineSet keyed by (vehicle, lap), or None if the race has no
+            telemetry (or no prebuilt lines and build_missing is False)
+        """
+        sources = self.racing_line_sources(track, race_num, dataset_manager)
+        if not sources:
+            return None
+
+        name = f"{track}_race{race_num}"
+        decisions = self.racing_line_decisions(data_cleaner, racing_line_generator)
+        if not build_missing:
+            return self.get("racing_lines", name, self.artifact_key("racing_lines", sources, decisions))
+
+        def build():
+            centerline = self.load_centerline(track, dataset_manager, data_cleaner, channel_store)
+            lines = {}
+            for vehicle, lap in sorted(dataset_manager.get_telemetry_keys(track, race_num)):
+                line = self.build_racing_line(track, race_num, lap, vehicle, dataset_manager, data_cleaner,
+                                              channel_store, racing_line_generator, centerline)
+                if line is not None:
+                    lines[(vehicle, lap)] = line
+            return RacingLineSet(lines)
+
+        return self.get_or_build("racing_lines", name, sources, decisions, build, rebuild)
+
+    def build_racing_line(self, track: str, race_num: int, lap: int, vehicle: int, dataset_manager, data_cleaner,
+                          channel_store, racing_line_generator,
+                          centerline: Optional[TrackCenterline] = None) -> Optional[Dict]:
+        """
+        Compute one vehicle's racing line for a lap from its cleaned telemetry.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Lap number
+            vehicle: Vehicle number
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to clean it
+            channel_store: ChannelStore serving prebuilt cleaned laps
+            racing_line_generator: RacingLineGenerator computing the line
+            centerline: Track centerline to project lap distance onto (optional)
+
+        Returns:
+            Racing line dictionary ready for JSON, or None if the lap has no usable GPS data
+        """
+        telemetry_file = dataset_manager.get_telemetry_file(track, race_num)
+        if telemetry_file is None:
+            return None
+
+        telemetry = channel_store.load_lap(track, race_num, lap, vehicle, telemetry_file)
+        if telemetry is None:
+            telemetry = self.load_telemetry_data(track, race_num, lap, vehicle, dataset_manager, data_cleaner)
+
+        line = racing_line_generator.generate_racing_line(telemetry, centerline)
+        if 'error' in line:
+            return None
+
+        # Replace NaN with None for JSON serialization
+        for field in [field for field in ('speed', 'distance', 'offset') if field in line]:
+            line[field] = [None if value is None or np.isnan(value) else value for value in line[field]]
+        return line
+
+    def get_stats(self) -> dict:
+        """
+        Get artifact cache statistics.
+
+        Returns:
+            Dictionary with hit and miss counts, evictions and size budgets
+        """
+        total_requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total_requests if total_requests > 0 else 0,
+            "evictions": self.evictions,
+            "max_size_mb": {kind: size / 1024 / 1024 for kind, size in self.max_size_bytes.items()}
+        }
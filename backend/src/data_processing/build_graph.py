@@ -0,0 +1,484 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import PREPROCESS_STATE_FILE
+from utils.fingerprint import code_fingerprint, file_signature
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per block while hashing source files
+HASH_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Map renders built ahead of time: the default /api/maps zoom and the first tile levels
+PREBUILT_MAP_ZOOMS = (2.0,)
+PREBUILT_TILE_LEVELS = 3
+
+
+class BuildContext:
+    """Services a build step works with, created once per process."""
+
+    def __init__(self):
+        # Imported here so spawned workers only pay for them when they run a step
+        from analytics.lap_analyzer import LapAnalyzer
+        from analytics.racing_line import RacingLineGenerator
+        from data_processing.artifact_cache import ArtifactCache
+        from data_processing.channel_store import ChannelStore
+        from data_processing.data_cleaner import DataCleaner
+        from data_processing.dataset_manager import DatasetManager
+        from utils.track_map import TrackMapCache
+
+        self.dataset_manager = DatasetManager()
+        self.data_cleaner = DataCleaner()
+        self.channel_store = ChannelStore()
+        self.artifact_cache = ArtifactCache()
+        self.track_map_cache = TrackMapCache()
+        self.lap_analyzer = LapAnalyzer()
+        self.racing_line_generator = RacingLineGenerator()
+
+
+_context: Optional[BuildContext] = None
+
+
+def get_context() -> BuildContext:
+    """This process's BuildContext."""
+    global _context
+    if _context is None:
+        _context = BuildContext()
+    return _context
+
+
+def content_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildStep:
+    """
+    One kind of derived artifact, built once per race (or per track, e.g. maps and centerlines).
+
+    Args:
+        name: Step name, used in node ids
+        inputs: Function (ctx, track, race_num) returning the source files read
+        decisions: Function (ctx) returning the code/decision hash of the output
+        is_current: Function (ctx, track, race_num) checking the output as the API
+            will, i.e. against source file signatures
+        run: Function (ctx, track, race_num, force) building the output
+        depends_on: Steps of the same race, or of the same track for per-track
+            steps, whose outputs this step reads
+        per_race: False for per-track steps, whose race_num is None
+    """
+
+    def __init__(self, name: str, inputs: Callable, decisions: Callable, is_current: Callable, run: Callable,
+                 depends_on: Tuple[str, ...] = (), per_race: bool = True):
+        self.name = name
+        self.inputs = inputs
+        self.decisions = decisions
+        self.is_current = is_current
+        self.run = run
+        self.depends_on = depends_on
+        self.per_race = per_race
+
+
+def _telemetry_inputs(ctx, track, race_num):
+    telemetry_file = ctx.dataset_manager.get_telemetry_file(track, race_num)
+    return [telemetry_file] if telemetry_file is not None else []
+
+
+def _track_telemetry_inputs(ctx, track, race_num):
+    return ctx.artifact_cache.track_telemetry_files(track, ctx.dataset_manager)
+
+
+def _racing_line_inputs(ctx, track, race_num):
+    return ctx.artifact_cache.racing_line_sources(track, race_num, ctx.dataset_manager)
+
+
+def _lap_inputs(ctx, track, race_num):
+    return ctx.dataset_manager.get_lap_data_files(track, race_num)
+
+
+def _map_inputs(ctx, track, race_num):
+    map_path = ctx.track_map_cache.map_path(track)
+    return [map_path] if map_path is not None else []
+
+
+def _artifact_is_current(kind: str, decisions: Callable, inputs: Callable):
+    """is_current for an ArtifactCache artifact named <track>_race<n>."""
+    def is_current(ctx, track, race_num):
+        key = ctx.artifact_cache.artifact_key(kind, inputs(ctx, track, race_num), decisions(ctx))
+        return ctx.artifact_cache.is_current(kind, f"{track}_race{race_num}", key)
+    return is_current
+
+
+def _telemetry_store_decisions(ctx):
+    return code_fingerprint(type(ctx.dataset_manager.telemetry_store))
+
+
+def _telemetry_index_decisions(ctx):
+    from data_processing.telemetry_index import TelemetryIndex
+    return code_fingerprint(TelemetryIndex)
+
+
+def _telemetry_index_is_current(ctx, track, race_num):
+    from data_processing.telemetry_index import TelemetryIndex
+    return TelemetryIndex(ctx.dataset_manager.get_telemetry_file(track, race_num)).load()
+
+
+def _build_telemetry_index(ctx, track, race_num, force):
+    from data_processing.telemetry_index import TelemetryIndex
+    index = TelemetryIndex(ctx.dataset_manager.get_telemetry_file(track, race_num))
+    if force or not index.load():
+        index.build()
+        index.save()
+
+
+def _channel_decisions(ctx):
+    from data_processing.downsampling import downsample_rows
+    from data_processing.telemetry_pyramid import pyramid_levels
+    code = code_fingerprint(type(ctx.channel_store), pyramid_levels, downsample_rows)
+    return f"{ctx.data_cleaner.decision_hash('telemetry')}_{code}"
+
+
+def _build_channels(ctx, track, race_num, force):
+    telemetry_file = ctx.dataset_manager.get_telemetry_file(track, race_num)
+    if force or not ctx.channel_store.is_built(track, race_num, telemetry_file):
+        ctx.channel_store.build(track, race_num, ctx.dataset_manager, ctx.data_cleaner)
+
+
+def _prebuilt_map_renders(ctx, track) -> List[Tuple[str, Callable]]:
+    """(render name, render function) of every map image built ahead of time."""
+    cache = ctx.track_map_cache
+    renders = [(f"map_{zoom:g}", lambda zoom=zoom: cache.get_map(track, zoom)) for zoom in PREBUILT_MAP_ZOOMS]
+    info = cache.tile_info(track)
+    for level in (info["levels"][:PREBUILT_TILE_LEVELS] if info is not None else []):
+        for x in range(level["tiles_x"]):
+            for y in range(level["tiles_y"]):
+                renders.append((
+                    f"tile_{level['z']}_{x}_{y}",
+                    lambda z=level["z"], x=x, y=y: cache.get_tile(track, z, x, y)
+                ))
+    return renders
+
+
+def _track_map_is_current(ctx, track, race_num):
+    return all(ctx.track_map_cache.is_rendered(track, name) for name, _ in _prebuilt_map_renders(ctx, track))
+
+
+def _build_track_map(ctx, track, race_num, force):
+    if force:
+        shutil.rmtree(ctx.track_map_cache.cache_dir / track, ignore_errors=True)
+    for _, render in _prebuilt_map_renders(ctx, track):
+        render()
+
+
+def _lap_analytics_decisions(ctx):
+    return ctx.artifact_cache.lap_analytics_decisions(ctx.data_cleaner, ctx.lap_analyzer)
+
+
+def _centerline_decisions(ctx):
+    return ctx.artifact_cache.centerline_decisions(ctx.data_cleaner)
+
+
+def _centerline_is_current(ctx, track, race_num):
+    key = ctx.artifact_cache.artifact_key(
+        "centerlines", _track_telemetry_inputs(ctx, track, race_num), _centerline_decisions(ctx)
+    )
+    return ctx.artifact_cache.is_current("centerlines", track, key)
+
+
+def _racing_line_decisions(ctx):
+    return ctx.artifact_cache.racing_line_decisions(ctx.data_cleaner, ctx.racing_line_generator)
+
+
+# Steps in dependency order. Laps, lap analytics, centerlines and racing lines go through
+# ArtifactCache, channel arrays and the telemetry store through their own stores,
+# so the API picks up every output through its usual lookups.
+STEPS = {step.name: step for step in [
+    BuildStep(
+        "telemetry_store", _telemetry_inputs,
+        _telemetry_store_decisions,
+        lambda ctx, track, race_num: ctx.dataset_manager.telemetry_store.is_built(
+            track, race_num, ctx.dataset_manager.get_telemetry_file(track, race_num)),
+        lambda ctx, track, race_num, force: ctx.dataset_manager.build_telemetry_store(track, race_num, force=force)
+    ),
+    BuildStep(
+        "telemetry_index", _telemetry_inputs,
+        _telemetry_index_decisions,
+        _telemetry_index_is_current,
+        _build_telemetry_index
+    ),
+    BuildStep(
+        "channels", _telemetry_inputs,
+        _channel_decisions,
+        lambda ctx, track, race_num: ctx.channel_store.is_built(
+            track, race_num, ctx.dataset_manager.get_telemetry_file(track, race_num)),
+        _build_channels,
+        depends_on=("telemetry_store",)
+    ),
+    BuildStep(
+        "centerline", _track_telemetry_inputs,
+        _centerline_decisions,
+        _centerline_is_current,
+        lambda ctx, track, race_num, force: ctx.artifact_cache.load_centerline(
+            track, ctx.dataset_manager, ctx.data_cleaner, ctx.channel_store, rebuild=force),
+        per_race=False
+    ),
+    BuildStep(
+        "racing_lines", _racing_line_inputs,
+        _racing_line_decisions,
+        _artifact_is_current("racing_lines", _racing_line_decisions, _racing_line_inputs),
+        lambda ctx, track, race_num, force: ctx.artifact_cache.load_racing_lines(
+            track, race_num, ctx.dataset_manager, ctx.data_cleaner, ctx.channel_store,
+            ctx.racing_line_generator, rebuild=force),
+        depends_on=("channels", "centerline")
+    ),
+    BuildStep(
+        "laps", _lap_inputs,
+        lambda ctx: ctx.data_cleaner.decision_hash("laps"),
+        _artifact_is_current("laps", lambda ctx: ctx.data_cleaner.decision_hash("laps"), _lap_inputs),
+        lambda ctx, track, race_num, force: ctx.artifact_cache.load_lap_data(
+            track, race_num, ctx.dataset_manager, ctx.data_cleaner, rebuild=force)
+    ),
+    BuildStep(
+        "lap_analytics", _lap_inputs,
+        _lap_analytics_decisions,
+        _artifact_is_current("lap_analytics", _lap_analytics_decisions, _lap_inputs),
+        lambda ctx, track, race_num, force: ctx.artifact_cache.load_lap_analytics(
+            track, race_num, ctx.dataset_manager, ctx.data_cleaner, ctx.lap_analyzer, rebuild=force),
+        depends_on=("laps",)
+    ),
+    BuildStep(
+        "track_map", _map_inputs,
+        lambda ctx: f"{PREBUILT_MAP_ZOOMS}_{PREBUILT_TILE_LEVELS}",
+        _track_map_is_current,
+        _build_track_map,
+        per_race=False
+    )
+]}
+
+
+def run_step(step_name: str, track: str, race_num: Optional[int], force: bool) -> float:
+    """
+    Run one build step in this process; the unit of work sent to the process pool.
+
+    Returns:
+        Seconds the step took
+    """
+    started = time.perf_counter()
+    STEPS[step_name].run(get_context(), track, race_num, force)
+    return time.perf_counter() - started
+
+
+class BuildNode:
+    """One step for one race (or track) in the build graph."""
+
+    def __init__(self, step: BuildStep, track: str, race_num: Optional[int], inputs: List[Path]):
+        self.step = step
+        self.track = track
+        self.race_num = race_num
+        self.inputs = inputs
+        self.key: Optional[str] = None
+        self.force = False
+        self.status = "pending"
+        self.seconds = 0.0
+
+    @property
+    def node_id(self) -> str:
+        return node_id(self.step.name, self.track, self.race_num)
+
+    @property
+    def dependencies(self) -> List[str]:
+        return [node_id(name, self.track, self.race_num if STEPS[name].per_race else None)
+                for name in self.step.depends_on]
+
+
+def node_id(step_name: str, track: str, race_num: Optional[int]) -> str:
+    """Id of a node, e.g. 'channels:Sebring:1' or 'track_map:Sebring'."""
+    return f"{step_name}:{track}" if race_num is None else f"{step_name}:{track}:{race_num}"
+
+
+class BuildGraph:
+    """
+    Incremental build of every derived artifact the API serves.
+
+    Each node's key hashes the content of its source files, its code/decision
+    hash and the keys of the nodes it depends on. Keys are persisted after every
+    node, so a rerun skips nodes whose key is unchanged and whose output still
+    passes the API's own staleness check; adding one race builds only that race's
+    nodes. A node whose key changed is rebuilt even if its output looks current,
+    e.g. when a dependency was rebuilt. Content hashes are cached by file
+    signature (size and mtime), so unchanged files are not read again.
+    """
+
+    def __init__(self, state_file: Path = PREPROCESS_STATE_FILE):
+        self.state_file = Path(state_file)
+        self.state = self._load_state()
+        self.nodes: Dict[str, BuildNode] = {}
+
+    def _load_state(self) -> Dict:
+        """Read the persisted build state, or an empty one."""
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            return {"hashes": state.get("hashes", {}), "nodes": state.get("nodes", {})}
+        except FileNotFoundError:
+            return {"hashes": {}, "nodes": {}}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable preprocess state {self.state_file}, rebuilding: {e}")
+            return {"hashes": {}, "nodes": {}}
+
+    def save_state(self) -> None:
+        """Write the build state atomically."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+
+    def plan(self, ctx: BuildContext, tracks: Optional[List[str]] = None) -> List[BuildNode]:
+        """
+        Create the nodes for every available race and map, in dependency order.
+
+        Args:
+            ctx: BuildContext of this process
+            tracks: Only plan these tracks, all available ones if None
+
+        Returns:
+            Planned nodes
+        """
+        races = {
+            track: race_nums for track, race_nums in ctx.dataset_manager.get_available_races().items()
+            if tracks is None or track in tracks
+        }
+        for track, race_nums in races.items():
+            for step in STEPS.values():
+                for race_num in (race_nums if step.per_race else [None]):
+                    inputs = step.inputs(ctx, track, race_num)
+                    if inputs:
+                        node = BuildNode(step, track, race_num, inputs)
+                        self.nodes[node.node_id] = node
+        return list(self.nodes.values())
+
+    def hash_inputs(self, executor: Executor) -> None:
+        """Content-hash every input file whose signature changed since the last run."""
+        hashes = self.state["hashes"]
+        paths = {path for node in self.nodes.values() for path in node.inputs}
+        signatures = {path: file_signature(path) for path in paths}
+        stale = [path for path in paths if hashes.get(str(path), {}).get("signature") != signatures[path]]
+
+        if stale:
+            logger.info(f"Hashing {len(stale)} changed source files")
+        for path, digest in zip(stale, executor.map(content_hash, stale)):
+            hashes[str(path)] = {"signature": signatures[path], "sha256": digest}
+
+    def compute_keys(self, ctx: BuildContext) -> None:
+        """Key every node from its inputs' content, its decisions and its dependencies' keys."""
+        for node in self.nodes.values():
+            stored = {
+                "step": node.node_id,
+                "inputs": [self.state["hashes"][str(path)]["sha256"] for path in node.inputs],
+                "decisions": node.step.decisions(ctx),
+                "dependencies": [self.nodes[dep].key for dep in node.dependencies if dep in self.nodes]
+            }
+            node.key = hashlib.sha256(json.dumps(stored, sort_keys=True).encode()).hexdigest()
+
+    def run(self, jobs: int, force: bool = False, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Build every out-of-date node, running independent nodes in parallel.
+
+        Args:
+            jobs: Worker processes
+            force: Rebuild every node
+            dry_run: Only report which nodes would be built
+
+        Returns:
+            Number of nodes per final status: 'up to date', 'built', 'failed', 'blocked'
+            (or 'would build' for a dry run)
+        """
+        ctx = get_context()
+        # Persist the dataset manifest first, so workers load it instead of each scanning
+        ctx.dataset_manager.manifest.get()
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            self.hash_inputs(executor)
+            self.compute_keys(ctx)
+            self.save_state()
+
+            for node in self.nodes.values():
+                recorded = self.state["nodes"].get(node.node_id, {}).get("key")
+                # Without a record the output's own check decides, e.g. after the state file was removed
+                node.force = force or (recorded is not None and recorded != node.key)
+                if not node.force and node.step.is_current(ctx, node.track, node.race_num):
+                    node.status = "up to date"
+                elif dry_run:
+                    node.status = "would build"
+
+            if not dry_run:
+                self._execute(executor)
+
+        counts: Dict[str, int] = {}
+        for node in self.nodes.values():
+            counts[node.status] = counts.get(node.status, 0) + 1
+        return counts
+
+    def _execute(self, executor: Executor) -> None:
+        """Submit pending nodes as their dependencies finish, recording each result."""
+        running = {}
+
+        def ready(node: BuildNode) -> bool:
+            return all(self.nodes[dep].status in ("up to date", "built")
+                       for dep in node.dependencies if dep in self.nodes)
+
+        def blocked(node: BuildNode) -> bool:
+            return any(self.nodes[dep].status in ("failed", "blocked")
+                       for dep in node.dependencies if dep in self.nodes)
+
+        while True:
+            for node in self.nodes.values():
+                if node.status != "pending":
+                    continue
+                if blocked(node):
+                    node.status = "blocked"
+                    logger.warning(f"Skipping {node.node_id}: a dependency failed")
+                elif ready(node):
+                    node.status = "running"
+                    future = executor.submit(run_step, node.step.name, node.track, node.race_num, node.force)
+                    running[future] = node
+                    logger.info(f"Building {node.node_id}")
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    node.seconds = future.result()
+                except Exception as e:
+                    node.status = "failed"
+                    logger.error(f"Failed to build {node.node_id}: {e}", exc_info=True)
+                    continue
+
+                node.status = "built"
+                self.state["nodes"][node.node_id] = {"key": node.key, "seconds": round(node.seconds, 3)}
+                self.save_state()
+                logger.info(f"Built {node.node_id} in {node.seconds:.2f}s")
+
+        # Nodes that did not need building are current for their key
+        for node in self.nodes.values():
+            if node.status == "up to date":
+                self.state["nodes"].setdefault(node.node_id, {"key": node.key})
+        self.save_state()
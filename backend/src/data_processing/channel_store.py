@@ -0,0 +1,326 @@
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import CHANNEL_STORE_DIR
+from data_processing.data_cleaner import DataCleaner
+from data_processing.telemetry_pyramid import LapPyramid, elapsed_seconds, pyramid_levels
+from utils.fingerprint import file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelStore:
+    """
+    Memory-mapped per-channel arrays of cleaned, wide-format telemetry.
+
+    Each race is stored as one .npy file per channel plus an offsets table that
+    maps every (vehicle, lap) to a row slice. Lap requests read only their rows
+    from np.load(mmap_mode='r') arrays, so there is no parsing or pivoting per
+    request and several worker processes share the same OS page cache.
+
+    Each lap's downsampled pyramid levels are stored alongside as row positions
+    into its slice, for zoomable chart windows.
+    """
+
+    OFFSETS_FILE = "offsets.npy"
+    TIMESTAMP_FILE = "timestamp.npy"
+    ELAPSED_FILE = "elapsed.npy"
+    PYRAMID_FILE = "pyramid.npy"
+    PYRAMID_OFFSETS_FILE = "pyramid_offsets.npy"
+    SOURCE_FILE = "_source.json"
+
+    # Bumped when the set of stored files changes, so older stores are rebuilt
+    LAYOUT_VERSION = 2
+
+    OFFSETS_DTYPE = np.dtype([
+        ("vehicle", np.int32),
+        ("lap", np.int32),
+        ("start", np.int64),
+        ("stop", np.int64)
+    ])
+
+    PYRAMID_OFFSETS_DTYPE = np.dtype([
+        ("vehicle", np.int32),
+        ("lap", np.int32),
+        ("level", np.int32),
+        ("start", np.int64),
+        ("stop", np.int64)
+    ])
+
+    def __init__(self, store_dir: Path = CHANNEL_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self._open_races: Dict[Path, Dict] = {}
+
+    def race_path(self, track: str, race_num: int) -> Path:
+        """Directory holding the channel arrays for a race."""
+        return self.store_dir / track / f"Race {race_num}"
+
+    def is_built(self, track: str, race_num: int, source_file: Path) -> bool:
+        """
+        Check if up-to-date channel arrays exist for a race.
+
+        Arrays are stale when the source file or the telemetry cleaning decisions
+        they were built with have changed.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            source_file: Raw telemetry CSV the arrays were built from
+
+        Returns:
+            True if the arrays exist and match the current source file
+        """
+        return self._read_manifest(track, race_num, source_file) is not None
+
+    def _read_manifest(self, track: str, race_num: int, source_file: Path) -> Optional[Dict]:
+        """Read the race manifest, or None if it is missing or stale."""
+        manifest_file = self.race_path(track, race_num) / self.SOURCE_FILE
+        if not manifest_file.exists():
+            return None
+
+        try:
+            with open(manifest_file) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable channel store manifest for {track} Race {race_num}: {e}")
+            return None
+
+        if manifest.get("source") != file_signature(source_file):
+            return None
+        # Arrays cleaned under different preprocessing decisions are stale too
+        if manifest.get("cleaner") != DataCleaner.decision_hash("telemetry"):
+            return None
+        if manifest.get("layout") != self.LAYOUT_VERSION:
+            return None
+        return manifest
+
+    def build(self, track: str, race_num: int, dataset_manager, data_cleaner) -> Optional[Path]:
+        """
+        Clean every (vehicle, lap) of a race and persist it as channel arrays.
+
+        Laps are cleaned one at a time with DataCleaner.clean_telemetry_data, the
+        same way a per-driver lap request is, so served slices match the
+        on-demand path.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            dataset_manager: DatasetManager to load raw telemetry from
+            data_cleaner: DataCleaner used to pivot and clean each lap
+
+        Returns:
+            Path of the built race directory, or None if there was no telemetry
+        """
+        source_file = dataset_manager.get_telemetry_file(track, race_num)
+        keys = dataset_manager.get_telemetry_keys(track, race_num)
+        if source_file is None or not keys:
+            logger.warning(f"No telemetry to build channel arrays for {track} Race {race_num}")
+            return None
+
+        frames: List[pd.DataFrame] = []
+        elapsed: List[np.ndarray] = []
+        offsets = []
+        pyramid: List[np.ndarray] = []
+        pyramid_offsets = []
+        row = 0
+        pyramid_row = 0
+        for vehicle, lap in sorted(keys):
+            raw = dataset_manager.load_telemetry_data(track, race_num, lap, vehicle=vehicle)
+            cleaned = data_cleaner.clean_telemetry_data(raw)
+            if cleaned is None or cleaned.empty:
+                continue
+
+            frames.append(cleaned)
+            elapsed.append(elapsed_seconds(cleaned["timestamp"]))
+            offsets.append((vehicle, lap, row, row + len(cleaned)))
+            row += len(cleaned)
+
+            for level, rows in enumerate(pyramid_levels(cleaned), start=1):
+                pyramid.append(rows.astype(np.int32))
+                pyramid_offsets.append((vehicle, lap, level, pyramid_row, pyramid_row + len(rows)))
+                pyramid_row += len(rows)
+
+        if not frames:
+            return None
+
+        combined = pd.concat(frames, ignore_index=True)
+        channels = sorted(col for col in combined.columns if col not in ("timestamp", "lap"))
+
+        race_path = self.race_path(track, race_num)
+        tmp_path = race_path.with_name(race_path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        for channel in channels:
+            np.save(tmp_path / f"{channel}.npy", combined[channel].to_numpy(dtype=np.float32))
+        np.save(tmp_path / self.TIMESTAMP_FILE, combined["timestamp"].astype(str).to_numpy(dtype=np.bytes_))
+        np.save(tmp_path / self.OFFSETS_FILE, np.array(offsets, dtype=self.OFFSETS_DTYPE))
+        np.save(tmp_path / self.ELAPSED_FILE, np.concatenate(elapsed))
+        np.save(tmp_path / self.PYRAMID_FILE, np.concatenate(pyramid) if pyramid else np.empty(0, dtype=np.int32))
+        np.save(tmp_path / self.PYRAMID_OFFSETS_FILE, np.array(pyramid_offsets, dtype=self.PYRAMID_OFFSETS_DTYPE))
+
+        with open(tmp_path / self.SOURCE_FILE, "w") as f:
+            json.dump({
+                "source": file_signature(source_file),
+                "cleaner": data_cleaner.decision_hash("telemetry"),
+                "layout": self.LAYOUT_VERSION,
+                "channels": channels
+            }, f)
+
+        self._open_races.pop(race_path, None)
+        shutil.rmtree(race_path, ignore_errors=True)
+        tmp_path.rename(race_path)
+
+        logger.info(f"Built channel arrays for {track} Race {race_num}: {row} rows, {len(channels)} channels")
+        return race_path
+
+    def _open(self, track: str, race_num: int, source_file: Path) -> Optional[Dict]:
+        """
+        Memory-map the arrays for a race, reusing maps that are still current.
+
+        Maps are reused only while the manifest file is the one they were opened
+        with. A rebuild, here or by another process, renames a new directory into
+        place, so its manifest has a new inode even when source and cleaner match.
+        """
+        race_path = self.race_path(track, race_num)
+        try:
+            # Taken before the manifest is read, so a concurrent rebuild can only force a remap
+            stat = (race_path / self.SOURCE_FILE).stat()
+        except OSError:
+            self._open_races.pop(race_path, None)
+            return None
+        manifest = self._read_manifest(track, race_num, source_file)
+        if manifest is None:
+            self._open_races.pop(race_path, None)
+            return None
+
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size, json.dumps(manifest, sort_keys=True))
+        opened = self._open_races.get(race_path)
+        if opened is not None and opened["version"] == version:
+            return opened
+
+        opened = {
+            "version": version,
+            "offsets": np.load(race_path / self.OFFSETS_FILE),
+            "timestamp": np.load(race_path / self.TIMESTAMP_FILE, mmap_mode="r"),
+            "elapsed": np.load(race_path / self.ELAPSED_FILE, mmap_mode="r"),
+            "pyramid": np.load(race_path / self.PYRAMID_FILE, mmap_mode="r"),
+            "pyramid_offsets": np.load(race_path / self.PYRAMID_OFFSETS_FILE),
+            "channels": {
+                channel: np.load(race_path / f"{channel}.npy", mmap_mode="r")
+                for channel in manifest["channels"]
+            }
+        }
+        self._open_races[race_path] = opened
+        return opened
+
+    @staticmethod
+    def _lap_rows(opened: Dict, lap: int, vehicle: int) -> Optional[slice]:
+        """Row slice of one vehicle's lap in an opened race, or None if it is not stored."""
+        offsets = opened["offsets"]
+        match = offsets[(offsets["vehicle"] == vehicle) & (offsets["lap"] == lap)]
+        if len(match) == 0:
+            return None
+        return slice(int(match["start"][0]), int(match["stop"][0]))
+
+    def get_lap_arrays(self, track: str, race_num: int, lap: int, vehicle: int,
+                       source_file: Path) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get zero-copy views of every channel for one vehicle's lap.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Lap number
+            vehicle: Vehicle number
+            source_file: Raw telemetry CSV, used to reject stale arrays
+
+        Returns:
+            Dictionary mapping channel name to a read-only array view, or None
+        """
+        opened = self._open(track, race_num, source_file)
+        if opened is None:
+            return None
+
+        rows = self._lap_rows(opened, lap, vehicle)
+        if rows is None:
+            return None
+
+        arrays = {"timestamp": opened["timestamp"][rows]}
+        for channel, values in opened["channels"].items():
+            # Channels the lap never logged are skipped, as the pivot drops them
+            if not np.isnan(values[rows]).all():
+                arrays[channel] = values[rows]
+        return arrays
+
+    def load_lap(self, track: str, race_num: int, lap: int, vehicle: int,
+                 source_file: Path) -> Optional[pd.DataFrame]:
+        """
+        Load one vehicle's cleaned lap as a DataFrame.
+
+        Only the lap's rows are read from the mapped arrays, but the frame owns
+        its data: timestamps are decoded to strings, as the on-demand cleaning
+        path serves them, and pandas consolidates the channels into one block.
+        Use get_lap_arrays for views.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Lap number
+            vehicle: Vehicle number
+            source_file: Raw telemetry CSV, used to reject stale arrays
+
+        Returns:
+            Wide-format telemetry DataFrame or None if the lap is not stored
+        """
+        arrays = self.get_lap_arrays(track, race_num, lap, vehicle, source_file)
+        if arrays is None:
+            return None
+
+        timestamps = arrays.pop("timestamp")
+        columns = {
+            "timestamp": timestamps.astype(str),
+            "lap": np.full(len(timestamps), lap, dtype=np.int32)
+        }
+        columns.update(arrays)
+        return pd.DataFrame(columns)
+
+    def load_lap_pyramid(self, track: str, race_num: int, lap: int, vehicle: int,
+                         source_file: Path) -> Optional[LapPyramid]:
+        """
+        Load one vehicle's lap with its prebuilt pyramid levels.
+
+        Channels and timestamps stay memory-mapped views; only the rows a window
+        selects are read.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Lap number
+            vehicle: Vehicle number
+            source_file: Raw telemetry CSV, used to reject stale arrays
+
+        Returns:
+            LapPyramid or None if the lap is not stored
+        """
+        arrays = self.get_lap_arrays(track, race_num, lap, vehicle, source_file)
+        if arrays is None:
+            return None
+
+        opened = self._open(track, race_num, source_file)
+        rows = self._lap_rows(opened, lap, vehicle)
+        pyramid_offsets = opened["pyramid_offsets"]
+        match = np.sort(
+            pyramid_offsets[(pyramid_offsets["vehicle"] == vehicle) & (pyramid_offsets["lap"] == lap)],
+            order="level"
+        )
+        levels = [np.asarray(opened["pyramid"][start:stop]) for start, stop in zip(match["start"], match["stop"])]
+
+        timestamps = arrays.pop("timestamp")
+        return LapPyramid(lap, timestamps, opened["elapsed"][rows], arrays, levels)
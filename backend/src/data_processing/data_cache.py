@@ -1,38 +1,70 @@
 from collections import OrderedDict
+import asyncio
 import pandas as pd
 import sys
 import logging
-from typing import Optional, Any
+import threading
+from concurrent.futures import Executor
+from typing import Optional, Any, Callable, Dict
 
 from config import CACHE_MAX_SIZE_MB
+from data_processing.spill_cache import SpillCache
 
 logger = logging.getLogger(__name__)
 
 
+class _Flight:
+    """A computation in progress that concurrent callers for the same key wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
 class DataCache:
     """
     In-memory LRU cache for race data.
     Implements Least Recently Used eviction policy to manage memory usage.
+    
+    DataFrames evicted from memory are spilled to a bounded on-disk tier
+    (SpillCache), and a memory miss promotes them back before falling back to
+    recomputation.
+    
+    get_or_compute coalesces concurrent misses: while one caller computes a key,
+    other callers for the same key wait for its result instead of repeating the
+    work. All access is guarded by a lock, so the cache is safe to share between
+    threads and the asyncio event loop.
     """
     
-    def __init__(self, max_size_mb: int = CACHE_MAX_SIZE_MB):
+    def __init__(self, max_size_mb: int = CACHE_MAX_SIZE_MB, spill_cache: Optional[SpillCache] = None,
+                 executor: Optional[Executor] = None):
         self.cache = OrderedDict()
+        self.executor = executor
+        self.spill = spill_cache or SpillCache()
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.current_size_bytes = 0
         self.hits = 0
         self.misses = 0
+        self.computations = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.RLock()
         logger.info(f"DataCache initialized with max size {max_size_mb}MB")
     
     def _get_size(self, obj: Any) -> int:
         """Estimate memory size of object in bytes."""
         if isinstance(obj, pd.DataFrame):
             return obj.memory_usage(deep=True).sum()
+        elif hasattr(obj, 'nbytes'):
+            return obj.nbytes
         else:
             return sys.getsizeof(obj)
     
     def get(self, key: str) -> Optional[Any]:
         """
-        Retrieve item from cache.
+        Retrieve item from cache, promoting it from the disk tier if spilled.
         
         Args:
             key: Cache key
@@ -40,91 +72,185 @@ class DataCache:
         Returns:
             Cached object or None if not found
         """
-        if key in self.cache:
-            # Move to end (most recently used)
-            self.cache.move_to_end(key)
-            self.hits += 1
-            logger.debug(f"Cache hit: {key}")
-            return self.cache[key]
+        with self._lock:
+            if key in self.cache:
+                # Move to end (most recently used)
+                self.cache.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Cache hit: {key}")
+                return self.cache[key]
+            
+            self.misses += 1
+            logger.debug(f"Cache miss: {key}")
         
-        self.misses += 1
-        logger.debug(f"Cache miss: {key}")
-        return None
+        return self._promote(key)
+    
+    def _promote(self, key: str) -> Optional[Any]:
+        """Move a spilled entry back into memory, or return None if it is not on disk."""
+        value = self.spill.pop(key)
+        if value is not None:
+            logger.debug(f"Promoted from disk: {key}")
+            self.put(key, value)
+        return value
     
     def put(self, key: str, value: Any) -> None:
         """
         Store item in cache with LRU eviction.
         
+        Evicted DataFrames are written to the disk tier instead of being dropped.
+        
         Args:
             key: Cache key
             value: Object to cache
         """
-        # If key exists, remove it first to update size
-        if key in self.cache:
-            old_size = self._get_size(self.cache[key])
-            self.current_size_bytes -= old_size
-            del self.cache[key]
-        
-        # Calculate size of new value
-        value_size = self._get_size(value)
-        
-        # Evict least recently used items if necessary
-        while self.current_size_bytes + value_size > self.max_size_bytes and self.cache:
-            evicted_key, evicted_value = self.cache.popitem(last=False)
-            evicted_size = self._get_size(evicted_value)
-            self.current_size_bytes -= evicted_size
-            logger.info(f"Evicted cache entry: {evicted_key} ({evicted_size / 1024 / 1024:.2f}MB)")
+        with self._lock:
+            # If key exists, remove it first to update size
+            if key in self.cache:
+                old_size = self._get_size(self.cache[key])
+                self.current_size_bytes -= old_size
+                del self.cache[key]
+            
+            # Calculate size of new value
+            value_size = self._get_size(value)
+            
+            # Evict least recently used items if necessary
+            evicted = []
+            while self.current_size_bytes + value_size > self.max_size_bytes and self.cache:
+                evicted_key, evicted_value = self.cache.popitem(last=False)
+                evicted_size = self._get_size(evicted_value)
+                self.current_size_bytes -= evicted_size
+                evicted.append((evicted_key, evicted_value))
+                logger.info(f"Evicted cache entry: {evicted_key} ({evicted_size / 1024 / 1024:.2f}MB)")
+            
+            # Add new value
+            self.cache[key] = value
+            self.current_size_bytes += value_size
+            logger.debug(f"Cached: {key} ({value_size / 1024 / 1024:.2f}MB)")
         
-        # Add new value
-        self.cache[key] = value
-        self.current_size_bytes += value_size
-        logger.debug(f"Cached: {key} ({value_size / 1024 / 1024:.2f}MB)")
+        # Disk writes happen outside the lock so readers are not held up
+        self.spill.discard(key)
+        for evicted_key, evicted_value in evicted:
+            self.spill.put(evicted_key, evicted_value)
     
     def clear(self) -> None:
         """Clear all cached data."""
-        self.cache.clear()
-        self.current_size_bytes = 0
+        with self._lock:
+            self.cache.clear()
+            self.current_size_bytes = 0
+        self.spill.clear()
         logger.info("Cache cleared")
     
-    def get_stats(self) -> dict:
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
         """
-        Get cache statistics.
+        Get an item from cache, computing it once if missing.
         
+        If another caller is already computing the same key, this call waits for
+        that result (or exception) instead of computing it again. None results
+        are returned but not cached.
+        
+        Args:
+            key: Cache key
+            compute: Function that produces the value on a miss
+            
         Returns:
-            Dictionary with cache stats
+            Cached or freshly computed value
         """
-        total_requests = self.hits + self.misses
-        hit_rate = self.hits / total_requests if total_requests > 0 else 0
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.misses += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+                leader = True
+        
+        if not leader:
+            logger.debug(f"Waiting for in-flight computation: {key}")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
         
-        return {
-            "size_mb": self.current_size_bytes / 1024 / 1024,
-            "max_size_mb": self.max_size_bytes / 1024 / 1024,
-            "entries": len(self.cache),
-            "hits": self.hits,
-            "misses": self.misses,
-            "hit_rate": hit_rate
-        }
+        try:
+            # Promoting a spilled entry is part of the flight, so waiters share it too
+            flight.result = self._promote(key)
+            if flight.result is None:
+                with self._lock:
+                    self.computations += 1
+                flight.result = compute()
+                if flight.result is not None:
+                    self.put(key, flight.result)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
     
-    def warm_cache(self, dataset_manager) -> None:
+    async def aget_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
         """
-        Pre-load frequently accessed data into cache.
+        Async get_or_compute for request handlers.
+        
+        Hits are served directly on the event loop. Misses run in the cache's
+        executor (the loop's default thread pool if none was given), so loading and cleaning never block the loop and concurrent
+        requests for the same key share one computation.
         
         Args:
-            dataset_manager: DatasetManager instance to load data from
+            key: Cache key
+            compute: Blocking function that produces the value on a miss
+            
+        Returns:
+            Cached or freshly computed value
         """
-        logger.info("Warming cache with race metadata...")
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached
         
-        available_races = dataset_manager.get_available_races()
-        
-        # Cache metadata for all races
-        for track, races in available_races.items():
-            for race_num in races:
-                key = f"{track}_{race_num}_metadata"
-                
-                # Load race results as metadata
-                results = dataset_manager.load_race_results(track, race_num)
-                if results is not None:
-                    self.put(key, results)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.get_or_compute, key, compute)
+    
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
         
-        stats = self.get_stats()
-        logger.info(f"Cache warmed: {stats['entries']} entries, {stats['size_mb']:.2f}MB")
+        Returns:
+            Dictionary with cache stats
+        """
+        with self._lock:
+            total_requests = self.hits + self.misses
+            hit_rate = self.hits / total_requests if total_requests > 0 else 0
+            total_loads = self.computations + self.coalesced
+            dedup_rate = self.coalesced / total_loads if total_loads > 0 else 0
+            disk_stats = self.spill.get_stats()
+            combined_hits = self.hits + disk_stats["hits"]
+            
+            return {
+                "size_mb": self.current_size_bytes / 1024 / 1024,
+                "max_size_mb": self.max_size_bytes / 1024 / 1024,
+                "entries": len(self.cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": hit_rate,
+                "disk": disk_stats,
+                "combined_hit_rate": combined_hits / total_requests if total_requests > 0 else 0,
+                "computations": self.computations,
+                "coalesced": self.coalesced,
+                "dedup_rate": dedup_rate,
+                "in_flight": len(self._inflight),
+                # Only keys still being computed, so the report stays bounded; totals are in coalesced
+                "waiters_by_key": {k: f.waiters for k, f in self._inflight.items() if f.waiters}
+            }
@@ -1,9 +1,20 @@
+import hashlib
+import inspect
+import json
 import pandas as pd
 import numpy as np
 import logging
+from functools import lru_cache
 from typing import Tuple
 
-from constants import INVALID_LAP_NUMBER, TELEMETRY_COLUMNS
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pc = None
+
+from constants import INVALID_LAP_NUMBER, MISSING_LAP_GAP_RATIO, TELEMETRY_COLUMNS
+from data_processing.schema_registry import SCHEMAS
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +25,66 @@ class DataCleaner:
     All cleaning decisions are documented in docs/data_preprocessing_decisions.md
     """
     
+    # Methods and constants behind each cleaned output. Changing any of them changes
+    # that output's decision hash, which invalidates only its cached artifacts.
+    CLEANING_DECISIONS = {
+        "laps": {
+            "methods": [
+                "clean_lap_data",
+                "convert_lap_time_to_seconds",
+                "convert_lap_times_to_seconds",
+                "_parse_lap_time_strings",
+                "convert_elapsed_to_seconds",
+                "_parse_elapsed_strings",
+                "fix_invalid_lap_numbers",
+                "calculate_missing_sectors",
+                "detect_pit_laps"
+            ],
+            "constants": {
+                "INVALID_LAP_NUMBER": INVALID_LAP_NUMBER,
+                "MISSING_LAP_GAP_RATIO": MISSING_LAP_GAP_RATIO,
+                "SCHEMAS": {kind: SCHEMAS[kind].describe() for kind in ("analysis", "lap_times")}
+            }
+        },
+        "telemetry": {
+            "methods": [
+                "clean_telemetry_data",
+                "pivot_telemetry",
+                "_factorize_runs",
+                "_validate_telemetry_ranges"
+            ],
+            "constants": {
+                "SCHEMAS": {"telemetry": SCHEMAS["telemetry"].describe()}
+            }
+        }
+    }
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def decision_hash(kind: str) -> str:
+        """
+        Hash the cleaning code and constants that produce one kind of output.
+        
+        Args:
+            kind: Key of CLEANING_DECISIONS ('laps' or 'telemetry')
+            
+        Returns:
+            Hex digest identifying the current cleaning decisions for that output
+        """
+        decisions = DataCleaner.CLEANING_DECISIONS[kind]
+        digest = hashlib.sha256(kind.encode())
+        
+        for name in decisions["methods"]:
+            method = getattr(DataCleaner, name)
+            try:
+                digest.update(inspect.getsource(method).encode())
+            except (OSError, TypeError):
+                # Source is unavailable in some deployments; bytecode still tracks changes
+                digest.update(method.__code__.co_code)
+        
+        digest.update(json.dumps(decisions["constants"], sort_keys=True).encode())
+        return digest.hexdigest()[:16]
+    
     @staticmethod
     def clean_telemetry_data(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -35,15 +106,7 @@ class DataCleaner:
         # Check if data is in long format (telemetry_name, telemetry_value columns)
         if 'telemetry_name' in df.columns and 'telemetry_value' in df.columns:
             # Pivot from long to wide format
-            df = df.pivot_table(
-                index=['timestamp', 'lap'],
-                columns='telemetry_name',
-                values='telemetry_value',
-                aggfunc='first'
-            ).reset_index()
-            
-            # Flatten column names
-            df.columns.name = None
+            df = DataCleaner.pivot_telemetry(df)
         
         # Remove duplicate timestamps (Decision #6)
         # Justification: Duplicates are logging artifacts, first occurrence is most accurate
@@ -86,6 +149,114 @@ class DataCleaner:
         
         return df
 
+    @staticmethod
+    def pivot_telemetry(df: pd.DataFrame, index: Tuple[str, ...] = ('timestamp', 'lap')) -> pd.DataFrame:
+        """
+        Pivot long-format telemetry (telemetry_name, telemetry_value) to wide format.
+        
+        Produces the same frame as pivot_table(index=index, columns='telemetry_name',
+        values='telemetry_value', aggfunc='first').reset_index() without a general
+        groupby: index keys and channel names are factorized into integer codes and
+        values are scattered into a preallocated 2-D array, keeping the first
+        non-null value for each (row, channel) cell.
+        
+        Args:
+            df: Long-format telemetry DataFrame
+            index: Columns identifying one wide-format row
+            
+        Returns:
+            Wide-format DataFrame with index columns first, then one column per channel
+        """
+        index = list(index)
+        
+        # Combine the index keys into one integer code per long-format row.
+        # Null keys get code -1 and are dropped, as pivot_table ignores them.
+        values = df['telemetry_value'].to_numpy()
+        valid = ~pd.isna(values)
+        key_uniques = []
+        row_codes = np.zeros(len(df), dtype=np.int64)
+        for col in index:
+            codes, uniques = DataCleaner._factorize_runs(df[col])
+            valid &= codes >= 0
+            row_codes = row_codes * len(uniques) + codes
+            key_uniques.append(uniques)
+        
+        col_codes, channels = pd.factorize(df['telemetry_name'], sort=True)
+        valid &= col_codes >= 0
+        
+        row_codes, row_keys = pd.factorize(row_codes[valid], sort=True)
+        col_codes = col_codes[valid]
+        values = values[valid]
+        
+        # Channels with no non-null value are dropped, as pivot_table's dropna does
+        present = np.bincount(col_codes, minlength=len(channels)) > 0
+        if not present.all():
+            col_codes = (np.cumsum(present) - 1)[col_codes]
+            channels = channels[present]
+        
+        # Recover each output row's key values from the combined code
+        remaining = np.asarray(row_keys, dtype=np.int64)
+        key_values = []
+        for uniques in reversed(key_uniques):
+            remaining, codes = np.divmod(remaining, len(uniques))
+            key_values.append(uniques.take(codes))
+        key_values.reverse()
+        
+        result_dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else np.float64
+        
+        # First-wins: only the first occurrence of each (row, channel) cell is
+        # scattered. Duplicates are rare, so only repeated cells are hashed.
+        cells = row_codes * len(channels) + col_codes
+        repeated = np.bincount(cells, minlength=len(row_keys) * len(channels))[cells] > 1
+        if repeated.any():
+            later = pd.Series(cells[repeated]).duplicated(keep='first').to_numpy()
+            keep = np.ones(len(cells), dtype=bool)
+            keep[np.flatnonzero(repeated)[later]] = False
+            row_codes, col_codes, values = row_codes[keep], col_codes[keep], values[keep]
+        
+        wide = np.full((len(row_keys), len(channels)), np.nan, dtype=result_dtype)
+        wide[row_codes, col_codes] = values
+        
+        columns = {col: pd.Series(vals, dtype=df[col].dtype) for col, vals in zip(index, key_values)}
+        for j, channel in enumerate(channels):
+            columns[channel] = wide[:, j]
+        
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def _factorize_runs(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Factorize a column into sorted codes, hashing each run of repeats once.
+        
+        Long-format telemetry repeats the same timestamp and lap for every channel
+        of a sample, so only the values at run boundaries need hashing.
+        
+        Args:
+            column: Series to factorize
+            
+        Returns:
+            Tuple of (codes with -1 for nulls, sorted unique values)
+        """
+        values = column.to_numpy()
+        if len(values) == 0:
+            return pd.factorize(values, sort=True)
+        
+        run_starts = np.empty(len(values), dtype=bool)
+        run_starts[0] = True
+        nulls = pd.isna(values)
+        if nulls.any():
+            # pd.NA cannot be compared, so nulls are matched by mask and only
+            # neighbouring non-null values are compared
+            np.not_equal(nulls[1:], nulls[:-1], out=run_starts[1:])
+            both = np.flatnonzero(~nulls[1:] & ~nulls[:-1])
+            run_starts[both + 1] = values[both + 1] != values[both]
+        else:
+            np.not_equal(values[1:], values[:-1], out=run_starts[1:])
+        
+        run_codes, uniques = pd.factorize(values[run_starts], sort=True)
+        run_lengths = np.diff(np.append(np.flatnonzero(run_starts), len(values)))
+        return np.repeat(run_codes, run_lengths), pd.Index(uniques)
+
     @staticmethod
     def convert_lap_time_to_seconds(time_str):
         """
@@ -119,6 +290,72 @@ class DataCleaner:
         except (ValueError, AttributeError, IndexError):
             return np.nan
 
+    @staticmethod
+    def convert_lap_times_to_seconds(times: pd.Series) -> pd.Series:
+        """
+        Vectorized convert_lap_time_to_seconds for a whole column.
+        
+        String columns are split on ':' and cast with Arrow compute kernels. If a
+        value cannot be cast, the column is parsed with pd.to_numeric instead, and
+        any value still unparsed goes through the scalar function, so results
+        always match it.
+        
+        Args:
+            times: Series of lap or sector times (strings, numbers or NaN)
+            
+        Returns:
+            Float Series of total seconds, NaN where invalid
+        """
+        if pd.api.types.is_numeric_dtype(times):
+            return times.astype(float)
+        
+        seconds = None
+        if pc is not None and pd.api.types.infer_dtype(times, skipna=True) == 'string':
+            seconds = DataCleaner._parse_lap_time_strings(times)
+        
+        if seconds is None:
+            seconds = pd.to_numeric(times, errors='coerce').astype(float)
+            
+            # Handle M:SS.mmm format
+            text = times.astype(str)
+            has_colon = text.str.contains(':', regex=False)
+            if has_colon.any():
+                parts = text[has_colon].str.strip().str.split(':', expand=True)
+                minutes = pd.to_numeric(parts[0], errors='coerce')
+                part_seconds = pd.to_numeric(parts[1], errors='coerce')
+                seconds[has_colon] = minutes * 60 + part_seconds
+        
+        # Fall back to the scalar parser for anything left unparsed
+        unresolved = seconds.isna() & times.notna()
+        if unresolved.any():
+            seconds[unresolved] = times[unresolved].map(DataCleaner.convert_lap_time_to_seconds)
+        
+        return seconds
+    
+    @staticmethod
+    def _parse_lap_time_strings(times: pd.Series):
+        """
+        Parse a column of time strings with Arrow kernels.
+        
+        Returns:
+            Float Series of total seconds, or None if any value cannot be cast
+        """
+        text = pc.utf8_trim_whitespace(pa.array(times.to_numpy(), type=pa.string(), from_pandas=True))
+        
+        # Appending ':' guarantees a second part, so "SS.mmm" splits into ["SS.mmm", ""]
+        parts = pc.split_pattern(pc.binary_join_element_wise(text, '', ':'), ':', max_splits=2)
+        has_colon = pc.greater(pc.list_value_length(parts), 2)
+        second_part = pc.if_else(has_colon, pc.list_element(parts, 1), pa.scalar('0'))
+        
+        try:
+            first = pc.cast(pc.list_element(parts, 0), pa.float64())
+            second = pc.cast(second_part, pa.float64())
+        except pa.ArrowInvalid:
+            return None
+        
+        seconds = pc.if_else(has_colon, pc.add(pc.multiply(first, 60.0), second), first)
+        return pd.Series(seconds.to_numpy(zero_copy_only=False), index=times.index, dtype=float)
+    
     @staticmethod
     def clean_lap_data(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -147,12 +384,12 @@ class DataCleaner:
         # Convert lap time strings to seconds
         lap_time_col = 'LAP_TIME'
         if lap_time_col in df.columns:
-            df[lap_time_col] = df[lap_time_col].apply(DataCleaner.convert_lap_time_to_seconds)
+            df[lap_time_col] = DataCleaner.convert_lap_times_to_seconds(df[lap_time_col])
         
         # Convert sector times to seconds
         for sector in ['S1_SECONDS', 'S2_SECONDS', 'S3_SECONDS']:
             if sector in df.columns:
-                df[sector] = df[sector].apply(DataCleaner.convert_lap_time_to_seconds)
+                df[sector] = DataCleaner.convert_lap_times_to_seconds(df[sector])
         
         # Fix invalid lap numbers (Decision #3)
         df = DataCleaner.fix_invalid_lap_numbers(df)
@@ -165,6 +402,60 @@ class DataCleaner:
         
         return df
     
+    @staticmethod
+    def convert_elapsed_to_seconds(elapsed: pd.Series) -> pd.Series:
+        """
+        Convert elapsed race time strings (H:MM:SS.mmm, M:SS.mmm or SS.mmm) to seconds.
+        
+        Args:
+            elapsed: Series of elapsed times
+            
+        Returns:
+            Float Series of total seconds, NaN where invalid
+        """
+        if pd.api.types.is_numeric_dtype(elapsed):
+            return elapsed.astype(float)
+        
+        if pc is not None and pd.api.types.infer_dtype(elapsed, skipna=True) == 'string':
+            seconds = DataCleaner._parse_elapsed_strings(elapsed)
+            if seconds is not None:
+                return seconds
+        
+        parts = elapsed.astype(str).str.strip().str.split(':', expand=True)
+        seconds = pd.Series(0.0, index=elapsed.index)
+        for col in parts.columns:
+            part = pd.to_numeric(parts[col], errors='coerce')
+            # Shorter values run out of parts early; their total is already complete
+            present = parts[col].notna()
+            seconds = seconds.where(~present, seconds * 60 + part)
+        
+        return seconds.where(elapsed.notna())
+    
+    @staticmethod
+    def _parse_elapsed_strings(elapsed: pd.Series):
+        """
+        Parse a column of ':'-separated elapsed times with Arrow kernels.
+        
+        Returns:
+            Float Series of total seconds, or None if any part cannot be cast
+        """
+        text = pc.utf8_trim_whitespace(pa.array(elapsed.to_numpy(), type=pa.string(), from_pandas=True))
+        parts = pc.split_pattern(text, ':')
+        
+        try:
+            values = pc.cast(pc.list_flatten(parts), pa.float64()).to_numpy(zero_copy_only=False)
+        except pa.ArrowInvalid:
+            return None
+        
+        # Weight each part by 60 ** (number of parts after it in its value)
+        rows = pc.list_parent_indices(parts).to_numpy()
+        offsets = parts.offsets.to_numpy()
+        parts_after = offsets[rows + 1] - 1 - np.arange(len(values))
+        seconds = np.bincount(rows, values * 60.0 ** parts_after, minlength=len(elapsed))
+        seconds[parts.is_null().to_numpy(zero_copy_only=False)] = np.nan
+        
+        return pd.Series(seconds, index=elapsed.index)
+    
     @staticmethod
     def fix_invalid_lap_numbers(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -175,6 +466,15 @@ class DataCleaner:
         Alternative (drop laps) would lose significant race data
         Impact: All laps retained with corrected lap numbers
         
+        Each driver's laps are numbered in ELAPSED order. A gap between crossings of
+        at least MISSING_LAP_GAP_RATIO typical laps may mean laps were not recorded,
+        but red-flag, safety-car and long pit laps leave the same gap, so the count
+        only skips ahead when the recorded lap counter agrees: both crossings carry a
+        valid LAP_NUMBER and it jumps by more than one, and the jump is what is
+        skipped. Where the counter is invalid on either side of a gap, laps are
+        numbered sequentially, so a lap that truly went unrecorded there shifts the
+        driver's later laps down by one.
+        
         Args:
             df: DataFrame with potentially invalid lap numbers
             
@@ -194,13 +494,39 @@ class DataCleaner:
             
             # Group by driver and sort by timestamp
             if 'NUMBER' in df.columns and 'ELAPSED' in df.columns:
-                df = df.sort_values(['ELAPSED'])
+                elapsed = DataCleaner.convert_elapsed_to_seconds(df['ELAPSED']).to_numpy()
+                order = np.argsort(elapsed, kind='stable')
+                df = df.iloc[order]
+                elapsed = pd.Series(elapsed[order])
+                drivers = df['NUMBER'].to_numpy()
+                
+                # Time since the driver's previous crossing (or the race start)
+                gaps = elapsed.groupby(drivers, sort=False).diff().fillna(elapsed)
+                typical_gap = gaps.groupby(drivers, sort=False).transform('median')
+                ratio = (gaps / typical_gap).to_numpy()
+                
+                # Counter step since the previous crossing, NaN unless both are valid
+                recorded = df[lap_col].astype('float64').to_numpy()
+                recorded[recorded == INVALID_LAP_NUMBER] = np.nan
+                counter_steps = pd.Series(recorded).groupby(drivers, sort=False).diff().to_numpy()
+                
+                laps_covered = np.ones(len(df))
+                missing = (ratio >= MISSING_LAP_GAP_RATIO) & (counter_steps > 1)
+                laps_covered[missing] = counter_steps[missing]
+                
+                lap_numbers = pd.Series(laps_covered).groupby(drivers, sort=False).cumsum()
                 
-                # Recalculate lap numbers based on position in sequence
-                for driver in df['NUMBER'].unique():
-                    driver_mask = df['NUMBER'] == driver
-                    df.loc[driver_mask, lap_col] = range(1, driver_mask.sum() + 1)
+                # Rows without a driver number keep their original lap
+                has_driver = pd.notna(drivers)
+                df[lap_col] = np.where(
+                    has_driver,
+                    lap_numbers.fillna(0).to_numpy().astype(np.int64),
+                    df[lap_col].to_numpy()
+                )
                 
+                skipped = int((laps_covered - 1).sum())
+                if skipped:
+                    logger.info(f"Skipped {skipped} unrecorded laps found from ELAPSED gaps and the lap counter")
                 logger.info(f"Recalculated lap numbers for {invalid_count} laps")
         
         return df
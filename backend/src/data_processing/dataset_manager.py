@@ -1,11 +1,16 @@
 import os
 import pandas as pd
+import numpy as np
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import logging
 
-from config import DATASET_DIR, TRACKS
-from constants import TRACK_NAMES, RACE_NUMBERS
+from config import DATASET_DIR
+from constants import TRACK_NAMES
+from data_processing.telemetry_index import TelemetryIndex
+from data_processing.telemetry_store import TelemetryStore
+from data_processing.dataset_manifest import DatasetManifest
+from data_processing.schema_registry import SCHEMAS, read_source_csv
 
 logger = logging.getLogger(__name__)
 
@@ -16,53 +21,18 @@ class DatasetManager:
     Scans the dataset directory and provides methods to load various data types.
     """
     
-    def __init__(self, dataset_path: Path = DATASET_DIR):
+    def __init__(self, dataset_path: Path = DATASET_DIR, telemetry_store: Optional[TelemetryStore] = None,
+                 manifest: Optional[DatasetManifest] = None):
         self.dataset_path = Path(dataset_path)
-        self.available_races = self._scan_available_races()
-        logger.info(f"DatasetManager initialized with {len(self.available_races)} races")
+        self.telemetry_store = telemetry_store or TelemetryStore()
+        self._telemetry_indexes: Dict[Path, TelemetryIndex] = {}
+        # Resolves every source file path; scanned or loaded on first use
+        self.manifest = manifest or DatasetManifest(self.dataset_path)
     
-    def _scan_available_races(self) -> Dict[str, List[int]]:
-        """
-        Scan dataset directory to find available tracks and races.
-        
-        Returns:
-            Dictionary mapping track names to list of available race numbers
-        """
-        available = {}
-        
-        for track in TRACKS:
-            track_path = self.dataset_path / track
-            
-            if not track_path.exists():
-                logger.warning(f"Track directory not found: {track}")
-                continue
-            
-            # Check for race data files
-            races = []
-            for race_num in RACE_NUMBERS:
-                # Look for race-specific files
-                if self._has_race_data(track, race_num):
-                    races.append(race_num)
-            
-            if races:
-                available[track] = races
-                logger.info(f"Found {len(races)} races for {track}")
-        
-        return available
-    
-    def _has_race_data(self, track: str, race_num: int) -> bool:
-        """Check if race data exists for given track and race number."""
-        track_path = self.dataset_path / track
-        
-        # For barber, files are in root directory
-        if track.lower() == "barber":
-            race_prefix = f"R{race_num}_barber"
-            files = list(track_path.glob(f"{race_prefix}*.csv"))
-            return len(files) > 0
-        
-        # For other tracks, check Race X subdirectory
-        race_dir = track_path / f"Race {race_num}"
-        return race_dir.exists() and any(race_dir.glob("*.csv"))
+    @property
+    def available_races(self) -> Dict[str, List[int]]:
+        """Tracks and race numbers found in the dataset."""
+        return self.manifest.available_races()
     
     def get_available_races(self) -> Dict[str, List[int]]:
         """
@@ -85,28 +55,21 @@ class DatasetManager:
             DataFrame with lap timing data or None if not found
         """
         try:
-            track_path = self.dataset_path / track
+            lap_files = self.get_lap_data_files(track, race_num)
             
             if track.lower() == "barber":
-                # Barber files are in root directory
-                lap_time_file = track_path / f"R{race_num}_barber_lap_time.csv"
-                analysis_file = track_path / f"23_AnalysisEnduranceWithSections_Race {race_num}_Anonymized.CSV"
-                
-                if lap_time_file.exists() and analysis_file.exists():
-                    lap_times = pd.read_csv(lap_time_file)
-                    analysis = pd.read_csv(analysis_file, sep=';')
+                if lap_files:
+                    lap_time_file, analysis_file = lap_files
+                    lap_times = read_source_csv("lap_times", lap_time_file, self.manifest.get_delimiter(track, race_num, "lap_times"))
+                    analysis = read_source_csv("analysis", analysis_file, self.manifest.get_delimiter(track, race_num, "analysis"))
                     
                     # Merge lap times with sector data from analysis
                     merged = self._merge_lap_data(lap_times, analysis)
                     logger.info(f"Loaded {len(merged)} laps for {track} Race {race_num}")
                     return merged
             else:
-                # Other tracks have Race X subdirectory
-                race_dir = track_path / f"Race {race_num}"
-                analysis_file = list(race_dir.glob("*AnalysisEndurance*.CSV"))
-                
-                if analysis_file:
-                    df = pd.read_csv(analysis_file[0], sep=';')
+                if lap_files:
+                    df = read_source_csv("analysis", lap_files[0], self.manifest.get_delimiter(track, race_num, "analysis"))
                     # Strip whitespace from column names for consistency
                     df.columns = df.columns.str.strip()
                     logger.info(f"Loaded {len(df)} laps for {track} Race {race_num}")
@@ -119,6 +82,28 @@ class DatasetManager:
             logger.error(f"Error loading lap data for {track} Race {race_num}: {e}")
             return None
 
+    def get_lap_data_files(self, track: str, race_num: int) -> List[Path]:
+        """
+        Resolve the CSV files lap timing data is loaded from.
+        
+        Args:
+            track: Track name
+            race_num: Race number
+            
+        Returns:
+            List of existing source files, empty if the race has no lap data
+        """
+        analysis_file = self.manifest.get_file(track, race_num, "analysis")
+        if analysis_file is None:
+            return []
+        
+        if track.lower() == "barber":
+            # Barber lap times come from a separate file next to the analysis
+            lap_time_file = self.manifest.get_file(track, race_num, "lap_times")
+            return [lap_time_file, analysis_file] if lap_time_file is not None else []
+        
+        return [analysis_file]
+    
     def _merge_lap_data(self, lap_times: pd.DataFrame, analysis: pd.DataFrame) -> pd.DataFrame:
         """Merge lap time events with sector analysis data."""
         # Analysis data has the sector times we need
@@ -126,59 +111,252 @@ class DatasetManager:
         analysis.columns = analysis.columns.str.strip()
         return analysis
     
-    def load_telemetry_data(self, track: str, race_num: int, lap: Optional[int] = None) -> Optional[pd.DataFrame]:
+    def get_telemetry_file(self, track: str, race_num: int) -> Optional[Path]:
+        """Resolve the raw telemetry CSV for a race, or None if missing."""
+        return self.manifest.get_file(track, race_num, "telemetry")
+    
+    def get_telemetry_keys(self, track: str, race_num: int) -> List[Tuple[int, int]]:
+        """
+        List the (vehicle_number, lap) pairs present in a race's telemetry.
+        
+        Args:
+            track: Track name
+            race_num: Race number
+            
+        Returns:
+            List of (vehicle_number, lap) tuples
+        """
+        telemetry_file = self.get_telemetry_file(track, race_num)
+        if telemetry_file is None:
+            return []
+        
+        if self.telemetry_store.is_built(track, race_num, telemetry_file):
+            return self.telemetry_store.keys(track, race_num)
+        
+        index = self.get_telemetry_index(telemetry_file)
+        if index is None:
+            return []
+        return [key for key in index.ranges if min(key) >= 0]
+    
+    def get_telemetry_index(self, telemetry_file: Path) -> Optional[TelemetryIndex]:
+        """
+        Get the byte-offset index for a telemetry file, building it if needed.
+        
+        The index is loaded from its sidecar file when that matches the current
+        file size and mtime, otherwise it is rebuilt with one pass over the CSV.
+        
+        Args:
+            telemetry_file: Raw telemetry CSV
+            
+        Returns:
+            TelemetryIndex or None if the file could not be indexed
+        """
+        index = self._telemetry_indexes.get(telemetry_file)
+        if index is not None and index.is_current():
+            return index
+        
+        index = TelemetryIndex(telemetry_file)
+        try:
+            if not index.load():
+                index.build()
+                index.save()
+        except Exception as e:
+            logger.warning(f"Could not index telemetry file {telemetry_file}: {e}")
+            return None
+        
+        self._telemetry_indexes[telemetry_file] = index
+        return index
+    
+    def build_telemetry_store(self, track: str, race_num: int, force: bool = False) -> bool:
+        """
+        Convert the raw telemetry CSV for a race into the columnar store.
+        
+        Args:
+            track: Track name
+            race_num: Race number
+            force: Rebuild even if an up-to-date store exists
+            
+        Returns:
+            True if the store is available for the race after the call
+        """
+        telemetry_file = self.get_telemetry_file(track, race_num)
+        if telemetry_file is None:
+            logger.warning(f"No telemetry file found for {track} Race {race_num}")
+            return False
+        
+        if not force and self.telemetry_store.is_built(track, race_num, telemetry_file):
+            logger.info(f"Telemetry store for {track} Race {race_num} is up to date")
+            return True
+        
+        self.telemetry_store.build(track, race_num, telemetry_file)
+        return True
+    
+    def load_telemetry_data(self, track: str, race_num: int, lap: Optional[int] = None,
+                            vehicle: Optional[int] = None) -> Optional[pd.DataFrame]:
         """
         Load telemetry data for specified race and optionally specific lap.
         
+        Reads from the columnar telemetry store when it has been built for the
+        race, and falls back to scanning the raw CSV otherwise.
+        
         Args:
             track: Track name
             race_num: Race number
             lap: Optional lap number to filter by (loads all if None)
+            vehicle: Optional vehicle number to filter by (loads all if None)
             
         Returns:
             DataFrame with telemetry data or None if not found
         """
         try:
-            track_path = self.dataset_path / track
+            telemetry_file = self.get_telemetry_file(track, race_num)
             
-            if track.lower() == "barber":
-                telemetry_file = track_path / f"R{race_num}_barber_telemetry_data.csv"
-            else:
-                race_dir = track_path / f"Race {race_num}"
-                telemetry_files = list(race_dir.glob("*telemetry*.csv"))
-                telemetry_file = telemetry_files[0] if telemetry_files else None
+            if telemetry_file is None:
+                logger.warning(f"No telemetry file found for {track} Race {race_num}")
+                return None
             
-            if telemetry_file and Path(telemetry_file).exists():
-                # If specific lap requested, filter during load for efficiency
-                if lap is not None:
-                    # Read in chunks to filter by lap without loading entire file
-                    chunks = []
-                    for chunk in pd.read_csv(telemetry_file, chunksize=10000):
-                        if 'lap' in chunk.columns:
-                            lap_chunk = chunk[chunk['lap'] == lap]
-                            if not lap_chunk.empty:
-                                chunks.append(lap_chunk)
-                    
-                    if chunks:
-                        df = pd.concat(chunks, ignore_index=True)
-                        logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num} Lap {lap}")
-                        return df
-                    else:
+            if self.telemetry_store.is_built(track, race_num, telemetry_file):
+                df = self.telemetry_store.load(track, race_num, lap=lap, vehicle=vehicle)
+                if df is None:
+                    logger.warning(f"No telemetry data found for lap {lap}")
+                    return None
+                logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num} from store")
+                return df
+            
+            # If specific lap requested, seek straight to its rows via the index
+            if lap is not None:
+                index = self.get_telemetry_index(telemetry_file)
+                if index is not None:
+                    df = index.read(lap=lap, vehicle=vehicle)
+                    if df is None:
                         logger.warning(f"No telemetry data found for lap {lap}")
                         return None
-                else:
-                    # Load all telemetry (use with caution - can be large)
-                    df = pd.read_csv(telemetry_file)
-                    logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num}")
+                    logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num} Lap {lap}")
                     return df
-            
-            logger.warning(f"No telemetry file found for {track} Race {race_num}")
-            return None
+                
+                # Read in chunks to filter by lap without loading entire file
+                chunks = []
+                delimiter = self.manifest.get_delimiter(track, race_num, "telemetry")
+                for chunk in read_source_csv("telemetry", telemetry_file, delimiter, chunksize=10000):
+                    if 'lap' in chunk.columns:
+                        # eq/fillna, as a chunk with an empty lap holds it as pd.NA
+                        lap_chunk = chunk[chunk['lap'].eq(lap).fillna(False)]
+                        if vehicle is not None and 'vehicle_number' in lap_chunk.columns:
+                            lap_chunk = lap_chunk[lap_chunk['vehicle_number'].eq(vehicle).fillna(False)]
+                        if not lap_chunk.empty:
+                            chunks.append(lap_chunk)
+                
+                if chunks:
+                    df = SCHEMAS["telemetry"].cast_ints(pd.concat(chunks, ignore_index=True))
+                    logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num} Lap {lap}")
+                    return df
+                else:
+                    logger.warning(f"No telemetry data found for lap {lap}")
+                    return None
+            else:
+                # Load all telemetry (use with caution - can be large)
+                df = read_source_csv("telemetry", telemetry_file, self.manifest.get_delimiter(track, race_num, "telemetry"))
+                if vehicle is not None and 'vehicle_number' in df.columns:
+                    df = df[df['vehicle_number'] == vehicle]
+                logger.info(f"Loaded {len(df)} telemetry points for {track} Race {race_num}")
+                return df
             
         except Exception as e:
             logger.error(f"Error loading telemetry data: {e}")
             return None
     
+    def load_telemetry_slices(self, track: str, race_num: int,
+                              keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], pd.DataFrame]:
+        """
+        Load raw telemetry for several (vehicle, lap) pairs in one pass.
+        
+        The columnar store is scanned once with every pair's partitions pruned in.
+        Without it, each pair's byte ranges are read through the index, or the
+        CSV is scanned once for all pairs when it cannot be indexed.
+        
+        Args:
+            track: Track name
+            race_num: Race number
+            keys: (vehicle_number, lap) pairs to load
+            
+        Returns:
+            Dictionary mapping each pair found to its long-format rows, in the
+            same layout load_telemetry_data returns for a single lap and vehicle
+        """
+        telemetry_file = self.get_telemetry_file(track, race_num)
+        if telemetry_file is None or not keys:
+            return {}
+        
+        if self.telemetry_store.is_built(track, race_num, telemetry_file):
+            df = self.telemetry_store.load(track, race_num, keys=keys)
+        else:
+            index = self.get_telemetry_index(telemetry_file)
+            if index is not None:
+                # Byte ranges already separate the pairs, so each is read on its own
+                slices = {}
+                for vehicle, lap in keys:
+                    rows = index.read(lap=lap, vehicle=vehicle)
+                    if rows is not None:
+                        slices[(vehicle, lap)] = rows
+                logger.info(f"Loaded telemetry for {len(slices)} laps of {track} Race {race_num} via index")
+                return slices
+            
+            delimiter = self.manifest.get_delimiter(track, race_num, "telemetry")
+            chunks = [
+                chunk[self._key_mask(chunk, keys)]
+                for chunk in read_source_csv("telemetry", telemetry_file, delimiter, chunksize=10000)
+            ]
+            # Rows with a null key were dropped, so the keys are plain integers again
+            df = SCHEMAS["telemetry"].cast_ints(pd.concat(chunks, ignore_index=True)) if chunks else None
+        
+        if df is None or df.empty:
+            return {}
+        
+        # Split at key boundaries, which is far cheaper than a groupby. Rows are
+        # stably sorted first unless every key already forms a single run, as
+        # store rows grouped by partition do.
+        codes = self._key_codes(df)
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        if len(bounds) + 1 > len(np.unique(codes)):
+            order = np.argsort(codes, kind='stable')
+            df, codes = df.iloc[order], codes[order]
+            bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        vehicles = df['vehicle_number'].to_numpy()
+        laps = df['lap'].to_numpy()
+        
+        slices = {}
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(df)]):
+            rows = df.iloc[start:end].reset_index(drop=True)
+            if isinstance(rows['telemetry_name'].dtype, pd.CategoricalDtype):
+                rows['telemetry_name'] = rows['telemetry_name'].cat.remove_unused_categories()
+            slices[(int(vehicles[start]), int(laps[start]))] = rows
+        logger.info(f"Loaded {len(df)} telemetry points for {len(slices)} laps of {track} Race {race_num}")
+        return slices
+    
+    @staticmethod
+    def _key_codes(df: pd.DataFrame) -> np.ndarray:
+        """One int64 per row combining (vehicle_number, lap), which must not be null."""
+        return (df['vehicle_number'].to_numpy(np.int64) << 32) | df['lap'].to_numpy(np.int64)
+    
+    @staticmethod
+    def _key_mask(df: pd.DataFrame, keys: List[Tuple[int, int]]) -> np.ndarray:
+        """Boolean mask of the rows whose (vehicle_number, lap) is one of keys; rows with a null key never match."""
+        known = (df['vehicle_number'].notna() & df['lap'].notna()).to_numpy()
+        mask = np.zeros(len(df), dtype=bool)
+        mask[known] = np.isin(
+            DatasetManager._key_codes(df[known]),
+            [(vehicle << 32) | lap for vehicle, lap in keys]
+        )
+        return mask
+    
+    def get_weather_file(self, track: str, race_num: int) -> Optional[Path]:
+        """Resolve the weather CSV for a race, or None if missing."""
+        return self.manifest.get_file(track, race_num, "weather")
+    
+    def get_results_file(self, track: str, race_num: int) -> Optional[Path]:
+        """Resolve the race results CSV for a race, or None if missing."""
+        return self.manifest.get_file(track, race_num, "results")
+    
     def load_weather_data(self, track: str, race_num: int) -> Optional[pd.DataFrame]:
         """
         Load weather data for specified race.
@@ -191,17 +369,10 @@ class DatasetManager:
             DataFrame with weather data or None if not found
         """
         try:
-            track_path = self.dataset_path / track
+            weather_file = self.get_weather_file(track, race_num)
             
-            if track.lower() == "barber":
-                weather_file = track_path / f"26_Weather_Race {race_num}_Anonymized.CSV"
-            else:
-                race_dir = track_path / f"Race {race_num}"
-                weather_files = list(race_dir.glob("*Weather*.CSV"))
-                weather_file = weather_files[0] if weather_files else None
-            
-            if weather_file and Path(weather_file).exists():
-                df = pd.read_csv(weather_file, sep=';')
+            if weather_file is not None:
+                df = read_source_csv("weather", weather_file, self.manifest.get_delimiter(track, race_num, "weather"))
                 logger.info(f"Loaded weather data for {track} Race {race_num}")
                 return df
             
@@ -224,17 +395,10 @@ class DatasetManager:
             DataFrame with race results or None if not found
         """
         try:
-            track_path = self.dataset_path / track
-            
-            if track.lower() == "barber":
-                results_file = track_path / f"03_Provisional Results_Race {race_num}_Anonymized.CSV"
-            else:
-                race_dir = track_path / f"Race {race_num}"
-                results_files = list(race_dir.glob("*Results*.CSV"))
-                results_file = results_files[0] if results_files else None
+            results_file = self.get_results_file(track, race_num)
             
-            if results_file and Path(results_file).exists():
-                df = pd.read_csv(results_file, sep=';')
+            if results_file is not None:
+                df = read_source_csv("results", results_file, self.manifest.get_delimiter(track, race_num, "results"))
                 logger.info(f"Loaded race results for {track} Race {race_num}")
                 return df
             
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import DATASET_DIR, DATASET_MANIFEST_DIR, TRACKS
+from constants import RACE_NUMBERS
+
+logger = logging.getLogger(__name__)
+
+# Where each kind of source file lives. Barber keeps its files in the track
+# directory under fixed names; other tracks keep them in a "Race N" directory.
+BARBER_FILES = {
+    "lap_times": "R{race_num}_barber_lap_time.csv",
+    "analysis": "23_AnalysisEnduranceWithSections_Race {race_num}_Anonymized.CSV",
+    "telemetry": "R{race_num}_barber_telemetry_data.csv",
+    "weather": "26_Weather_Race {race_num}_Anonymized.CSV",
+    "results": "03_Provisional Results_Race {race_num}_Anonymized.CSV"
+}
+RACE_DIR_PATTERNS = {
+    "analysis": "*AnalysisEndurance*.CSV",
+    "telemetry": "*telemetry*.csv",
+    "weather": "*Weather*.CSV",
+    "results": "*Results*.CSV"
+}
+
+
+class DatasetManifest:
+    """
+    Index of the source files of every track and race in a dataset root.
+
+    Built once by globbing the dataset, then persisted as JSON so later processes
+    skip the scan. Each file entry records its path, size, mtime, delimiter and
+    row count. The manifest stores the mtimes of the directories it scanned and
+    is rebuilt when one changes, i.e. when files are added, removed or renamed;
+    entries of files whose size and mtime are unchanged are reused as is. Files
+    edited in place are still caught downstream, where artifacts and ETags stat
+    the files themselves.
+    """
+
+    VERSION = 1
+
+    # Directory mtimes are checked at most this often
+    REVALIDATE_INTERVAL_SECONDS = 2.0
+
+    # Bytes read per block while counting rows
+    COUNT_BLOCK_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, dataset_path: Path = DATASET_DIR, manifest_dir: Path = DATASET_MANIFEST_DIR):
+        self.dataset_path = Path(dataset_path)
+        root_hash = hashlib.sha1(str(self.dataset_path.resolve()).encode()).hexdigest()[:16]
+        self.manifest_path = Path(manifest_dir) / f"{root_hash}.json"
+        self.manifest: Optional[Dict] = None
+        self.checked_at = 0.0
+        self.builds = 0
+        self._lock = threading.Lock()
+
+    def _race_dir(self, track: str, race_num: int) -> Path:
+        """Directory holding a race's files."""
+        if track.lower() == "barber":
+            return self.dataset_path / track
+        return self.dataset_path / track / f"Race {race_num}"
+
+    def _scanned_dirs(self) -> List[Path]:
+        """Directories whose mtimes decide whether the manifest is current."""
+        dirs = [self.dataset_path]
+        for track in TRACKS:
+            dirs.append(self.dataset_path / track)
+            if track.lower() != "barber":
+                dirs.extend(self._race_dir(track, race_num) for race_num in RACE_NUMBERS)
+        return dirs
+
+    def _dir_mtimes(self) -> Dict[str, Optional[int]]:
+        """mtime of every scanned directory, None for missing ones."""
+        mtimes = {}
+        for directory in self._scanned_dirs():
+            try:
+                mtimes[str(directory.relative_to(self.dataset_path))] = directory.stat().st_mtime_ns
+            except OSError:
+                mtimes[str(directory.relative_to(self.dataset_path))] = None
+        return mtimes
+
+    def _has_race_data(self, track: str, race_num: int) -> bool:
+        """Check if race data exists for given track and race number."""
+        race_dir = self._race_dir(track, race_num)
+        if track.lower() == "barber":
+            return any(race_dir.glob(f"R{race_num}_barber*.csv"))
+        return race_dir.exists() and any(race_dir.glob("*.csv"))
+
+    def _resolve(self, track: str, race_num: int, kind: str) -> Optional[Path]:
+        """Find the source file of a kind for a race, or None if missing."""
+        race_dir = self._race_dir(track, race_num)
+        if track.lower() == "barber":
+            path = race_dir / BARBER_FILES[kind].format(race_num=race_num)
+            return path if path.exists() else None
+
+        if kind not in RACE_DIR_PATTERNS:
+            return None
+        matches = sorted(race_dir.glob(RACE_DIR_PATTERNS[kind]))
+        return matches[0] if matches else None
+
+    @staticmethod
+    def _sniff_delimiter(path: Path) -> str:
+        """';' or ',', whichever separates more fields in the header."""
+        with open(path, "rb") as f:
+            header = f.readline()
+        return ";" if header.count(b";") > header.count(b",") else ","
+
+    @classmethod
+    def _count_rows(cls, path: Path) -> int:
+        """Data rows in a CSV, i.e. lines after the header."""
+        lines = 0
+        last = b"\n"
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(cls.COUNT_BLOCK_BYTES)
+                if not block:
+                    break
+                lines += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            # Last line has no trailing newline
+            lines += 1
+        return max(0, lines - 1)
+
+    def _describe(self, path: Path, previous: Optional[Dict]) -> Dict:
+        """Manifest entry for a file, reusing the previous entry if the file is unchanged."""
+        stat = path.stat()
+        relative = str(path.relative_to(self.dataset_path))
+        if (previous is not None and previous["path"] == relative
+                and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns):
+            return previous
+        return {
+            "path": relative,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "delimiter": self._sniff_delimiter(path),
+            "rows": self._count_rows(path)
+        }
+
+    def build(self, previous: Optional[Dict] = None) -> Dict:
+        """
+        Scan the dataset root and describe every race's source files.
+
+        Args:
+            previous: Earlier manifest whose entries are reused for unchanged files
+
+        Returns:
+            Manifest dictionary
+        """
+        started = time.perf_counter()
+        dir_mtimes = self._dir_mtimes()
+        previous_races = (previous or {}).get("races", {})
+        races = {}
+
+        for track in TRACKS:
+            if not (self.dataset_path / track).exists():
+                logger.warning(f"Track directory not found: {track}")
+                continue
+
+            for race_num in RACE_NUMBERS:
+                if not self._has_race_data(track, race_num):
+                    continue
+                previous_files = previous_races.get(track, {}).get(str(race_num), {})
+                files = {}
+                for kind in BARBER_FILES:
+                    path = self._resolve(track, race_num, kind)
+                    if path is not None:
+                        files[kind] = self._describe(path, previous_files.get(kind))
+                races.setdefault(track, {})[str(race_num)] = files
+
+        self.builds += 1
+        logger.info(f"Built dataset manifest for {self.dataset_path} in {time.perf_counter() - started:.2f}s")
+        return {
+            "version": self.VERSION,
+            "root": str(self.dataset_path.resolve()),
+            "directories": dir_mtimes,
+            "races": races
+        }
+
+    def _load_persisted(self) -> Optional[Dict]:
+        """Read the persisted manifest, or None if missing or unreadable."""
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable dataset manifest {self.manifest_path}: {e}")
+            return None
+        if manifest.get("version") != self.VERSION or manifest.get("root") != str(self.dataset_path.resolve()):
+            return None
+        return manifest
+
+    def _save(self, manifest: Dict) -> None:
+        """Write the manifest atomically."""
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not save dataset manifest {self.manifest_path}: {e}")
+
+    def get(self) -> Dict:
+        """
+        Get the current manifest, loading, revalidating or rebuilding it as needed.
+
+        Returns:
+            Manifest dictionary
+        """
+        now = time.monotonic()
+        if self.manifest is not None and now - self.checked_at < self.REVALIDATE_INTERVAL_SECONDS:
+            return self.manifest
+
+        with self._lock:
+            if self.manifest is not None and now - self.checked_at < self.REVALIDATE_INTERVAL_SECONDS:
+                return self.manifest
+
+            manifest = self.manifest or self._load_persisted()
+            if manifest is None or manifest["directories"] != self._dir_mtimes():
+                manifest = self.build(previous=manifest)
+                self._save(manifest)
+
+            self.manifest = manifest
+            self.checked_at = time.monotonic()
+            return manifest
+
+    def available_races(self) -> Dict[str, List[int]]:
+        """
+        Tracks and race numbers with data.
+
+        Returns:
+            Dictionary mapping track names to sorted race numbers
+        """
+        return {
+            track: sorted(int(race_num) for race_num in races)
+            for track, races in self.get()["races"].items()
+        }
+
+    def file_entry(self, track: str, race_num: int, kind: str) -> Optional[Dict]:
+        """
+        Manifest entry of a race's source file.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            kind: 'lap_times', 'analysis', 'telemetry', 'weather' or 'results'
+
+        Returns:
+            Dictionary with path, size, mtime_ns, delimiter and rows, or None
+        """
+        return self.get()["races"].get(track, {}).get(str(race_num), {}).get(kind)
+
+    def get_file(self, track: str, race_num: int, kind: str) -> Optional[Path]:
+        """Absolute path of a race's source file of a kind, or None if missing."""
+        entry = self.file_entry(track, race_num, kind)
+        return self.dataset_path / entry["path"] if entry is not None else None
+
+    def get_delimiter(self, track: str, race_num: int, kind: str) -> str:
+        """Delimiter of a race's source file, ',' if unknown."""
+        entry = self.file_entry(track, race_num, kind)
+        return entry["delimiter"] if entry is not None else ","
@@ -0,0 +1,173 @@
+import logging
+from typing import Dict, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data_processing.telemetry_pyramid import elapsed_seconds
+
+logger = logging.getLogger(__name__)
+
+# Lap distance in metres, logged by the car's lap trigger
+DISTANCE_CHANNEL = "Laptrigger_lapdist_dls"
+
+# Grid spacing in metres when a caller does not choose one
+DEFAULT_GRID_STEP = 1.0
+
+# Channels holding discrete states, which keep the previous sample's value instead of being blended
+STEP_CHANNELS = {"Gear"}
+
+
+def distance_rows(distance: np.ndarray) -> np.ndarray:
+    """
+    Rows of a lap whose lap distance strictly increases.
+
+    np.interp needs increasing sample positions, so rows with no distance, or
+    whose distance does not advance past every earlier row, are dropped. A lap
+    can open with a few samples still counting the previous lap's distance, so
+    everything before a drop of more than half the lap's range is dropped too.
+
+    Args:
+        distance: Lap distance of every row
+
+    Returns:
+        Positions of the rows to interpolate from
+    """
+    rows = np.flatnonzero(~np.isnan(distance))
+    values = distance[rows]
+    if len(values) < 2:
+        return rows
+
+    steps = np.diff(values)
+    if steps.min() < -0.5 * (values.max() - values.min()):
+        first = int(np.argmin(steps)) + 1
+        rows, values = rows[first:], values[first:]
+
+    advancing = np.r_[True, values[1:] > np.maximum.accumulate(values)[:-1]]
+    return rows[advancing]
+
+
+def resample_lap(frame: pd.DataFrame, step: float = DEFAULT_GRID_STEP) -> Optional[pd.DataFrame]:
+    """
+    Put a lap's channels onto a uniform grid of lap distance.
+
+    Row i of the result is at i * step metres, so laps resampled with the same
+    step line up row for row and overlays, deltas and comparisons are plain array
+    arithmetic. Grid points the lap did not cover are NaN. Besides the channels,
+    the result has 'distance' and 'elapsed' (seconds since the lap's first sample).
+
+    One searchsorted gives the interpolation weights, applied to all channels as
+    a 2-D array; channels with gaps are interpolated over their own samples with
+    np.interp, so a gap does not blank its neighbouring grid points.
+
+    Args:
+        frame: Wide-format telemetry of one lap
+        step: Grid spacing in metres
+
+    Returns:
+        Resampled lap, or None if the lap has no usable distance channel
+    """
+    if DISTANCE_CHANNEL not in frame.columns:
+        return None
+
+    rows = distance_rows(frame[DISTANCE_CHANNEL].to_numpy(np.float64))
+    if len(rows) < 2:
+        return None
+
+    distance = frame[DISTANCE_CHANNEL].to_numpy(np.float64)[rows]
+    channels = [col for col in frame.columns if frame[col].dtype.kind == "f" and col != DISTANCE_CHANNEL]
+    names = ["elapsed"] + channels
+    values = np.column_stack([
+        elapsed_seconds(frame["timestamp"])[rows],
+        frame[channels].to_numpy(np.float64)[rows]
+    ])
+
+    grid = np.arange(int(distance[-1] // step) + 1) * step
+    covered = grid >= distance[0]
+    points = grid[covered]
+
+    upper = np.clip(np.searchsorted(distance, points, side="right"), 1, len(distance) - 1)
+    lower = upper - 1
+    weight = ((points - distance[lower]) / (distance[upper] - distance[lower]))[:, None]
+    resampled = np.full((len(grid), len(names)), np.nan)
+    resampled[covered] = values[lower] * (1 - weight) + values[upper] * weight
+
+    for col in np.flatnonzero(np.isnan(values).any(axis=0)):
+        valid = ~np.isnan(values[:, col])
+        if valid.sum() >= 2:
+            resampled[covered, col] = np.interp(points, distance[valid], values[valid, col],
+                                                left=np.nan, right=np.nan)
+    for col in [col for col, name in enumerate(names) if name in STEP_CHANNELS]:
+        valid = ~np.isnan(values[:, col])
+        if valid.any():
+            previous = np.searchsorted(distance[valid], points, side="right") - 1
+            resampled[covered, col] = values[valid, col][np.maximum(previous, 0)]
+
+    columns = {"distance": grid, "elapsed": resampled[:, 0]}
+    # float32 like the source channels
+    columns.update(zip(channels, resampled[:, 1:].astype(np.float32).T))
+    return pd.DataFrame(columns, copy=False)
+
+
+def resample_laps(frames: Dict[Hashable, pd.DataFrame],
+                  step: float = DEFAULT_GRID_STEP) -> Dict[Hashable, pd.DataFrame]:
+    """
+    Resample several laps onto the same distance grid.
+
+    Args:
+        frames: Wide-format telemetry per key, e.g. (vehicle, lap)
+        step: Grid spacing in metres
+
+    Returns:
+        Resampled lap per key, without the laps that have no usable distance channel
+    """
+    resampled = {}
+    for key, frame in frames.items():
+        lap = resample_lap(frame, step)
+        if lap is None:
+            logger.warning(f"No usable {DISTANCE_CHANNEL} channel to resample {key}")
+            continue
+        resampled[key] = lap
+    return resampled
+
+
+def stack_channel(laps: Sequence[pd.DataFrame], channel: str) -> np.ndarray:
+    """
+    Stack one channel of laps resampled with the same step into a 2-D array.
+
+    Args:
+        laps: Resampled laps
+        channel: Channel to stack, or 'elapsed'
+
+    Returns:
+        (laps, grid points) array, NaN past a lap's end or where it lacks the channel
+    """
+    length = max((len(lap) for lap in laps), default=0)
+    stacked = np.full((len(laps), length), np.nan)
+    for row, lap in enumerate(laps):
+        if channel in lap.columns:
+            stacked[row, :len(lap)] = lap[channel].to_numpy(np.float64)
+    return stacked
+
+
+def time_deltas(laps: Sequence[pd.DataFrame], reference: pd.DataFrame) -> np.ndarray:
+    """
+    Time each lap has lost (positive) or gained (negative) on a reference lap along the lap.
+
+    All laps must be resampled with the reference's step. The elapsed times of all
+    laps are stacked and the reference's is subtracted from every row in one
+    operation. Each trace is shifted to start at zero at the first grid point it
+    shares with the reference, so a lap whose first sample was logged a little
+    further along is not charged for the gap.
+
+    Args:
+        laps: Resampled laps to compare
+        reference: Resampled reference lap
+
+    Returns:
+        (laps, reference grid points) array of seconds, NaN where either lap has no time
+    """
+    stacked = stack_channel([reference, *laps], "elapsed")[:, :len(reference)]
+    deltas = stacked[1:] - stacked[0]
+    first = np.argmax(~np.isnan(deltas), axis=1)
+    return deltas - deltas[np.arange(len(deltas)), first][:, None]
@@ -0,0 +1,196 @@
+import logging
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def lttb_indices(values: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Select rows per channel with Largest-Triangle-Three-Buckets.
+
+    The first and last rows are always kept; the rows between them are split into
+    buckets, and each bucket keeps the row forming the largest triangle with the
+    row kept before it and the average of the next bucket. Row position is the x
+    axis, since telemetry is logged at a near-constant rate. All channels are
+    processed together, so the loop runs once per bucket, not per channel.
+
+    Args:
+        values: (rows, channels) array; NaN rows are never selected over real values
+        buckets: Rows kept per channel between the first and last row
+
+    Returns:
+        (buckets + 2, channels) array of selected row positions
+    """
+    n, channels = values.shape
+    if buckets >= n - 2:
+        return np.repeat(np.arange(n)[:, None], channels, axis=1)
+
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+
+    # Bucket averages, ignoring NaN; the last row is the final bucket's successor
+    valid = ~np.isnan(values[:-1])
+    sums = np.add.reduceat(np.where(valid, values[:-1], 0.0), edges[:-1], axis=0)
+    counts = np.add.reduceat(valid, edges[:-1], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = sums / counts
+    next_x = np.append((edges[1:-1] + edges[2:] - 1) / 2, n - 1)
+    next_y = np.vstack([averages[1:], values[-1:]])
+
+    selected = np.empty((buckets + 2, channels), dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    columns = np.arange(channels)
+    previous = np.zeros(channels, dtype=np.int64)
+    for bucket in range(buckets):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax = previous.astype(np.float64)
+        ay = values[previous, columns]
+        bx = np.arange(start, end, dtype=np.float64)[:, None]
+        area = np.abs((ax - next_x[bucket]) * (values[start:end] - ay) - (ax - bx) * (next_y[bucket] - ay))
+        previous = start + np.argmax(np.where(np.isnan(area), -1.0, area), axis=0)
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(values: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Select the rows holding each channel's minimum and maximum in every bucket.
+
+    Unlike striding, this keeps every spike: a brake application or throttle lift
+    shorter than a bucket still contributes its extreme row.
+
+    Args:
+        values: (rows, channels) array; NaN is ignored
+        buckets: Equal-width buckets the rows are split into
+
+    Returns:
+        (2 * buckets, channels) array of selected row positions
+    """
+    n, channels = values.shape
+    if 2 * buckets >= n:
+        return np.repeat(np.arange(n)[:, None], channels, axis=1)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    positions = np.arange(n)[:, None]
+
+    nan = np.isnan(values)
+    low = np.where(nan, np.inf, values)
+    high = np.where(nan, -np.inf, values)
+    mins = np.repeat(np.minimum.reduceat(low, starts, axis=0), sizes, axis=0)
+    maxs = np.repeat(np.maximum.reduceat(high, starts, axis=0), sizes, axis=0)
+
+    # First row of each bucket equal to its extreme
+    first_min = np.minimum.reduceat(np.where(low == mins, positions, n), starts, axis=0)
+    first_max = np.minimum.reduceat(np.where(high == maxs, positions, n), starts, axis=0)
+    return np.vstack([first_min, first_max])
+
+
+# Row selectors by method name, with the rows each keeps per channel and bucket
+DOWNSAMPLING_METHODS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "lttb": lttb_indices,
+    "minmax": minmax_indices
+}
+ROWS_PER_BUCKET = {"lttb": 1, "minmax": 2}
+
+# Passes spent growing the bucket count towards the row budget
+FILL_PASSES = 5
+
+
+def combined_channel(values: np.ndarray) -> np.ndarray:
+    """
+    Combine channels into one by averaging each row's values scaled to their channel's range.
+
+    Channels with a wide range (RPM) and a narrow one (Gear) weigh the same, and
+    rows where several channels peak together stand out.
+
+    Args:
+        values: (rows, channels) array; NaN is ignored
+
+    Returns:
+        (rows, 1) array, NaN for rows with no value in any channel
+    """
+    nan = np.isnan(values)
+    low = np.where(nan, np.inf, values).min(axis=0)
+    high = np.where(nan, -np.inf, values).max(axis=0)
+    with np.errstate(invalid="ignore"):
+        scaled = (values - low) / np.where(high > low, high - low, 1.0)
+    counts = (~nan).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        combined = np.where(nan, 0.0, scaled).sum(axis=1) / counts
+    return combined[:, None]
+
+
+def downsample_rows(values: np.ndarray, points: int, method: str = "lttb") -> np.ndarray:
+    """
+    Choose at most `points` rows of a (rows, channels) array, keeping each channel's shape.
+
+    Every channel selects its own rows with the chosen method over shared buckets,
+    and the union of those rows is kept, so no channel is flattened to fit
+    another. Channels usually peak together, so the bucket count is grown until
+    the union fills the budget without exceeding it. A budget too small for one
+    bucket per channel is spent on a single channel combining all of them.
+
+    Args:
+        values: (rows, channels) float array
+        points: Most rows to return
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        Sorted row positions, all rows if there are no more than `points`
+    """
+    n, channels = values.shape
+    if n <= points:
+        return np.arange(n)
+    if channels == 0 or points - 2 < ROWS_PER_BUCKET[method]:
+        return np.unique(np.linspace(0, n - 1, points).astype(np.int64))
+    if points - 2 < channels * ROWS_PER_BUCKET[method]:
+        values, channels = combined_channel(values), 1
+
+    select = DOWNSAMPLING_METHODS[method]
+
+    def select_rows(buckets: int) -> np.ndarray:
+        return np.union1d(select(values, buckets).ravel(), [0, n - 1])
+
+    # Grow in proportion to the unused budget, then bisect once a count overshoots
+    fits = (points - 2) // (channels * ROWS_PER_BUCKET[method])
+    overshoots = None
+    rows = select_rows(fits)
+    for _ in range(FILL_PASSES):
+        buckets = int(fits * points / len(rows)) if overshoots is None else (fits + overshoots) // 2
+        if buckets <= fits:
+            break
+        candidate = select_rows(buckets)
+        if len(candidate) > points:
+            overshoots = buckets
+        else:
+            fits, rows = buckets, candidate
+    return rows
+
+
+def downsample(frame: pd.DataFrame, points: int, method: str = "lttb") -> pd.DataFrame:
+    """
+    Reduce a lap's telemetry to at most `points` rows while keeping each channel's shape.
+
+    Rows are chosen by downsample_rows over every float channel.
+
+    Args:
+        frame: Wide-format telemetry, one row per sample
+        points: Most rows to return
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        Selected rows in their original order, or the frame itself if it is small enough
+    """
+    if len(frame) <= points:
+        return frame
+
+    channels = [col for col in frame.columns if frame[col].dtype.kind == "f"]
+    rows = downsample_rows(frame[channels].to_numpy(np.float64), points, method)
+
+    logger.info(f"Downsampled telemetry from {len(frame)} to {len(rows)} points ({method})")
+    return frame.iloc[rows]
@@ -0,0 +1,280 @@
+import logging
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Declared dtype of a column that is read but typed by the parser
+INFER = "infer"
+
+
+class FileSchema:
+    """
+    Declared layout of one kind of source CSV.
+
+    Lists the columns loaders actually use with their dtypes, so reads skip type
+    inference and never materialize unused columns. Column names are matched after
+    stripping whitespace, since some exports pad their headers (' LAP_NUMBER').
+    """
+
+    def __init__(self, kind: str, delimiter: str, dtypes: Dict[str, str], keep_all_columns: bool = False):
+        """
+        Args:
+            kind: File kind, as used by DatasetManifest
+            delimiter: Default field separator
+            dtypes: Column name to pandas dtype for every column read, or INFER to read
+                the column with the type the parser infers
+            keep_all_columns: Read every column, typing only the declared ones
+        """
+        self.kind = kind
+        self.delimiter = delimiter
+        self.dtypes = dtypes
+        self.keep_all_columns = keep_all_columns
+
+    def describe(self) -> Dict:
+        """JSON-serializable description, hashed into the decision hash of cleaned outputs."""
+        return {
+            "delimiter": self.delimiter,
+            "dtypes": self.dtypes,
+            "keep_all_columns": self.keep_all_columns
+        }
+
+    @staticmethod
+    def _read_header(source: Union[Path, BinaryIO], delimiter: str) -> List[str]:
+        """Raw column names from the first line of a file or seekable buffer."""
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f:
+                line = f.readline()
+        else:
+            position = source.tell()
+            line = source.readline()
+            source.seek(position)
+        return [name.strip('"') for name in line.decode("utf-8-sig").rstrip("\r\n").split(delimiter)]
+
+    @staticmethod
+    def pandas_dtype(dtype: str):
+        """pandas dtype for a declared dtype; strings are Arrow-backed when pyarrow is installed."""
+        if dtype == "string":
+            return pd.StringDtype("pyarrow") if pa is not None else "string"
+        return dtype
+
+    @staticmethod
+    def arrow_type(dtype: str):
+        """Arrow type a declared dtype is parsed as by the pyarrow CSV reader."""
+        if dtype == "category":
+            return pa.dictionary(pa.int32(), pa.string())
+        if dtype == "string":
+            return pa.string()
+        return pa.from_numpy_dtype(pd.api.types.pandas_dtype(dtype))
+
+    def read_options(self, raw_columns: List[str]) -> Dict:
+        """
+        pandas read_csv options selecting and typing this schema's columns.
+
+        Args:
+            raw_columns: Column names as they appear in the file's header
+
+        Returns:
+            Dictionary with usecols (unless all columns are kept) and dtype
+        """
+        declared = [raw for raw in raw_columns if raw.strip() in self.dtypes]
+        dtype = {raw: self.pandas_dtype(self.dtypes[raw.strip()]) for raw in declared
+                 if self.dtypes[raw.strip()] != INFER}
+        options = {"dtype": dtype}
+        if not self.keep_all_columns and declared:
+            options["usecols"] = declared
+        return options
+
+    def read_csv(self, source: Union[Path, BinaryIO], delimiter: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        """
+        Read a CSV of this kind with declared dtypes and only the needed columns.
+
+        Parses with pyarrow's multithreaded CSV reader when pyarrow is installed and
+        the read is not chunked, else with pandas' C parser. If a file does not fit
+        its declared types, the read is retried with inferred types; float columns
+        that still parse as numbers keep their declared precision, so the fallback
+        serves the same values as the typed read and the other read paths.
+
+        Args:
+            source: CSV path or seekable binary buffer
+            delimiter: Field separator, defaults to the schema's
+            **kwargs: Extra read_csv options such as chunksize
+
+        Returns:
+            DataFrame, or an iterator of DataFrames when chunksize is given
+        """
+        sep = delimiter or self.delimiter
+        raw_columns = self._read_header(source, sep)
+        options = self.read_options(raw_columns)
+
+        if "chunksize" in kwargs:
+            return self._read_chunks(source, sep, options, **kwargs)
+
+        try:
+            if pa is not None and not kwargs:
+                return self._read_arrow(source, sep, raw_columns)
+            return pd.read_csv(source, sep=sep, **options, **kwargs)
+        except (ValueError, TypeError) as e:
+            # ArrowInvalid is a ValueError
+            logger.warning(f"{self.kind} file does not match its schema, reading with inferred types: {e}")
+            if not isinstance(source, (str, Path)):
+                source.seek(0)
+            fallback = {"usecols": options["usecols"]} if "usecols" in options else {}
+            df = pd.read_csv(source, sep=sep, **fallback, **kwargs)
+            return df if kwargs else self._declared_floats(df)
+
+    def _read_chunks(self, source: Union[Path, BinaryIO], sep: str, options: Dict, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Read in chunks, with declared integer columns parsed as nullable integers.
+
+        Chunks are parsed as they are iterated, after a fallback could be chosen,
+        so an empty field in an integer column would abort the read part way.
+        Nullable integers hold it as pd.NA instead; chunks without nulls are cast
+        back to the declared dtype by cast_ints.
+        """
+        dtype = {raw: pd.api.types.pandas_dtype(value.capitalize()) if self._is_int(value) else value
+                 for raw, value in options["dtype"].items()}
+        reader = pd.read_csv(source, sep=sep, **{**options, "dtype": dtype}, **kwargs)
+        return (self.cast_ints(chunk) for chunk in reader)
+
+    @staticmethod
+    def _is_int(dtype) -> bool:
+        return isinstance(dtype, str) and dtype.startswith("int")
+
+    def cast_ints(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cast nullable integer columns without nulls back to their declared dtype.
+
+        Args:
+            df: Frame read in chunks, or rows of one with the null keys dropped
+
+        Returns:
+            The frame, with declared integer columns as plain integers where possible
+        """
+        for col in df.columns:
+            dtype = self.dtypes.get(col.strip())
+            if self._is_int(dtype) and df[col].dtype != dtype and not df[col].isna().any():
+                df[col] = df[col].astype(dtype)
+        return df
+
+    def _declared_floats(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast numeric columns declared as floats back to their declared dtype after an inferred read."""
+        for col in df.columns:
+            dtype = self.dtypes.get(col.strip())
+            if dtype in ("float32", "float64") and pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype(dtype)
+        return df
+
+    def _read_arrow(self, source: Union[Path, BinaryIO], sep: str, raw_columns: List[str]) -> pd.DataFrame:
+        """
+        Read with pyarrow.csv, typing columns at parse time.
+
+        pandas' engine='pyarrow' infers types first and casts afterwards, which turns
+        ISO timestamp strings into reformatted datetimes, so the reader is used directly.
+        """
+        declared = [raw for raw in raw_columns if raw.strip() in self.dtypes]
+        column_types = {raw: self.arrow_type(self.dtypes[raw.strip()]) for raw in declared
+                        if self.dtypes[raw.strip()] != INFER}
+        convert_options = pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=None if self.keep_all_columns or not declared else declared,
+            # Match pandas: empty fields are missing values in every column
+            strings_can_be_null=True
+        )
+        table = pa_csv.read_csv(
+            str(source) if isinstance(source, (str, Path)) else source,
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=convert_options
+        )
+        df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+        # Sorted categories, as pandas' parser produces, so pivots keep a stable column order
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+        return df
+
+
+# Columns read per file kind. Lap timing keeps what DataCleaner and the dashboard
+# use; raw time strings stay strings and are parsed by DataCleaner. PIT_TIME is plain
+# seconds in some exports and a status code in others, so its type is inferred.
+SCHEMAS = {
+    "analysis": FileSchema("analysis", ";", {
+        "NUMBER": "string",
+        "DRIVER_NUMBER": "int64",
+        "LAP_NUMBER": "int64",
+        "LAP_TIME": "string",
+        "LAP_IMPROVEMENT": "int64",
+        "CROSSING_FINISH_LINE_IN_PIT": "string",
+        "S1_SECONDS": "float64",
+        "S2_SECONDS": "float64",
+        "S3_SECONDS": "float64",
+        "KPH": "float64",
+        "TOP_SPEED": "float64",
+        "ELAPSED": "string",
+        "PIT_TIME": INFER,
+        "FLAG_AT_FL": "category"
+    }),
+    "lap_times": FileSchema("lap_times", ",", {
+        "vehicle_id": "string",
+        "lap": "int64",
+        "timestamp": "string"
+    }),
+    "telemetry": FileSchema("telemetry", ",", {
+        "vehicle_id": "string",
+        "vehicle_number": "int32",
+        "lap": "int32",
+        "timestamp": "string",
+        "telemetry_name": "category",
+        # float32 like the Parquet store and channel arrays, so every read path serves the same values
+        "telemetry_value": "float32"
+    }),
+    # Weather and results are served as-is, so every column is kept
+    "weather": FileSchema("weather", ";", {
+        "TIME_UTC_SECONDS": "int64",
+        "TIME_UTC_STR": "string",
+        "AIR_TEMP": "float64",
+        "TRACK_TEMP": "float64",
+        "HUMIDITY": "float64",
+        "PRESSURE": "float64",
+        "WIND_SPEED": "float64",
+        "WIND_DIRECTION": "float64",
+        "RAIN": "float64"
+    }, keep_all_columns=True),
+    "results": FileSchema("results", ";", {
+        "POSITION": "int64",
+        "LAPS": "int64",
+        "STATUS": "category",
+        "TOTAL_TIME": "string",
+        "GAP_FIRST": "string",
+        "GAP_PREVIOUS": "string",
+        "FL_TIME": "string",
+        "CLASS": "category",
+        "VEHICLE": "category"
+    }, keep_all_columns=True)
+}
+
+
+def read_source_csv(kind: str, source: Union[Path, BinaryIO], delimiter: Optional[str] = None,
+                    **kwargs) -> pd.DataFrame:
+    """
+    Read a source CSV with the schema registered for its kind.
+
+    Args:
+        kind: 'analysis', 'lap_times', 'telemetry', 'weather' or 'results'
+        source: CSV path or seekable binary buffer
+        delimiter: Field separator, defaults to the schema's
+        **kwargs: Extra read_csv options
+
+    Returns:
+        DataFrame read with the schema's columns and dtypes
+    """
+    return SCHEMAS[kind].read_csv(source, delimiter=delimiter, **kwargs)
@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pa = None
+
+from config import CACHE_SPILL_DIR, CACHE_SPILL_MAX_SIZE_MB
+
+logger = logging.getLogger(__name__)
+
+
+class SpillCache:
+    """
+    Bounded on-disk LRU tier for DataFrames evicted from DataCache.
+
+    Entries are written as Feather (Arrow IPC) files, which read back far faster
+    than re-parsing and re-cleaning the source CSVs. The tier has its own LRU order
+    and byte budget. Each process spills into its own subdirectory, which is wiped
+    on start, so workers never see another process's entries.
+    """
+
+    SUFFIX = ".feather"
+
+    def __init__(self, spill_dir: Path = CACHE_SPILL_DIR, max_size_mb: int = CACHE_SPILL_MAX_SIZE_MB):
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.spill_dir = Path(spill_dir) / str(os.getpid())
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.current_size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.is_enabled():
+            self._remove_stale_dirs()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def is_enabled(self) -> bool:
+        """Check that the tier has a budget and pyarrow is installed."""
+        return self.max_size_bytes > 0 and pa is not None
+
+    def _remove_stale_dirs(self) -> None:
+        """Delete spill directories left behind by processes that no longer run."""
+        if not self.spill_dir.parent.exists():
+            return
+
+        for process_dir in self.spill_dir.parent.iterdir():
+            if not process_dir.name.isdigit():
+                continue
+            try:
+                os.kill(int(process_dir.name), 0)
+            except ProcessLookupError:
+                shutil.rmtree(process_dir, ignore_errors=True)
+            except OSError:
+                # The process exists but belongs to another user
+                pass
+
+    def _path(self, key: str) -> Path:
+        """Spill file for a cache key."""
+        return self.spill_dir / (hashlib.sha1(key.encode()).hexdigest() + self.SUFFIX)
+
+    def put(self, key: str, value: pd.DataFrame) -> bool:
+        """
+        Write an evicted DataFrame to disk, evicting older spill files as needed.
+
+        Args:
+            key: Cache key
+            value: DataFrame evicted from memory
+
+        Returns:
+            True if the frame was spilled
+        """
+        if not self.is_enabled() or not isinstance(value, pd.DataFrame):
+            return False
+
+        path = self._path(key)
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            feather.write_feather(value, path)
+            size = path.stat().st_size
+        except (pa.ArrowException, TypeError, ValueError, OSError) as e:
+            # Columns Arrow cannot represent are not worth spilling; drop them as before
+            logger.debug(f"Could not spill cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return False
+
+        if size > self.max_size_bytes:
+            path.unlink(missing_ok=True)
+            return False
+
+        with self._lock:
+            if key in self.entries:
+                self.current_size_bytes -= self.entries.pop(key)
+            self.entries[key] = size
+            self.current_size_bytes += size
+
+            while self.current_size_bytes > self.max_size_bytes and self.entries:
+                evicted_key, evicted_size = self.entries.popitem(last=False)
+                self.current_size_bytes -= evicted_size
+                self._path(evicted_key).unlink(missing_ok=True)
+                logger.info(f"Evicted spilled entry: {evicted_key} ({evicted_size / 1024 / 1024:.2f}MB)")
+
+        logger.debug(f"Spilled: {key} ({size / 1024 / 1024:.2f}MB)")
+        return True
+
+    def pop(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Read a spilled DataFrame and remove it from the tier.
+
+        The caller promotes the frame back into memory, so the disk copy is
+        dropped rather than kept twice.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The spilled DataFrame or None if the key is not on disk
+        """
+        with self._lock:
+            size = self.entries.pop(key, None)
+            if size is None:
+                self.misses += 1
+                return None
+            self.current_size_bytes -= size
+
+        path = self._path(key)
+        try:
+            value = feather.read_feather(path)
+        except (pa.ArrowException, OSError) as e:
+            logger.warning(f"Could not read spilled cache entry {key}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def discard(self, key: str) -> None:
+        """Remove a key from the tier, e.g. when a newer value is cached."""
+        with self._lock:
+            size = self.entries.pop(key, None)
+            if size is None:
+                return
+            self.current_size_bytes -= size
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every spilled entry."""
+        with self._lock:
+            self.entries.clear()
+            self.current_size_bytes = 0
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict:
+        """
+        Get spill tier statistics.
+
+        Returns:
+            Dictionary with size, entry count and hit rate of the disk tier
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.is_enabled(),
+                "size_mb": self.current_size_bytes / 1024 / 1024,
+                "max_size_mb": self.max_size_bytes / 1024 / 1024,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups > 0 else 0
+            }
@@ -0,0 +1,240 @@
+import json
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processing.schema_registry import read_source_csv
+from utils.fingerprint import file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryIndex:
+    """
+    Sidecar byte-offset index for a raw telemetry CSV.
+
+    Maps each (vehicle_number, lap) pair to the byte ranges of the CSV rows that
+    belong to it, so a lap can be served by seeking and parsing only those rows
+    instead of scanning the whole file. The index is stored next to the CSV as
+    <file>.idx.json and records the CSV's size and mtime, so it is rebuilt
+    whenever the file changes.
+    """
+
+    SUFFIX = ".idx.json"
+
+    # Bytes read per block while building the index
+    BUILD_BLOCK_BYTES = 64 * 1024 * 1024
+
+    # Ranges of the same key separated by less than this are merged into one read;
+    # rows from other keys picked up in the gap are filtered out after parsing
+    MERGE_GAP_BYTES = 256 * 1024
+
+    KEY_COLUMNS = ["vehicle_number", "lap"]
+
+    def __init__(self, telemetry_file: Path):
+        self.telemetry_file = Path(telemetry_file)
+        self.index_path = self.telemetry_file.with_name(self.telemetry_file.name + self.SUFFIX)
+        self.header = b""
+        self.ranges: Dict[Tuple[int, int], List[List[int]]] = {}
+        self.source: Optional[Dict] = None
+
+    def is_current(self) -> bool:
+        """Check that the index was built from the telemetry file as it is now."""
+        return self.source is not None and self.source == file_signature(self.telemetry_file)
+
+    def load(self) -> bool:
+        """
+        Load the sidecar index if it exists and matches the telemetry file.
+
+        Returns:
+            True if a valid index was loaded
+        """
+        if not self.index_path.exists():
+            return False
+
+        try:
+            with open(self.index_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable telemetry index {self.index_path}: {e}")
+            return False
+
+        if stored.get("source") != file_signature(self.telemetry_file):
+            logger.info(f"Telemetry index is stale: {self.index_path}")
+            return False
+
+        self.source = stored["source"]
+        self.header = stored["header"].encode()
+        self.ranges = {
+            (entry["vehicle"], entry["lap"]): entry["ranges"]
+            for entry in stored["entries"]
+        }
+        return True
+
+    def build(self) -> None:
+        """
+        Build the index with a single pass over the telemetry file.
+
+        The file is read in newline-aligned binary blocks. Each block is parsed for
+        the key columns only, and row boundaries come from the newline positions,
+        so consecutive rows with the same key collapse into one byte range.
+        """
+        ranges: Dict[Tuple[int, int], List[List[int]]] = {}
+        source = file_signature(self.telemetry_file)
+
+        with open(self.telemetry_file, "rb") as f:
+            self.header = f.readline()
+            block_start = len(self.header)
+            remainder = b""
+
+            while True:
+                data = f.read(self.BUILD_BLOCK_BYTES)
+                block = remainder + data
+
+                if not data:
+                    if not block:
+                        break
+                    if not block.endswith(b"\n"):
+                        block += b"\n"
+                    remainder = b""
+                else:
+                    last_newline = block.rfind(b"\n")
+                    if last_newline < 0:
+                        remainder = block
+                        continue
+                    remainder = block[last_newline + 1:]
+                    block = block[:last_newline + 1]
+
+                self._index_block(block, block_start, ranges)
+                block_start += len(block)
+
+                if not data:
+                    break
+
+        self.ranges = ranges
+        self.source = source
+        logger.info(f"Built telemetry index for {self.telemetry_file.name} with {len(ranges)} keys")
+
+    def _index_block(self, block: bytes, block_start: int, ranges: Dict) -> None:
+        """Add the row ranges of one newline-aligned block to the index."""
+        row_ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n")) + 1
+        row_starts = np.concatenate([[0], row_ends[:-1]])
+
+        keys = pd.read_csv(
+            BytesIO(self.header + block),
+            usecols=self.KEY_COLUMNS,
+            skip_blank_lines=False
+        )
+        if len(keys) != len(row_ends):
+            raise ValueError(
+                f"Row count mismatch while indexing {self.telemetry_file.name}: "
+                f"{len(keys)} rows parsed, {len(row_ends)} lines found"
+            )
+
+        vehicles = pd.to_numeric(keys["vehicle_number"], errors="coerce").fillna(-1).astype(np.int64).values
+        laps = pd.to_numeric(keys["lap"], errors="coerce").fillna(-1).astype(np.int64).values
+
+        # Start a new run wherever the (vehicle, lap) key changes
+        changed = (vehicles[1:] != vehicles[:-1]) | (laps[1:] != laps[:-1])
+        run_first = np.concatenate([[0], np.flatnonzero(changed) + 1])
+        run_last = np.concatenate([run_first[1:] - 1, [len(row_ends) - 1]])
+
+        for first, last in zip(run_first, run_last):
+            key = (int(vehicles[first]), int(laps[first]))
+            start = block_start + int(row_starts[first])
+            end = block_start + int(row_ends[last])
+
+            key_ranges = ranges.setdefault(key, [])
+            if key_ranges and start - key_ranges[-1][1] <= self.MERGE_GAP_BYTES:
+                key_ranges[-1][1] = end
+            else:
+                key_ranges.append([start, end])
+
+    def save(self) -> bool:
+        """
+        Write the index next to the telemetry file.
+
+        Returns:
+            True if the sidecar file was written
+        """
+        stored = {
+            "source": self.source,
+            "header": self.header.decode(),
+            "entries": [
+                {"vehicle": vehicle, "lap": lap, "ranges": key_ranges}
+                for (vehicle, lap), key_ranges in self.ranges.items()
+            ]
+        }
+
+        try:
+            with open(self.index_path, "w") as f:
+                json.dump(stored, f)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not write telemetry index {self.index_path}: {e}")
+            return False
+
+    def get_ranges(self, lap: Optional[int] = None, vehicle: Optional[int] = None) -> List[List[int]]:
+        """
+        Get the merged, sorted byte ranges covering a lap and/or vehicle.
+
+        Args:
+            lap: Optional lap number
+            vehicle: Optional vehicle number
+
+        Returns:
+            List of [start, end) byte ranges
+        """
+        selected = sorted(
+            tuple(byte_range)
+            for (key_vehicle, key_lap), key_ranges in self.ranges.items()
+            if (lap is None or key_lap == lap) and (vehicle is None or key_vehicle == vehicle)
+            for byte_range in key_ranges
+        )
+
+        merged: List[List[int]] = []
+        for start, end in selected:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    def read(self, lap: Optional[int] = None, vehicle: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Read only the rows for a lap and/or vehicle from the telemetry file.
+
+        Args:
+            lap: Optional lap number
+            vehicle: Optional vehicle number
+
+        Returns:
+            DataFrame with the matching rows or None if none exist
+        """
+        byte_ranges = self.get_ranges(lap=lap, vehicle=vehicle)
+        if not byte_ranges:
+            return None
+
+        buffer = BytesIO()
+        buffer.write(self.header)
+        with open(self.telemetry_file, "rb") as f:
+            for start, end in byte_ranges:
+                f.seek(start)
+                buffer.write(f.read(end - start))
+        buffer.seek(0)
+
+        df = read_source_csv("telemetry", buffer)
+
+        # Merged ranges may include neighbouring rows from other keys
+        if lap is not None:
+            df = df[df["lap"] == lap]
+        if vehicle is not None:
+            df = df[df["vehicle_number"] == vehicle]
+
+        if df.empty:
+            return None
+        return df.reset_index(drop=True)
@@ -0,0 +1,168 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pc = None
+
+from data_processing.downsampling import downsample_rows
+
+logger = logging.getLogger(__name__)
+
+# Each level keeps about 1/LEVEL_FACTOR of the rows of the level below it
+LEVEL_FACTOR = 4
+
+# No level is built with fewer rows than this
+MIN_LEVEL_ROWS = 64
+
+# Rows a window may return per pixel of chart width: a min and a max
+ROWS_PER_PIXEL = 2
+
+# Channel a window is selected on per axis; time is seconds since the lap's first sample
+WINDOW_AXES = {"time": "elapsed", "distance": "Laptrigger_lapdist_dls"}
+
+
+def elapsed_seconds(timestamps) -> np.ndarray:
+    """Seconds since a lap's first sample, NaN where a timestamp does not parse."""
+    times = None
+    if pc is not None:
+        try:
+            # Arrow parses UTC ISO 8601 an order of magnitude faster than pandas
+            text = pa.array(timestamps, from_pandas=True)
+            if pa.types.is_binary(text.type):
+                text = pc.cast(text, pa.string())
+            times = pc.cast(text, pa.timestamp("ns", tz="UTC")).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            times = None
+    if times is None:
+        strings = pd.Series(np.asarray(timestamps).astype(str))
+        parsed = pd.to_datetime(strings, format="ISO8601", errors="coerce", utc=True)
+        times = parsed.dt.tz_localize(None).to_numpy("datetime64[ns]")
+
+    valid = ~np.isnat(times)
+    if not valid.any():
+        return np.full(len(times), np.nan)
+    return (times - times[valid].min()) / np.timedelta64(1, "s")
+
+
+def pyramid_levels(frame: pd.DataFrame) -> List[np.ndarray]:
+    """
+    Row positions kept by each downsampled level of a lap.
+
+    Level 1 keeps about a quarter of the lap's rows, level 2 a sixteenth and so
+    on; each is chosen by min/max downsampling of the level below, so every level
+    keeps the peaks of all channels. Level 0, the full lap, is implicit.
+
+    Args:
+        frame: Wide-format telemetry of one lap
+
+    Returns:
+        Sorted row positions per level, finest first
+    """
+    channels = [col for col in frame.columns if frame[col].dtype.kind == "f"]
+    values = frame[channels].to_numpy(np.float64)
+
+    levels = []
+    rows = np.arange(len(frame))
+    while len(rows) // LEVEL_FACTOR >= MIN_LEVEL_ROWS:
+        rows = rows[downsample_rows(values[rows], len(rows) // LEVEL_FACTOR, "minmax")]
+        levels.append(rows)
+    return levels
+
+
+class LapPyramid:
+    """
+    One lap's telemetry with precomputed downsampled levels, for zoomable charts.
+
+    Level 0 is the full-resolution lap and level k keeps about 1/4^k of its rows.
+    A window is answered from the finest level whose rows in the window fit the
+    chart's pixel width, by indexing arrays that are already in memory or mapped,
+    so panning and zooming never reload or resample the lap.
+    """
+
+    def __init__(self, lap: int, timestamps: np.ndarray, elapsed: np.ndarray,
+                 channels: Dict[str, np.ndarray], levels: List[np.ndarray]):
+        """
+        Args:
+            lap: Lap number
+            timestamps: Sample timestamps, as strings or bytes
+            elapsed: Seconds since the lap's first sample
+            channels: Channel name to full-resolution values
+            levels: Row positions of each downsampled level, finest first
+        """
+        self.lap = lap
+        self.timestamps = timestamps
+        self.elapsed = elapsed
+        self.channels = channels
+        self.levels = levels
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, lap: int) -> "LapPyramid":
+        """Build the pyramid of a cleaned lap."""
+        channels = {col: frame[col].to_numpy() for col in frame.columns if col not in ("timestamp", "lap")}
+        return cls(lap, frame["timestamp"].to_numpy(), elapsed_seconds(frame["timestamp"]),
+                   channels, pyramid_levels(frame))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the pyramid's arrays, used by DataCache to size it."""
+        arrays = [self.timestamps, self.elapsed, *self.channels.values(), *self.levels]
+        return int(sum(array.nbytes for array in arrays))
+
+    def axis_values(self, axis: str) -> Optional[np.ndarray]:
+        """Full-resolution values of a window axis, or None if the lap did not log it."""
+        if axis == "time":
+            return self.elapsed
+        return self.channels.get(WINDOW_AXES[axis])
+
+    def window(self, axis: str = "time", start: Optional[float] = None, end: Optional[float] = None,
+               width: int = 1000) -> Tuple[pd.DataFrame, int]:
+        """
+        Get the rows of a window at the finest level that fits a chart's width.
+
+        Args:
+            axis: 'time' (seconds into the lap) or 'distance' (metres into the lap)
+            start: Window start on the axis, the lap's start if None
+            end: Window end on the axis, the lap's end if None
+            width: Chart width in pixels; at most ROWS_PER_PIXEL rows per pixel are
+                returned unless even the coarsest level has more
+
+        Returns:
+            (wide-format rows of the window with an 'elapsed' column, level used)
+
+        Raises:
+            ValueError: If the lap did not log the axis
+        """
+        values = self.axis_values(axis)
+        if values is None:
+            raise ValueError(f"Lap {self.lap} has no {axis} channel")
+
+        budget = width * ROWS_PER_PIXEL
+        candidates = [None] + self.levels
+        for level, rows in enumerate(candidates):
+            level_values = values if rows is None else values[rows]
+            # NaN axis values compare False, so they fall outside any bounded window
+            mask = np.ones(len(level_values), dtype=bool)
+            if start is not None:
+                mask &= level_values >= start
+            if end is not None:
+                mask &= level_values <= end
+            if mask.sum() <= budget or level == len(candidates) - 1:
+                selected = np.flatnonzero(mask) if rows is None else rows[mask]
+                return self._frame(selected), level
+
+    def _frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """Wide-format DataFrame of the given full-resolution rows."""
+        columns = {
+            "timestamp": self.timestamps[rows].astype(str),
+            "lap": np.full(len(rows), self.lap, dtype=np.int32),
+            # float32 like every channel, so encoding needs no per-request cast
+            "elapsed": self.elapsed[rows].astype(np.float32)
+        }
+        columns.update({channel: values[rows] for channel, values in self.channels.items()})
+        return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,216 @@
+import functools
+import json
+import logging
+import operator
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pa = None
+
+from config import TELEMETRY_STORE_DIR
+from utils.fingerprint import file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryStore:
+    """
+    Columnar Parquet store for long-format telemetry.
+
+    Each race is converted once from its raw telemetry CSV into a hive-partitioned
+    Parquet dataset laid out as <store>/<track>/Race <n>/vehicle_number=<v>/lap=<l>/.
+    Reads use column projection and partition pruning, so a single-lap request only
+    touches the files for that lap instead of re-parsing the whole CSV.
+    """
+
+    # Columns kept from the raw CSV; meta_* and expire_at are never used downstream
+    STORE_COLUMNS = [
+        "vehicle_id",
+        "vehicle_number",
+        "lap",
+        "timestamp",
+        "telemetry_name",
+        "telemetry_value"
+    ]
+
+    PARTITION_COLUMNS = ["vehicle_number", "lap"]
+
+    SOURCE_FILE = "_source.json"
+
+    def __init__(self, store_dir: Path = TELEMETRY_STORE_DIR):
+        self.store_dir = Path(store_dir)
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether pyarrow is installed so the store can be used."""
+        return pa is not None
+
+    def race_path(self, track: str, race_num: int) -> Path:
+        """Directory holding the partitioned dataset for a race."""
+        return self.store_dir / track / f"Race {race_num}"
+
+    def is_built(self, track: str, race_num: int, source_file: Path) -> bool:
+        """
+        Check if an up-to-date store exists for a race.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            source_file: Raw telemetry CSV the store was built from
+
+        Returns:
+            True if the store exists and matches the current source file
+        """
+        if not self.is_available():
+            return False
+
+        signature_file = self.race_path(track, race_num) / self.SOURCE_FILE
+        if not signature_file.exists():
+            return False
+
+        try:
+            with open(signature_file) as f:
+                recorded = json.load(f)
+            return recorded == file_signature(source_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable telemetry store signature for {track} Race {race_num}: {e}")
+            return False
+
+    def build(self, track: str, race_num: int, source_file: Path) -> Path:
+        """
+        Convert a raw telemetry CSV into the partitioned Parquet store.
+
+        The CSV is streamed in record batches, so memory use stays bounded even for
+        multi-GB files. The dataset is written to a temporary directory and swapped
+        in only once complete.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            source_file: Raw telemetry CSV to convert
+
+        Returns:
+            Path of the built race store
+        """
+        if not self.is_available():
+            raise RuntimeError("pyarrow is required to build the telemetry store")
+
+        race_path = self.race_path(track, race_num)
+        tmp_path = race_path.with_name(race_path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=self.STORE_COLUMNS,
+            column_types={
+                "vehicle_id": pa.string(),
+                "vehicle_number": pa.int32(),
+                "lap": pa.int32(),
+                "timestamp": pa.string(),
+                "telemetry_name": pa.dictionary(pa.int32(), pa.string()),
+                "telemetry_value": pa.float32()
+            }
+        )
+        reader = pa_csv.open_csv(str(source_file), convert_options=convert_options)
+
+        partitioning = pa_ds.partitioning(
+            pa.schema([(name, pa.int32()) for name in self.PARTITION_COLUMNS]),
+            flavor="hive"
+        )
+        pa_ds.write_dataset(
+            reader,
+            str(tmp_path),
+            format="parquet",
+            partitioning=partitioning,
+            basename_template="part-{i}.parquet",
+            max_partitions=100000,
+            existing_data_behavior="overwrite_or_ignore"
+        )
+
+        with open(tmp_path / self.SOURCE_FILE, "w") as f:
+            json.dump(file_signature(source_file), f)
+
+        shutil.rmtree(race_path, ignore_errors=True)
+        race_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.rename(race_path)
+
+        logger.info(f"Built telemetry store for {track} Race {race_num} at {race_path}")
+        return race_path
+
+    def keys(self, track: str, race_num: int) -> List[Tuple[int, int]]:
+        """
+        List the (vehicle_number, lap) partitions stored for a race.
+
+        Args:
+            track: Track name
+            race_num: Race number
+
+        Returns:
+            List of (vehicle_number, lap) tuples
+        """
+        keys = []
+        for lap_dir in self.race_path(track, race_num).glob("vehicle_number=*/lap=*"):
+            try:
+                vehicle = int(lap_dir.parent.name.split("=", 1)[1])
+                lap = int(lap_dir.name.split("=", 1)[1])
+            except ValueError:
+                continue
+            keys.append((vehicle, lap))
+        return keys
+
+    def load(self, track: str, race_num: int, lap: Optional[int] = None,
+             vehicle: Optional[int] = None, columns: Optional[List[str]] = None,
+             keys: Optional[List[Tuple[int, int]]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load telemetry from the store with projection and partition pruning.
+
+        Args:
+            track: Track name
+            race_num: Race number
+            lap: Optional lap number to filter by
+            vehicle: Optional vehicle number to filter by
+            columns: Optional subset of STORE_COLUMNS to read
+            keys: Optional (vehicle_number, lap) pairs to read, all in one scan
+
+        Returns:
+            Long-format telemetry DataFrame or None if nothing matches
+        """
+        dataset = pa_ds.dataset(
+            str(self.race_path(track, race_num)),
+            format="parquet",
+            partitioning="hive"
+        )
+
+        row_filter = None
+        if lap is not None:
+            row_filter = pa_ds.field("lap") == lap
+        if vehicle is not None:
+            vehicle_filter = pa_ds.field("vehicle_number") == vehicle
+            row_filter = vehicle_filter if row_filter is None else row_filter & vehicle_filter
+        if keys:
+            # Partitions are pruned per pair, so only the requested laps are read
+            key_filter = functools.reduce(operator.or_, [
+                (pa_ds.field("vehicle_number") == key_vehicle) & (pa_ds.field("lap") == key_lap)
+                for key_vehicle, key_lap in keys
+            ])
+            row_filter = key_filter if row_filter is None else row_filter & key_filter
+
+        table = dataset.to_table(columns=columns or self.STORE_COLUMNS, filter=row_filter)
+        if table.num_rows == 0:
+            return None
+
+        df = table.to_pandas()
+
+        # Order channel categories by name so pivots match the CSV column order
+        if "telemetry_name" in df.columns:
+            names = df["telemetry_name"].cat.remove_unused_categories()
+            df["telemetry_name"] = names.cat.reorder_categories(sorted(names.cat.categories))
+
+        return df
@@ -0,0 +1,46 @@
+import hashlib
+import inspect
+from pathlib import Path
+from typing import Dict
+
+
+def file_signature(path: Path) -> Dict:
+    """
+    Describe a file by name, size and modification time.
+
+    Derived artifacts record the signature of the file they were built from and
+    compare it on load, so a replaced or edited source file is never served stale.
+
+    Args:
+        path: File to describe
+
+    Returns:
+        Dictionary with file name, size in bytes and mtime in nanoseconds
+    """
+    stat = Path(path).stat()
+    return {
+        "file": Path(path).name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def code_fingerprint(*objects) -> str:
+    """
+    Hash the source code of classes or functions a derived artifact is computed with.
+
+    Args:
+        *objects: Classes or functions whose code shapes the artifact
+
+    Returns:
+        Short hex digest that changes whenever any of their source changes
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(obj.__qualname__.encode())
+        try:
+            digest.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            # Source is unavailable in some deployments; fall back to the name only
+            pass
+    return digest.hexdigest()[:16]
@@ -0,0 +1,349 @@
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from api.http_cache import make_etag
+from config import DATASET_DIR, TRACK_MAP_CACHE_DIR
+from constants import TRACK_MAP_FILES
+from utils.fingerprint import file_signature
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it tiles are PNG only
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+
+def render_track_map_png(map_path: Path, zoom: float = 2.0) -> bytes:
+    """
+    Render the first page of a track map PDF to PNG.
+
+    Kept at module level with plain arguments so it can run in a worker process.
+
+    Args:
+        map_path: Track map PDF
+        zoom: Render scale relative to the PDF's native resolution
+
+    Returns:
+        PNG image bytes
+    """
+    import fitz
+
+    pdf_document = fitz.open(str(map_path))
+    try:
+        page = pdf_document[0]
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return pix.tobytes("png")
+    finally:
+        pdf_document.close()
+
+
+def render_track_map_tile(map_path: Path, scale: float, clip: Tuple[float, float, float, float],
+                          image_format: str = "png") -> bytes:
+    """
+    Render one region of a track map PDF, without rasterizing the rest of the page.
+
+    Args:
+        map_path: Track map PDF
+        scale: Render scale relative to the PDF's native resolution
+        clip: Region to render as (x0, y0, x1, y1) in PDF points
+        image_format: 'png' or 'webp'
+
+    Returns:
+        Encoded image bytes
+    """
+    import fitz
+
+    pdf_document = fitz.open(str(map_path))
+    try:
+        page = pdf_document[0]
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=fitz.Rect(*clip))
+        png = pix.tobytes("png")
+    finally:
+        pdf_document.close()
+
+    if image_format == "webp":
+        buffer = BytesIO()
+        Image.open(BytesIO(png)).save(buffer, format="WEBP", quality=85)
+        return buffer.getvalue()
+    return png
+
+
+def track_map_page_size(map_path: Path) -> Tuple[float, float]:
+    """Width and height of a track map's first page in PDF points."""
+    import fitz
+
+    pdf_document = fitz.open(str(map_path))
+    try:
+        rect = pdf_document[0].rect
+        return rect.width, rect.height
+    finally:
+        pdf_document.close()
+
+
+class RenderedImage:
+    """An encoded image with its content type and ETag."""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = make_etag(body)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body)
+
+
+class TrackMapCache:
+    """
+    Memory and disk cache of rendered track maps and map tiles.
+
+    Renders are keyed by track, zoom (or tile z/x/y) and the PDF's size and mtime,
+    so a map is rasterized once and re-rendered only if its PDF changes. Tiles form
+    a pyramid: at level z the page's longest side spans TILE_SIZE * 2**z pixels,
+    and each tile is rendered on its own with a clip rectangle.
+    """
+
+    TILE_SIZE = 256
+
+    # Deepest tile level renders at most this many times the PDF's native resolution
+    MAX_TILE_SCALE = 8.0
+
+    MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+    # Zooms a whole map is rendered at; any requested zoom is snapped to one of
+    # them, so clients cannot fill the disk with a render per distinct float
+    MAP_ZOOM_LEVELS = (0.5, 1.0, 2.0, 4.0, 8.0)
+
+    def __init__(self, maps_dir: Path = DATASET_DIR / "Maps", cache_dir: Path = TRACK_MAP_CACHE_DIR,
+                 render_executor: Optional[Executor] = None):
+        self.maps_dir = Path(maps_dir)
+        self.cache_dir = Path(cache_dir)
+        self.render_executor = render_executor
+        self.memory: "OrderedDict[str, RenderedImage]" = OrderedDict()
+        self.memory_bytes = 0
+        self.page_sizes: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        self.renders = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_formats() -> Tuple[str, ...]:
+        """Tile formats that can be produced with the installed libraries."""
+        return ("png", "webp") if Image is not None else ("png",)
+
+    def map_path(self, track: str) -> Optional[Path]:
+        """Track map PDF for a track, or None if the track has no map."""
+        if track not in TRACK_MAP_FILES:
+            return None
+        map_path = self.maps_dir / TRACK_MAP_FILES[track]
+        return map_path if map_path.exists() else None
+
+    def _render(self, fn: Callable, *args) -> bytes:
+        """Render in the executor if one was given, else inline."""
+        self.renders += 1
+        if self.render_executor is not None:
+            return self.render_executor.submit(fn, *args).result()
+        return fn(*args)
+
+    def _remember(self, key: str, image: RenderedImage) -> None:
+        """Add a rendered image to the in-memory LRU."""
+        with self._lock:
+            if key in self.memory:
+                return
+            self.memory[key] = image
+            self.memory_bytes += image.nbytes
+            while self.memory_bytes > self.MEMORY_MAX_BYTES and len(self.memory) > 1:
+                _, evicted = self.memory.popitem(last=False)
+                self.memory_bytes -= evicted.nbytes
+
+    def _render_key(self, map_path: Path, track: str, name: str, image_format: str) -> str:
+        """Cache key of a render, which changes with the PDF's size and mtime."""
+        signature = file_signature(map_path)
+        version = f"{signature['mtime_ns']}_{signature['size']}"
+        return f"{track}/{name}_{version}.{image_format}"
+
+    def is_rendered(self, track: str, name: str, image_format: str = "png") -> bool:
+        """
+        Check whether a render of the current map PDF is cached on disk.
+
+        Args:
+            track: Track name
+            name: Render name within the track, e.g. 'map_2' or 'tile_3_1_2'
+            image_format: 'png' or 'webp'
+
+        Returns:
+            True if the render is on disk, False if it is missing or the track has no map
+        """
+        map_path = self.map_path(track)
+        return map_path is not None and (self.cache_dir / self._render_key(map_path, track, name, image_format)).exists()
+
+    def _get_or_render(self, track: str, name: str, image_format: str,
+                       render: Callable[[Path], bytes]) -> Optional[RenderedImage]:
+        """
+        Look up a render in memory, then on disk, and render it on a miss.
+
+        Args:
+            track: Track name
+            name: Render name within the track, e.g. 'map_2.0' or 'tile_3_1_2'
+            image_format: 'png' or 'webp'
+            render: Function rendering the image from the PDF path
+
+        Returns:
+            RenderedImage or None if the track has no map
+        """
+        map_path = self.map_path(track)
+        if map_path is None:
+            return None
+
+        key = self._render_key(map_path, track, name, image_format)
+
+        with self._lock:
+            image = self.memory.get(key)
+            if image is not None:
+                self.memory.move_to_end(key)
+                return image
+
+        disk_path = self.cache_dir / key
+        if disk_path.exists():
+            image = RenderedImage(disk_path.read_bytes(), MEDIA_TYPES[image_format])
+            self._remember(key, image)
+            return image
+
+        image = RenderedImage(render(map_path), MEDIA_TYPES[image_format])
+        self._remember(key, image)
+
+        try:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            # Renders of an older version of this PDF are never served again
+            for stale in disk_path.parent.glob(f"{name}_*.{image_format}"):
+                if stale.stem.rsplit("_", 2)[0] == name:
+                    stale.unlink(missing_ok=True)
+            tmp_path = disk_path.with_name(f"{disk_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(image.body)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            logger.warning(f"Could not write track map cache {disk_path}: {e}")
+
+        return image
+
+    @classmethod
+    def snap_zoom(cls, zoom: float) -> float:
+        """Closest of MAP_ZOOM_LEVELS to a requested zoom, comparing scales by ratio."""
+        return min(cls.MAP_ZOOM_LEVELS, key=lambda level: abs(math.log2(level / zoom)))
+
+    def get_map(self, track: str, zoom: float = 2.0) -> Optional[RenderedImage]:
+        """
+        Get the whole track map rendered as PNG.
+
+        Args:
+            track: Track name
+            zoom: Render scale relative to the PDF's native resolution, snapped to
+                the closest of MAP_ZOOM_LEVELS
+
+        Returns:
+            RenderedImage or None if the track has no map
+        """
+        zoom = self.snap_zoom(zoom)
+        return self._get_or_render(
+            track, f"map_{zoom:g}", "png",
+            lambda map_path: self._render(render_track_map_png, map_path, zoom)
+        )
+
+    def _page_size(self, map_path: Path) -> Tuple[float, float]:
+        """Page size of a map PDF, cached per PDF version."""
+        cache_key = (str(map_path), file_signature(map_path)["mtime_ns"])
+        if cache_key not in self.page_sizes:
+            self.page_sizes[cache_key] = track_map_page_size(map_path)
+        return self.page_sizes[cache_key]
+
+    def tile_info(self, track: str) -> Optional[Dict]:
+        """
+        Describe the tile pyramid of a track map.
+
+        Args:
+            track: Track name
+
+        Returns:
+            Dictionary with tile size, zoom range, per-level pixel and tile counts
+            and available formats, or None if the track has no map
+        """
+        map_path = self.map_path(track)
+        if map_path is None:
+            return None
+
+        width, height = self._page_size(map_path)
+        longest = max(width, height)
+        max_zoom = max(0, math.floor(math.log2(self.MAX_TILE_SCALE * longest / self.TILE_SIZE)))
+
+        levels = []
+        for z in range(max_zoom + 1):
+            scale = self.TILE_SIZE * 2 ** z / longest
+            pixel_width, pixel_height = math.ceil(width * scale), math.ceil(height * scale)
+            levels.append({
+                "z": z,
+                "width": pixel_width,
+                "height": pixel_height,
+                "tiles_x": math.ceil(pixel_width / self.TILE_SIZE),
+                "tiles_y": math.ceil(pixel_height / self.TILE_SIZE)
+            })
+
+        return {
+            "tile_size": self.TILE_SIZE,
+            "min_zoom": 0,
+            "max_zoom": max_zoom,
+            "formats": list(self.image_formats()),
+            "levels": levels
+        }
+
+    def get_tile(self, track: str, z: int, x: int, y: int, image_format: str = "png") -> Optional[RenderedImage]:
+        """
+        Get one tile of the track map pyramid.
+
+        Edge tiles are cropped to the page, so they may be smaller than TILE_SIZE.
+
+        Args:
+            track: Track name
+            z: Zoom level
+            x: Tile column
+            y: Tile row
+            image_format: 'png' or 'webp'
+
+        Returns:
+            RenderedImage or None if the track has no map or the tile is out of range
+        """
+        info = self.tile_info(track)
+        if info is None or image_format not in info["formats"] or not 0 <= z <= info["max_zoom"]:
+            return None
+
+        level = info["levels"][z]
+        if not (0 <= x < level["tiles_x"] and 0 <= y < level["tiles_y"]):
+            return None
+
+        map_path = self.map_path(track)
+        width, height = self._page_size(map_path)
+        scale = self.TILE_SIZE * 2 ** z / max(width, height)
+        points = self.TILE_SIZE / scale
+        clip = (x * points, y * points, min(width, (x + 1) * points), min(height, (y + 1) * points))
+
+        return self._get_or_render(
+            track, f"tile_{z}_{x}_{y}", image_format,
+            lambda path: self._render(render_track_map_tile, path, scale, clip, image_format)
+        )
+
+    def get_stats(self) -> Dict:
+        """Renders performed and in-memory cache size."""
+        with self._lock:
+            return {
+                "renders": self.renders,
+                "memory_entries": len(self.memory),
+                "memory_mb": self.memory_bytes / 1024 / 1024
+            }
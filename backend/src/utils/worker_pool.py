@@ -0,0 +1,242 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from config import WORKER_POOL_KIND, WORKER_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Run fn in a worker and report when it started, so queue wait can be measured."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class _PoolMetrics:
+    """Queue depth, wait time and run time of the tasks submitted to one executor."""
+
+    # Recent tasks kept for the wait-time percentiles
+    WINDOW = 1000
+
+    def __init__(self, kind: str, max_workers: int, observes_start: bool = True):
+        """
+        Args:
+            kind: 'thread' or 'process'
+            max_workers: Pool size
+            observes_start: Whether a task's start is seen when it happens. A process
+                pool task reports its start only with its result, so queued and
+                active tasks cannot be told apart and only in-flight is reported.
+        """
+        self.kind = kind
+        self.max_workers = max_workers
+        self.observes_start = observes_start
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.waits: Deque[float] = deque(maxlen=self.WINDOW)
+        self.runs: Deque[float] = deque(maxlen=self.WINDOW)
+        self._lock = threading.Lock()
+
+    def on_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def on_start(self, wait: float) -> None:
+        with self._lock:
+            self.started += 1
+            self.waits.append(wait)
+
+    def on_finish(self, run: Optional[float], failed: bool) -> None:
+        with self._lock:
+            self.completed += 1
+            if failed:
+                self.failed += 1
+            if run is not None:
+                self.runs.append(run)
+
+    def on_cancel(self) -> None:
+        """A task was cancelled before it started, so it leaves the queue without running."""
+        with self._lock:
+            self.cancelled += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            waits = sorted(self.waits)
+            runs = list(self.runs)
+            queued = self.submitted - self.started - self.cancelled
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "queued": queued if self.observes_start else None,
+                "active": self.started - self.completed if self.observes_start else None,
+                "in_flight": self.submitted - self.completed - self.cancelled,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "wait_ms_avg": 1000 * sum(waits) / len(waits) if waits else 0,
+                "wait_ms_p95": 1000 * waits[int(0.95 * (len(waits) - 1))] if waits else 0,
+                "wait_ms_max": 1000 * waits[-1] if waits else 0,
+                "run_ms_avg": 1000 * sum(runs) / len(runs) if runs else 0
+            }
+
+
+class _InstrumentedThreadPool(ThreadPoolExecutor):
+    """ThreadPoolExecutor that records queue depth and wait/run times per task."""
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix="worker")
+        self.metrics = _PoolMetrics("thread", max_workers)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted = time.perf_counter()
+        self.metrics.on_submit()
+
+        def timed():
+            started = time.perf_counter()
+            self.metrics.on_start(started - submitted)
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.metrics.on_finish(time.perf_counter() - started, failed)
+
+        future = super().submit(timed)
+        # Only a task that has not started can be cancelled, e.g. by an abandoned request
+        future.add_done_callback(lambda f: self.metrics.on_cancel() if f.cancelled() else None)
+        return future
+
+
+class _InstrumentedProcessPool(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor that records in-flight tasks and wait/run times per task.
+
+    A worker process reports when a task started only together with its result,
+    so wait times are recorded on completion and queued tasks are not told apart
+    from running ones.
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self.metrics = _PoolMetrics("process", max_workers, observes_start=False)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted = time.time()
+        self.metrics.on_submit()
+        inner = super().submit(_timed_call, fn, args, kwargs)
+        outer: Future = Future()
+
+        def settle(set_outcome: Callable, value) -> None:
+            # outer may have been cancelled by its caller while inner ran
+            try:
+                set_outcome(value)
+            except InvalidStateError:
+                pass
+
+        def done(future: Future):
+            if future.cancelled():
+                self.metrics.on_cancel()
+                outer.cancel()
+                return
+            error = future.exception()
+            if error is not None:
+                # Failed before reporting a start time
+                self.metrics.on_start(time.time() - submitted)
+                self.metrics.on_finish(None, True)
+                settle(outer.set_exception, error)
+                return
+            started, result = future.result()
+            self.metrics.on_start(started - submitted)
+            self.metrics.on_finish(time.time() - started, False)
+            settle(outer.set_result, result)
+
+        inner.add_done_callback(done)
+        # Cancelling outer (e.g. when the awaiting request is cancelled) cancels inner
+        # if it has not been sent to a worker yet
+        outer.add_done_callback(lambda f: inner.cancel() if f.cancelled() else None)
+        return outer
+
+
+class WorkerPool:
+    """
+    Executor layer for blocking work called from async request handlers.
+
+    CSV reads, cleaning, analytics and rendering run in a thread pool and are
+    awaited, so the event loop keeps serving light requests and websocket streams
+    while heavy telemetry loads are in flight. With kind='process', functions
+    passed to run_cpu go to a process pool instead, which sidesteps the GIL for
+    pure-Python work; those functions and their arguments must be picklable.
+    """
+
+    def __init__(self, kind: str = WORKER_POOL_KIND, max_workers: int = WORKER_POOL_SIZE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+
+        self.kind = kind
+        self.threads = _InstrumentedThreadPool(max_workers)
+        self.processes: Optional[_InstrumentedProcessPool] = None
+        if kind == "process":
+            self.processes = _InstrumentedProcessPool(max_workers)
+        logger.info(f"WorkerPool initialized: {kind} pool with {max_workers} workers")
+
+    @property
+    def cpu_executor(self) -> Executor:
+        """Executor for CPU-bound, picklable work."""
+        return self.processes or self.threads
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call in the thread pool and await its result.
+
+        Args:
+            fn: Blocking function
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, functools.partial(fn, *args, **kwargs))
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a CPU-bound call in the process pool (or thread pool) and await it.
+
+        Args:
+            fn: Picklable function
+            *args: Picklable positional arguments for fn
+            **kwargs: Picklable keyword arguments for fn
+
+        Returns:
+            The function's return value
+        """
+        return await asyncio.wrap_future(self.cpu_executor.submit(fn, *args, **kwargs))
+
+    def get_stats(self) -> Dict:
+        """
+        Get pool size, queue depth and wait-time metrics.
+
+        Returns:
+            Dictionary with thread pool stats and, if enabled, process pool stats
+        """
+        stats = {"kind": self.kind, "threads": self.threads.metrics.get_stats()}
+        if self.processes is not None:
+            stats["processes"] = self.processes.metrics.get_stats()
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop the pools, letting running tasks finish."""
+        self.threads.shutdown(wait=True, cancel_futures=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=True, cancel_futures=True)